@@ -1,7 +1,11 @@
 import psycopg2
+import io
+from psycopg2.extras import execute_values
 import logging
 import configparser
 import os
+import threading
+from datetime import timedelta
 
 logging.basicConfig(filename="error.log", level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
 
@@ -10,14 +14,71 @@ path = os.path.dirname(os.path.abspath(__file__))
 config_path = os.path.join(path, "config.ini")
 config.read(config_path)  # DB config file
 
+from processDiff import SnapshotDiffer, STATIC_FIELDS, DYNAMIC_FIELDS, static_hash
+from dbSpool import Spool, SpoolReplayer
+from storageBackend import PROCESS_DATA_COLUMNS, UNSIGNED_COLUMNS
+from process import Policy_State
+
+# 롤업 해상도: 테이블 접미사 → (date_trunc 단위, 버킷 길이(초))
+ROLLUP_RESOLUTIONS = {
+    "1m": ("minute", 60),
+    "1h": ("hour", 3600),
+    "1d": ("day", 86400),
+}
+
 # PostgreSQL setting
 DATABASE_CONFIG = {
     "dbname": config["database"]["dbname"],
     "user": config["database"]["user"],
     "password": config["database"]["password"],
     "host": config["database"]["host"],  # localhost 또는 실제 서버 주소
-    "port": config["database"]["port"]
+    "port": config["database"]["port"],
+    # DB가 응답하지 않을 때 수집이 오래 막히지 않도록 연결 대기 시간 제한(초)
+    "connect_timeout": config.getint("database", "connect_timeout", fallback=5)
+}
+
+# 프로세스 데이터 저장 스키마 ([storage] process_schema)
+# - legacy: process_data (모든 컬럼, 주소값 VARCHAR)
+# - compact: process_data_compact (정확한 정수 타입, comm은 comm_lookup 참조, 프로필 컬럼만 기록)
+PROCESS_SCHEMA = config.get("storage", "process_schema", fallback="legacy").strip().lower()
+# true면 변경분 테이블(process_identity, process_sample, pod_snapshot)에 저장 → 조회/롤업도 복원 뷰에서 읽음
+PROCESS_DIFF = config.getboolean("storage", "process_diff", fallback=False)
+# [rollup] enabled가 false면 롤업 표시 트리거를 만들지 않음 (initialize_database)
+ROLLUP_ENABLED = config.getboolean("rollup", "enabled", fallback=False)
+# compact 스키마에서 기록할 컬럼 묶음: core(분석에 쓰는 컬럼) 또는 full(전체)
+PROCESS_PROFILES = {
+    "core": (
+        "timestamp", "pid", "comm", "state", "ppid", "starttime",
+        "utime", "stime", "cutime", "minflt", "majflt", "num_threads",
+        "vsize", "rss", "rsslim", "vm_rss",
+        "voluntary_ctxt_switches", "nonvoluntary_ctxt_switches", "read_bytes", "write_bytes"
+    ),
+    "full": PROCESS_DATA_COLUMNS,
+}
+PROCESS_PROFILE = PROCESS_PROFILES[config.get("storage", "process_profile", fallback="core").strip().lower()]
+
+# process_data_compact 컬럼 타입 (정렬 패딩이 없도록 폭이 큰 타입부터 배치)
+COMPACT_COLUMN_TYPES = {
+    **{c: "BIGINT" for c in (
+        "flags", "minflt", "cminflt", "majflt", "cmajflt", "utime", "stime", "cutime", "cstime",
+        "itrealvalue", "starttime", "vsize", "rss", "rsslim", "startcode", "endcode", "startstack",
+        "kstkesp", "kstkeip", "signal", "blocked", "sigignore", "sigcatch", "wchan", "nswap", "cnswap",
+        "delayacct_blkio_ticks", "guest_time", "cguest_time", "start_data", "end_data", "start_brk",
+        "arg_start", "arg_end", "env_start", "env_end",
+        "voluntary_ctxt_switches", "nonvoluntary_ctxt_switches", "vm_rss", "read_bytes", "write_bytes"
+    )},
+    **{c: "INTEGER" for c in (
+        "pid", "ppid", "pgrp", "session", "tty_nr", "tpgid", "num_threads", "processor", "exit_code"
+    )},
+    **{c: "SMALLINT" for c in ("priority", "nice", "exit_signal", "rt_priority", "policy")},
+    "state": "VARCHAR(30)",
 }
+# compact 테이블에서 정수 코드로 저장하는 policy 값
+POLICY_CODES = {state.name: state.value for state in Policy_State}
+
+# DB 장애 시 process_data 행을 보관하는 로컬 스풀
+SPOOL = Spool(os.path.join(path, config.get("spool", "directory", fallback="spool")),
+              rotate_bytes=config.getint("spool", "rotate_mb", fallback=64) << 20)
 
 def get_db_connection():
     """PostgreSQL connect DB"""
@@ -109,6 +170,103 @@ def initialize_database():
         );
         """)
 
+        # /proc/[pid]/status, /proc/[pid]/io 메트릭 (롤업 집계용, 기존 테이블에도 추가)
+        cursor.execute("""
+        ALTER TABLE process_data
+            ADD COLUMN IF NOT EXISTS voluntary_ctxt_switches BIGINT,
+            ADD COLUMN IF NOT EXISTS nonvoluntary_ctxt_switches BIGINT,
+            ADD COLUMN IF NOT EXISTS vm_rss BIGINT,
+            ADD COLUMN IF NOT EXISTS read_bytes BIGINT,
+            ADD COLUMN IF NOT EXISTS write_bytes BIGINT;
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS process_data_timestamp_idx ON process_data (timestamp);")
+
+        # compact 스키마 ([storage] process_schema = compact일 때 사용)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS comm_lookup (
+            comm_id SERIAL PRIMARY KEY,
+            comm TEXT UNIQUE NOT NULL
+        );
+        """)
+        compact_columns = ",\n            ".join(
+            f"{c} {t}" for c, t in sorted(COMPACT_COLUMN_TYPES.items(), key=lambda item: _TYPE_ORDER[item[1]])
+        )
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS process_data_compact (
+            id BIGSERIAL PRIMARY KEY,
+            timestamp TIMESTAMP NOT NULL,
+            pod_id INTEGER REFERENCES pod_info(pod_id) ON DELETE CASCADE,
+            comm_id INTEGER REFERENCES comm_lookup(comm_id),
+            {compact_columns}
+        );
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS process_data_compact_pod_ts_idx ON process_data_compact (pod_id, timestamp);")
+        # comm 이름 복원, unsigned 값(부호 있는 값으로 저장) 복원, policy 코드 → 이름
+        policy_case = " ".join(f"WHEN {code} THEN '{name}'" for name, code in POLICY_CODES.items())
+        view_columns = ",\n            ".join(
+            f"CASE WHEN d.{c} < 0 THEN d.{c}::numeric + 18446744073709551616 ELSE d.{c} END AS {c}"
+            if c in UNSIGNED_COLUMNS else
+            f"CASE d.policy {policy_case} END AS policy" if c == "policy" else f"d.{c}"
+            for c in PROCESS_DATA_COLUMNS if c not in ("timestamp", "comm")
+        )
+        cursor.execute(f"""
+        CREATE OR REPLACE VIEW process_data_compact_view AS
+        SELECT
+            d.id, d.pod_id, d.timestamp, c.comm,
+            {view_columns}
+        FROM process_data_compact d
+        LEFT JOIN comm_lookup c ON c.comm_id = d.comm_id;
+        """)
+
+        # 1m/1h/1d 롤업 테이블 (pod, comm 단위 집계, pod 단위는 comm을 합산해 조회)
+        for resolution in ROLLUP_RESOLUTIONS:
+            cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS process_rollup_{resolution} (
+                bucket TIMESTAMP NOT NULL,
+                pod_id INTEGER REFERENCES pod_info(pod_id) ON DELETE CASCADE,
+                comm VARCHAR(255) NOT NULL,
+                samples BIGINT NOT NULL,
+                cpu_ticks BIGINT NOT NULL,
+                ctxt_switches BIGINT NOT NULL,
+                read_bytes BIGINT NOT NULL,
+                write_bytes BIGINT NOT NULL,
+                rss_sum BIGINT NOT NULL,
+                rss_max BIGINT NOT NULL,
+                PRIMARY KEY (bucket, pod_id, comm)
+            );
+            """)
+        # 롤업을 다시 계산할 (1분 버킷, pod) 표시
+        # 행을 넣는 트랜잭션 안에서 트리거가 기록하므로 커밋 순서(id 순서)와 무관하게 늦게 커밋된 행도 빠지지 않음
+        # 중복 표시를 허용(고유 키 없음)해 동시에 넣는 트랜잭션끼리 기다리지 않음
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS rollup_dirty (
+            seq BIGSERIAL PRIMARY KEY,
+            bucket TIMESTAMP NOT NULL,
+            pod_id INTEGER NOT NULL
+        );
+        """)
+        cursor.execute("""
+        CREATE OR REPLACE FUNCTION mark_rollup_dirty() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO rollup_dirty (bucket, pod_id)
+            SELECT DISTINCT date_trunc('minute', timestamp), pod_id FROM new_rows
+            WHERE pod_id IS NOT NULL AND timestamp IS NOT NULL;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """)
+        # 이전 버전(process_data.id watermark)에서 아직 반영하지 않은 행을 표시로 옮기고 watermark 제거
+        cursor.execute("SELECT to_regclass('rollup_watermark') IS NOT NULL;")
+        if cursor.fetchone()[0]:
+            for table in ("process_data", "process_data_compact"):
+                cursor.execute(f"""
+                INSERT INTO rollup_dirty (bucket, pod_id)
+                SELECT DISTINCT date_trunc('minute', d.timestamp), d.pod_id
+                FROM {table} d JOIN rollup_watermark w ON w.name = %s
+                WHERE d.id > w.last_id AND d.pod_id IS NOT NULL AND d.timestamp IS NOT NULL;
+                """, (table,))
+            cursor.execute("DROP TABLE rollup_watermark;")
+
         # bash_history Table
         cursor.execute("""
         CREATE TABLE IF NOT EXISTS bash_history (
@@ -149,6 +307,166 @@ def initialize_database():
         );
         """)
 
+        # 스냅샷 차분 저장용 테이블 ([storage] process_diff = true일 때 사용)
+        # 정적 필드는 프로세스(identity)당 한 번, 동적 필드는 바뀐 사이클에만 저장
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS process_identity (
+            identity_id BIGSERIAL PRIMARY KEY,
+            pod_id INTEGER REFERENCES pod_info(pod_id) ON DELETE CASCADE,
+            pid INTEGER,
+            starttime BIGINT,
+            static_hash CHAR(16),
+            first_seen TIMESTAMP,
+            gone_at TIMESTAMP,
+            comm VARCHAR(255),
+            ppid INTEGER,
+            pgrp INTEGER,
+            session INTEGER,
+            tty_nr INTEGER,
+            itrealvalue BIGINT,
+            rsslim NUMERIC(20),
+            startcode NUMERIC(20),
+            endcode NUMERIC(20),
+            startstack NUMERIC(20),
+            exit_signal INTEGER,
+            start_data NUMERIC(20),
+            end_data NUMERIC(20),
+            start_brk NUMERIC(20),
+            arg_start NUMERIC(20),
+            arg_end NUMERIC(20),
+            env_start NUMERIC(20),
+            env_end NUMERIC(20)
+        );
+        """)
+
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS process_sample (
+            identity_id BIGINT REFERENCES process_identity(identity_id) ON DELETE CASCADE,
+            timestamp TIMESTAMP,
+            state VARCHAR(30),
+            minflt BIGINT,
+            cminflt BIGINT,
+            majflt BIGINT,
+            cmajflt BIGINT,
+            utime BIGINT,
+            stime BIGINT,
+            cutime BIGINT,
+            cstime BIGINT,
+            num_threads INTEGER,
+            vsize BIGINT,
+            rss BIGINT,
+            kstkesp NUMERIC(20),
+            kstkeip NUMERIC(20),
+            signal NUMERIC(20),
+            blocked NUMERIC(20),
+            wchan NUMERIC(20),
+            nswap BIGINT,
+            cnswap BIGINT,
+            processor INTEGER,
+            delayacct_blkio_ticks BIGINT,
+            guest_time BIGINT,
+            cguest_time BIGINT,
+            exit_code INTEGER,
+            tpgid INTEGER,
+            flags BIGINT,
+            priority INTEGER,
+            nice INTEGER,
+            sigignore NUMERIC(20),
+            sigcatch NUMERIC(20),
+            rt_priority INTEGER,
+            policy VARCHAR(20),
+            voluntary_ctxt_switches BIGINT,
+            nonvoluntary_ctxt_switches BIGINT,
+            vm_rss BIGINT,
+            read_bytes BIGINT,
+            write_bytes BIGINT,
+            PRIMARY KEY (identity_id, timestamp)
+        );
+        """)
+
+        # 파드별 수집 시각 (값이 바뀌지 않은 사이클도 복원하기 위함)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS pod_snapshot (
+            pod_id INTEGER REFERENCES pod_info(pod_id) ON DELETE CASCADE,
+            timestamp TIMESTAMP,
+            process_count INTEGER,
+            PRIMARY KEY (pod_id, timestamp)
+        );
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS process_identity_pod_idx ON process_identity (pod_id, first_seen);")
+
+        # 기존 DB에 나중에 sample로 옮기거나 추가한 컬럼 (identity 쪽 옛 컬럼은 남겨 두고 더 이상 채우지 않음)
+        for column, column_type in (
+            ("tpgid", "INTEGER"), ("flags", "BIGINT"), ("priority", "INTEGER"), ("nice", "INTEGER"),
+            ("sigignore", "NUMERIC(20)"), ("sigcatch", "NUMERIC(20)"),
+            ("rt_priority", "INTEGER"), ("policy", "VARCHAR(20)"),
+            ("voluntary_ctxt_switches", "BIGINT"), ("nonvoluntary_ctxt_switches", "BIGINT"),
+            ("vm_rss", "BIGINT"), ("read_bytes", "BIGINT"), ("write_bytes", "BIGINT"),
+        ):
+            cursor.execute(f"ALTER TABLE process_sample ADD COLUMN IF NOT EXISTS {column} {column_type};")
+        # 같은 정적 해시가 다시 나타나면 되살리지 않고 새 버전(first_seen)으로 저장
+        # (되살리면 사라졌던 구간의 다른 버전과 생존 구간이 겹쳐 복원 뷰에 중복 행이 생김)
+        cursor.execute("""
+        ALTER TABLE process_identity
+        DROP CONSTRAINT IF EXISTS process_identity_pod_id_pid_starttime_static_hash_key;
+        """)
+        cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS process_identity_version_key
+        ON process_identity (pod_id, pid, starttime, static_hash, first_seen);
+        """)
+
+        # 롤업 표시 트리거 (변경분 저장은 pod_snapshot 한 행 = 한 파드 수집 시각)
+        # 롤업을 끈 동안에는 표시를 소비하는 작업이 없으므로 트리거를 두지 않고 남은 표시도 비움
+        for table in ("process_data", "process_data_compact", "pod_snapshot"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {table}_rollup_dirty ON {table};")
+            if ROLLUP_ENABLED:
+                cursor.execute(f"""
+                CREATE TRIGGER {table}_rollup_dirty AFTER INSERT ON {table}
+                REFERENCING NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION mark_rollup_dirty();
+                """)
+        if not ROLLUP_ENABLED:
+            cursor.execute("TRUNCATE rollup_dirty;")
+
+        # 차분 저장된 데이터를 process_data와 같은 형태의 전체 행으로 복원
+        # (각 수집 시각에 살아 있던 identity의, 그 시각 이전 마지막 sample)
+        # 필드 구성이 바뀌면 CREATE OR REPLACE로는 컬럼 순서를 바꿀 수 없으므로 다시 만듦
+        cursor.execute("DROP VIEW IF EXISTS process_data_diff_view, process_data_reconstructed;")
+        cursor.execute(f"""
+        CREATE VIEW process_data_reconstructed AS
+        SELECT
+            s.pod_id, s.timestamp, i.pid, d.state, i.starttime,
+            {", ".join("i." + f for f in STATIC_FIELDS)},
+            {", ".join("d." + f for f in DYNAMIC_FIELDS if f != "state")},
+            i.identity_id
+        FROM pod_snapshot s
+        JOIN process_identity i
+          ON i.pod_id = s.pod_id
+         AND i.first_seen <= s.timestamp
+         AND (i.gone_at IS NULL OR i.gone_at > s.timestamp)
+        JOIN LATERAL (
+            SELECT * FROM process_sample ps
+            WHERE ps.identity_id = i.identity_id AND ps.timestamp <= s.timestamp
+            ORDER BY ps.timestamp DESC
+            LIMIT 1
+        ) d ON TRUE;
+        """)
+
+        # 변경분 저장 시 process_data와 같은 컬럼으로 조회/롤업하기 위한 뷰
+        # (id는 identity_id, 변경분에 저장하지 않는 컬럼이 있으면 NULL)
+        reconstructed = {"timestamp", "pid", "state", "starttime", *STATIC_FIELDS, *DYNAMIC_FIELDS}
+        diff_columns = ",\n            ".join(
+            f"r.{c}" if c in reconstructed else f"NULL::BIGINT AS {c}"
+            for c in PROCESS_DATA_COLUMNS
+        )
+        cursor.execute(f"""
+        CREATE VIEW process_data_diff_view AS
+        SELECT
+            r.identity_id AS id, r.pod_id,
+            {diff_columns}
+        FROM process_data_reconstructed r;
+        """)
+
         conn.commit()
 
     except psycopg2.Error as e:
@@ -157,8 +475,24 @@ def initialize_database():
         if conn:
             conn.close()
 
+# (pod_name, namespace) → 살아 있는 pod_id 캐시 (삭제 기록 시 무효화)
+_POD_ID_CACHE = {}
+_POD_ID_CACHE_LOCK = threading.Lock()
+
+def _cache_pod_id(pod_name, namespace, pod_id):
+    with _POD_ID_CACHE_LOCK:
+        if pod_id is None:
+            _POD_ID_CACHE.pop((pod_name, namespace), None)
+        else:
+            _POD_ID_CACHE[(pod_name, namespace)] = pod_id
+
 def get_or_create_pod_id(pod_name, namespace):
     """pod data check and if existed data return pod_id, else create"""
+    with _POD_ID_CACHE_LOCK:
+        cached = _POD_ID_CACHE.get((pod_name, namespace))
+    if cached is not None:
+        return cached
+
     conn = None
 
     try:
@@ -187,11 +521,13 @@ def get_or_create_pod_id(pod_name, namespace):
                     # lifecycle 정보가 없다면 살아있는 것으로 간주
                     logging.info(f"Pod {pod_name} has no lifecycle info. Using pod_id: {pod_id}")
                     print("lifecycle 데이터가 없으므로, 기존 id 반환합니다.")
+                    _cache_pod_id(pod_name, namespace, pod_id)
                     return pod_id
                 elif lifecycle[0] is None:
                     # delete time is None -> not deleted pod
                     logging.info(f"Pod {pod_name} is active. Using pod_id: {pod_id}")
                     print("기존 id 반환합니다.")
+                    _cache_pod_id(pod_name, namespace, pod_id)
                     return pod_id
 
             # All pod_id have deleted time -> create pod info
@@ -207,6 +543,7 @@ def get_or_create_pod_id(pod_name, namespace):
         conn.commit()
 
         logging.info(f"New pod inserted into DB: {pod_name}, namespace: {namespace}, pod_id: {new_pod_id}")
+        _cache_pod_id(pod_name, namespace, new_pod_id)
         return new_pod_id
 
     except psycopg2.Error as e:
@@ -217,191 +554,460 @@ def get_or_create_pod_id(pod_name, namespace):
             cursor.close()
             conn.close()
 
+# pod_status upsert: 값이 실제로 바뀐 경우에만 행을 갱신 (같은 값이면 쓰기 없음)
+POD_STATUS_UPSERT = """
+        ON CONFLICT (pod_id) DO UPDATE
+        SET deletion_timestamp = EXCLUDED.deletion_timestamp,
+            node_name = EXCLUDED.node_name,
+            phase = EXCLUDED.phase, host_ip = EXCLUDED.host_ip,
+            pod_ip = EXCLUDED.pod_ip, start_time = EXCLUDED.start_time,
+            last_updated = CURRENT_TIMESTAMP
+        WHERE (pod_status.deletion_timestamp, pod_status.node_name, pod_status.phase,
+               pod_status.host_ip, pod_status.pod_ip, pod_status.start_time)
+              IS DISTINCT FROM
+              (EXCLUDED.deletion_timestamp, EXCLUDED.node_name, EXCLUDED.phase,
+               EXCLUDED.host_ip, EXCLUDED.pod_ip, EXCLUDED.start_time);
+"""
+
+def _pod_status_row(pod_info_obj):
+    """pod_status 한 행 (pod_id 제외)"""
+    return [
+        pod_info_obj.creation_timestamp,
+        pod_info_obj.deletion_timestamp,
+        pod_info_obj.generate_name,
+        pod_info_obj.node_name,
+        pod_info_obj.phase,
+        pod_info_obj.hostIP,
+        pod_info_obj.podIP,
+        pod_info_obj.startTime
+    ]
+
+def _write_pod_status(cursor, pod_id, record):
+    execute_values(cursor, """
+    INSERT INTO pod_status (
+        pod_id, creation_timestamp, deletion_timestamp,
+        generate_name, node_name, phase,
+        host_ip, pod_ip, start_time
+    ) VALUES %s
+    """ + POD_STATUS_UPSERT, [(pod_id, *row) for row in record["rows"]])
+
 def save_pod_status(pod_name, namespace, pod_info_obj):
-    """Save new pod's status"""
+    """
+    Save new pod's status
+    스풀에 기록한 경우에도 재생 시 반영되므로 True 반환 (같은 상태를 다시 보내지 않도록)
+    """
+    return _save_or_spool("pod_status", pod_name, namespace, [_pod_status_row(pod_info_obj)],
+                          spooled_result=True)
+
+def _write_pod_lifecycle(cursor, pod_id, record):
+    for (created_at,) in record["rows"]:
+        cursor.execute("""
+        INSERT INTO pod_lifecycle (
+            pod_id, created_at
+        ) VALUES (
+            %s, %s
+        ) ON CONFLICT (pod_id) 
+        DO UPDATE SET created_at = EXCLUDED.created_at;
+        """, (pod_id, created_at))
+
+def save_pod_lifecycle(pod_name, namespace, lifecycle):
+    """Save new pod's lifecycle (create time)"""
+    return _save_or_spool("pod_lifecycle", pod_name, namespace, [[lifecycle.createTime]])
+
+
+_TYPE_ORDER = {"BIGINT": 0, "INTEGER": 1, "SMALLINT": 2, "VARCHAR(30)": 3}
+
+# comm → comm_id 캐시 (커밋된 값만 저장)
+_COMM_IDS = {}
+_COMM_IDS_LOCK = threading.Lock()
+
+def _process_source():
+    """현재 스키마에서 process_data 형태(comm 이름, 원래 값)로 읽을 수 있는 테이블/뷰"""
+    if PROCESS_DIFF:
+        return "process_data_diff_view"
+    return "process_data_compact_view" if PROCESS_SCHEMA == "compact" else "process_data"
+
+def _wrap_unsigned(value):
+    """BIGINT에 담을 수 없는 unsigned 64비트 값을 부호 있는 값으로 변환 (뷰에서 복원)"""
+    if isinstance(value, int) and value >= 1 << 63:
+        return value - (1 << 64)
+    return value
+
+def _resolve_comm_ids(cursor, comms):
+    """
+    comm 이름들의 comm_id (없으면 comm_lookup에 추가)
+    return:
+        (전체 매핑, 이번에 새로 조회한 매핑) - 새 매핑은 커밋 후 _remember_comm_ids로 캐시
+    """
+    with _COMM_IDS_LOCK:
+        known = {c: _COMM_IDS[c] for c in comms if c in _COMM_IDS}
+    missing = [c for c in comms if c not in known and c is not None]
+    fetched = {}
+    if missing:
+        execute_values(cursor, """
+        INSERT INTO comm_lookup (comm) VALUES %s ON CONFLICT (comm) DO NOTHING;
+        """, [(c,) for c in missing])
+        cursor.execute("SELECT comm, comm_id FROM comm_lookup WHERE comm = ANY(%s);", (missing,))
+        fetched = dict(cursor.fetchall())
+    return {**known, **fetched}, fetched
+
+def _remember_comm_ids(comm_ids):
+    if comm_ids:
+        with _COMM_IDS_LOCK:
+            _COMM_IDS.update(comm_ids)
+
+def _process_ingest_rows(cursor, pod_id, rows):
+    """
+    PROCESS_DATA_COLUMNS 순서의 행을 현재 스키마의 테이블 행으로 변환
+    return:
+        (테이블, 컬럼 목록, 값 튜플 목록, 새 comm_id 매핑)
+    """
+    if PROCESS_SCHEMA != "compact":
+        return "process_data", ("pod_id", *PROCESS_DATA_COLUMNS), [(pod_id, *row) for row in rows], {}
+
+    index = {c: i for i, c in enumerate(PROCESS_DATA_COLUMNS)}
+    comm_ids, fetched = _resolve_comm_ids(cursor, {row[index["comm"]] for row in rows})
+    columns = [c for c in PROCESS_PROFILE if c not in ("timestamp", "comm")]
+    values = []
+    for row in rows:
+        out = [pod_id, row[index["timestamp"]], comm_ids.get(row[index["comm"]])]
+        for c in columns:
+            v = row[index[c]]
+            if c == "policy":
+                v = POLICY_CODES.get(v)
+            elif c in UNSIGNED_COLUMNS:
+                v = _wrap_unsigned(v)
+            out.append(v)
+        values.append(tuple(out))
+    return "process_data_compact", ("pod_id", "timestamp", "comm_id", *columns), values, fetched
+
+def save_to_process(pod_name, namespace, processes):
+    """
+    process data save to DB
+    DB에 연결할 수 없거나 스풀에 재생 대기 중인 데이터가 있으면 로컬 스풀에 기록 (순서 유지)
+    """
+    rows = [[process.get(c) for c in PROCESS_DATA_COLUMNS] for process in processes]
+    if not rows:
+        return None
+    if SPOOL.has_pending():
+        SPOOL.append(pod_name, namespace, rows)
+        return None
+
     conn = None
 
     try:
         conn = get_db_connection()
         if conn is None:
             logging.error("Database connection failed")
+            SPOOL.append(pod_name, namespace, rows)
             return None
 
         cursor = conn.cursor()
 
         pod_id = get_or_create_pod_id(pod_name, namespace)
+        if pod_id is None:
+            SPOOL.append(pod_name, namespace, rows)
+            return None
 
-        insert_query = """
-        INSERT INTO pod_status (
-            pod_id, creation_timestamp, deletion_timestamp,
-            generate_name, node_name, phase,
-            host_ip, pod_ip, start_time
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s
-        ) ON CONFLICT (pod_id) DO UPDATE
-        SET deletion_timestamp = EXCLUDED.deletion_timestamp,
-            phase = EXCLUDED.phase, host_ip = EXCLUDED.host_ip,
-            pod_ip = EXCLUDED.pod_ip, start_time = EXCLUDED.start_time;
-        """
-
-        values = (
-            pod_id,
-            pod_info_obj.creation_timestamp,
-            pod_info_obj.deletion_timestamp,
-            pod_info_obj.generate_name,
-            pod_info_obj.node_name,
-            pod_info_obj.phase,
-            pod_info_obj.hostIP,
-            pod_info_obj.podIP,
-            pod_info_obj.startTime
-        )
-
-        cursor.execute(insert_query, values)
+        table, columns, values, comm_ids = _process_ingest_rows(cursor, pod_id, rows)
+        execute_values(cursor, f"""
+        INSERT INTO {table} ({", ".join(columns)}) VALUES %s
+        """, values)
         conn.commit()
-
+        _remember_comm_ids(comm_ids)
+        return True
+    except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+        # 연결 끊김, 타임아웃: 데이터는 스풀에 보관하고 나중에 재생
+        logging.error(f"PostgreSQL Error (spooled): {e}")
+        SPOOL.append(pod_name, namespace, rows)
     except psycopg2.Error as e:
-        conn.rollback()
         logging.error(f"PostgreSQL Error: {e}")
     finally:
         if conn:
             cursor.close()
             conn.close()
 
-def save_pod_lifecycle(pod_name, namespace, lifecycle):
-    """Save new pod's lifecycle (create time)"""
+def _copy_text(value):
+    """COPY text 형식 필드 (None → \\N, 구분자/개행/역슬래시 이스케이프)"""
+    if value is None:
+        return "\\N"
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+def _copy_process_records(cursor, records):
+    """kind=process 스풀 레코드들을 COPY 한 번으로 적재, 새 comm_id 매핑 반환"""
+    buffer = io.StringIO()
+    table, columns, comm_ids = "process_data", (), {}
+    for record in records:
+        pod_id = get_or_create_pod_id(record["pod_name"], record["namespace"])
+        if pod_id is None:
+            raise psycopg2.OperationalError("pod_id lookup failed")
+        table, columns, values, fetched = _process_ingest_rows(cursor, pod_id, record["rows"])
+        comm_ids.update(fetched)
+        for row in values:
+            buffer.write("\t".join(_copy_text(v) for v in row) + "\n")
+    if columns:
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+    return comm_ids
+
+def _save_spool_checkpoint(cursor, name, offset):
+    cursor.execute("""
+    INSERT INTO spool_checkpoint (segment, byte_offset) VALUES (%s, %s)
+    ON CONFLICT (segment) DO UPDATE
+    SET byte_offset = EXCLUDED.byte_offset, updated_at = CURRENT_TIMESTAMP;
+    """, (name, offset))
+
+def replay_spool(spool=SPOOL, max_records=500):
+    """
+    스풀 세그먼트를 오래된 순서대로 DB에 적재
+    - kind=process: 연속된 레코드를 COPY로 묶어 process_data에 적재
+    - 그 밖의 kind(_SPOOL_HANDLERS): 레코드마다 한 트랜잭션 (앞 레코드의 결과에 의존하는 변경분 등)
+    세그먼트별 진행 오프셋을 같은 트랜잭션에서 spool_checkpoint에 기록하므로
+    중간에 실패하거나 재시작해도 같은 레코드를 두 번 적재하지 않음
+    같은 스풀을 두 프로세스가 동시에 재생하지 않도록 재생 내내 세션 advisory lock을 잡음
+    (다른 프로세스가 재생 중이면 이번 주기는 건너뜀)
+    return:
+        스풀을 모두 비웠는지 여부: bool
+    """
     conn = None
+    locked = False
 
     try:
         conn = get_db_connection()
         if conn is None:
-            logging.error("Database connection failed")
-            return None
+            return False
 
         cursor = conn.cursor()
+        # 트랜잭션마다 커밋하므로 xact lock이 아닌 세션 lock (연결을 닫아도 풀림)
+        cursor.execute("SELECT pg_try_advisory_lock(hashtext('spool_replay'));")
+        locked = cursor.fetchone()[0]
+        conn.commit()
+        if not locked:
+            return False
 
-        pod_id = get_or_create_pod_id(pod_name, namespace)
-
-        insert_query = """
-        INSERT INTO pod_lifecycle (
-            pod_id, created_at
-        ) VALUES (
-            %s, %s
-        ) ON CONFLICT (pod_id) 
-        DO UPDATE SET created_at = EXCLUDED.created_at;
-        """
-
-        values = (pod_id, lifecycle.createTime)
-
-        cursor.execute(insert_query, values)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS spool_checkpoint (
+            segment VARCHAR(255) PRIMARY KEY,
+            byte_offset BIGINT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """)
         conn.commit()
 
+        def commit_batch(batch, end_offset):
+            comm_ids = _copy_process_records(cursor, batch)
+            _save_spool_checkpoint(cursor, name, end_offset)
+            conn.commit()
+            _remember_comm_ids(comm_ids)
+
+        for segment in spool.segments():
+            name = os.path.basename(segment)
+            cursor.execute("SELECT byte_offset FROM spool_checkpoint WHERE segment = %s;", (name,))
+            row = cursor.fetchone()
+            offset = row[0] if row else 0
+
+            while True:
+                entries, next_offset = spool.read(segment, offset, max_records)
+                if next_offset == offset:
+                    break
+
+                batch, batch_end = [], offset
+                for end_offset, record in entries:
+                    kind = record.get("kind", "process")
+                    if kind == "process":
+                        batch.append(record)
+                        batch_end = end_offset
+                        continue
+                    if batch:
+                        commit_batch(batch, batch_end)
+                        batch = []
+                    handler = _SPOOL_HANDLERS.get(kind)
+                    after_commit = None
+                    if handler is None:
+                        logging.error(f"Skipping spool record of unknown kind {kind} in {name}")
+                    else:
+                        pod_id = get_or_create_pod_id(record["pod_name"], record["namespace"])
+                        if pod_id is None:
+                            raise psycopg2.OperationalError("pod_id lookup failed")
+                        after_commit = handler(cursor, pod_id, record)
+                    _save_spool_checkpoint(cursor, name, end_offset)
+                    conn.commit()
+                    if after_commit is not None:
+                        after_commit()
+                # 남은 process 레코드 (깨진 줄을 건너뛴 오프셋까지 포함해 기록)
+                commit_batch(batch, next_offset)
+                offset = next_offset
+
+            if spool.remove_if_drained(segment, offset):
+                cursor.execute("DELETE FROM spool_checkpoint WHERE segment = %s;", (name,))
+                conn.commit()
+                logging.info(f"Spool segment replayed: {name}")
+
+        return not spool.has_pending()
+
     except psycopg2.Error as e:
         conn.rollback()
         logging.error(f"PostgreSQL Error: {e}")
+        return False
     finally:
         if conn:
+            if locked:
+                try:
+                    cursor.execute("SELECT pg_advisory_unlock(hashtext('spool_replay'));")
+                    conn.commit()
+                except psycopg2.Error:
+                    pass  # 연결이 끊긴 경우: 세션이 끝나며 lock도 풀림
             cursor.close()
             conn.close()
 
+_SPOOL_REPLAYER = None
+
+def start_spool_replayer(interval=None):
+    """스풀 재생 스레드 시작 (프로세스당 하나)"""
+    global _SPOOL_REPLAYER
+    if _SPOOL_REPLAYER is None or not _SPOOL_REPLAYER.is_alive():
+        if interval is None:
+            interval = config.getfloat("spool", "replay_interval", fallback=10.0)
+        _SPOOL_REPLAYER = SpoolReplayer(SPOOL, replay_spool, interval)
+        _SPOOL_REPLAYER.start()
+    return _SPOOL_REPLAYER
+
+# 파드별 직전 스냅샷 (pod_id 키, 프로세스 내 메모리)
+_PROCESS_DIFFER = SnapshotDiffer()
+
+def _write_process_diff(cursor, pod_id, processes):
+    """
+    한 파드 스냅샷의 변경분 기록 (커밋은 호출 측)
+    return:
+        새로 만든 identity id: dict - 커밋 후 _PROCESS_DIFFER.commit에 전달
+    """
+    timestamp = processes[0]['timestamp']
+    diff = _PROCESS_DIFFER.diff(pod_id, processes)
+
+    cursor.execute("""
+    INSERT INTO pod_snapshot (pod_id, timestamp, process_count)
+    VALUES (%s, %s, %s) ON CONFLICT DO NOTHING;
+    """, (pod_id, timestamp, len(processes)))
+
+    identity_ids = {}
+    if diff.new_identities:
+        # 충돌은 같은 스냅샷을 다시 기록할 때(스풀 재생 등)뿐 → 기존 id를 그대로 반환
+        rows = execute_values(cursor, f"""
+        INSERT INTO process_identity (
+            pod_id, pid, starttime, static_hash, first_seen, {", ".join(STATIC_FIELDS)}
+        ) VALUES %s
+        ON CONFLICT (pod_id, pid, starttime, static_hash, first_seen)
+        DO UPDATE SET first_seen = EXCLUDED.first_seen
+        RETURNING pid, starttime, static_hash, identity_id;
+        """, [
+            (pod_id, p['pid'], p['starttime'], key[2], timestamp, *[p[f] for f in STATIC_FIELDS])
+            for p, key in ((p, (p['pid'], p['starttime'], static_hash(p))) for p in diff.new_identities)
+        ], fetch=True)
+        identity_ids = {(pid, starttime, h.strip()): identity_id for pid, starttime, h, identity_id in rows}
+
+    def identity_of(key):
+        identity_id = identity_ids.get(key)
+        return identity_id if identity_id is not None else _PROCESS_DIFFER.identity_id(pod_id, key)
+
+    gone_ids = [i for i in (identity_of(k) for k in diff.gone) if i is not None]
+    if gone_ids:
+        cursor.execute("""
+        UPDATE process_identity SET gone_at = %s WHERE identity_id = ANY(%s);
+        """, (timestamp, gone_ids))
+    if diff.first_snapshot:
+        # 재시작 등으로 직전 스냅샷이 없으면, DB에 살아 있다고 남은 다른 identity를 정리
+        cursor.execute("""
+        UPDATE process_identity SET gone_at = %s
+        WHERE pod_id = %s AND gone_at IS NULL AND NOT (identity_id = ANY(%s));
+        """, (timestamp, pod_id, list(identity_ids.values())))
+
+    if diff.samples:
+        execute_values(cursor, f"""
+        INSERT INTO process_sample (identity_id, timestamp, {", ".join(DYNAMIC_FIELDS)})
+        VALUES %s ON CONFLICT DO NOTHING;
+        """, [
+            (identity_of(key), timestamp, *[p[f] for f in DYNAMIC_FIELDS])
+            for key, p in diff.samples
+        ])
+    return identity_ids
+
+def _write_process_diff_record(cursor, pod_id, record):
+    """kind=process_diff 레코드 기록, 커밋 후 호출할 함수 반환"""
+    processes = [dict(zip(PROCESS_DATA_COLUMNS, row)) for row in record["rows"]]
+    identity_ids = _write_process_diff(cursor, pod_id, processes)
+    return lambda: _PROCESS_DIFFER.commit(pod_id, processes, identity_ids)
+
+def save_process_diff(pod_name, namespace, processes):
+    """
+    process data save to DB (변경분만)
+    - 처음 보는 프로세스: process_identity에 정적 필드 저장
+    - 동적 필드가 바뀐 프로세스만 process_sample에 저장
+    - 사라진 프로세스는 gone_at 기록
+    전체 행은 process_data_reconstructed 뷰로 조회
+    DB에 연결할 수 없거나 스풀에 재생 대기 중인 데이터가 있으면 save_to_process처럼 로컬 스풀에 기록
+    (재생 시 같은 순서로 변경분을 계산)
+    """
+    if not processes:
+        return None
+    rows = [[process.get(c) for c in PROCESS_DATA_COLUMNS] for process in processes]
+    return _save_or_spool("process_diff", pod_name, namespace, rows)
+
+def _save_or_spool(kind, pod_name, namespace, rows, spooled_result=None):
+    """
+    한 파드의 행을 _SPOOL_HANDLERS[kind]로 저장 (한 트랜잭션)
+    스풀에 재생 대기 중인 데이터가 있거나 DB에 연결할 수 없으면 스풀에 기록 → 재생 시 같은 함수로 적재
+    return:
+        True(저장), spooled_result(스풀에 기록), None(그 밖의 실패)
+    """
+    if SPOOL.has_pending():
+        SPOOL.append(pod_name, namespace, rows, kind=kind)
+        return spooled_result
 
-def save_to_process(pod_name, namespace, processes):
-    """process data save to DB"""
     conn = None
 
     try:
         conn = get_db_connection()
         if conn is None:
             logging.error("Database connection failed")
-            return None  # 연결 실패 시 None 반환
+            SPOOL.append(pod_name, namespace, rows, kind=kind)
+            return spooled_result
 
         cursor = conn.cursor()
 
         pod_id = get_or_create_pod_id(pod_name, namespace)
+        if pod_id is None:
+            SPOOL.append(pod_name, namespace, rows, kind=kind)
+            return spooled_result
 
-        insert_query = """
-        INSERT INTO process_data (
-            pod_id, timestamp, pid, comm, state, ppid, pgrp, session, tty_nr, tpgid,
-            flags, minflt, cminflt, majflt, cmajflt, utime, stime, cutime, cstime, priority,
-            nice, num_threads, itrealvalue, starttime, vsize, rss, rsslim, startcode, endcode, startstack,
-            kstkesp, kstkeip, signal, blocked, sigignore, sigcatch, wchan, nswap, cnswap, exit_signal,
-            processor, rt_priority, policy, delayacct_blkio_ticks, guest_time, cguest_time, start_data, end_data, start_brk, arg_start,
-            arg_end, env_start, env_end, exit_code
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 
-            %s, %s, %s, %s
-        )
-        """
-
-        for process in processes:
-            values = (
-                pod_id, process['timestamp'], process['pid'], process['comm'], process['state'],
-                process['ppid'], process['pgrp'], process['session'], process['tty_nr'], process['tpgid'],
-                process['flags'], process['minflt'], process['cminflt'], process['majflt'], process['cmajflt'],
-                process['utime'], process['stime'], process['cutime'], process['cstime'], process['priority'],
-                process['nice'], process['num_threads'], process['itrealvalue'], process['starttime'], process['vsize'],
-                process['rss'], process['rsslim'], process['startcode'], process['endcode'], process['startstack'],
-                process['kstkesp'], process['kstkeip'], process['signal'], process['blocked'], process['sigignore'],
-                process['sigcatch'], process['wchan'], process['nswap'], process['cnswap'], process['exit_signal'],
-                process['processor'], process['rt_priority'], process['policy'], process['delayacct_blkio_ticks'],
-                process['guest_time'], process['cguest_time'], process['start_data'], process['end_data'],
-                process['start_brk'],
-                process['arg_start'], process['arg_end'], process['env_start'], process['env_end'], process['exit_code']
-            )
-
-            cursor.execute(insert_query, values)
+        record = {"kind": kind, "pod_name": pod_name, "namespace": namespace, "rows": rows}
+        after_commit = _SPOOL_HANDLERS[kind](cursor, pod_id, record)
         conn.commit()
+        if after_commit is not None:
+            after_commit()
+        return True
+    except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+        # 연결 끊김, 타임아웃: 데이터는 스풀에 보관하고 나중에 재생
+        logging.error(f"PostgreSQL Error (spooled): {e}")
+        SPOOL.append(pod_name, namespace, rows, kind=kind)
+        return spooled_result
     except psycopg2.Error as e:
+        conn.rollback()
         logging.error(f"PostgreSQL Error: {e}")
     finally:
         if conn:
             cursor.close()
             conn.close()
 
-def save_bash_history(pod_name, namespace, last_modified):
-    """bash_history data seve to DB"""
-    conn = None
-
-    try:
-        conn = get_db_connection()
-        if conn is None:
-            logging.error("Database connection failed")
-            return None  # 연결 실패 시 None 반환
-
-        cursor = conn.cursor()
-
-        pod_id = get_or_create_pod_id(pod_name, namespace)
-
+def _write_bash_history(cursor, pod_id, record):
+    for (last_modified,) in record["rows"]:
         cursor.execute("""
         INSERT INTO bash_history (pod_id, last_modified)
         VALUES (%s, %s);
         """, (pod_id, last_modified))
 
-        conn.commit()
-    except psycopg2.Error as e:
-        logging.error(f"PostgreSQL Error: {e}")
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
-
-def save_bash_history_result(pod_name, namespace, result):
-    """save result checked hisotry in pod_lifecycle """
-    conn = None
-
-    try:
-        conn = get_db_connection()
-        if conn is None:
-            logging.error("Database connection failed")
-            return None  # 연결 실패 시 None 반환
-
-        cursor = conn.cursor()
-
-        pod_id = get_or_create_pod_id(pod_name, namespace)
-
+def _write_history_check(cursor, pod_id, record):
+    for (result,) in record["rows"]:
         cursor.execute("""
             UPDATE pod_lifecycle
             SET history_check = %s,
@@ -409,28 +1015,9 @@ def save_bash_history_result(pod_name, namespace, result):
             WHERE pod_id = %s;
         """, (result, pod_id))
 
-        conn.commit()
-    except psycopg2.Error as e:
-        logging.error(f"PostgreSQL Error: {e}")
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
-
-def save_delete_reason(pod_name, namespace, lifecycle):
-    conn = None
-
-    try:
-        conn = get_db_connection()
-        if conn is None:
-            logging.error("Database connection failed")
-            return None  # 연결 실패 시 None 반환
-
-        cursor = conn.cursor()
-
-        pod_id = get_or_create_pod_id(pod_name, namespace)
-
-        insert_query = """
+def _write_delete_reason(cursor, pod_id, record):
+    for deleted_at, reason in record["rows"]:
+        cursor.execute("""
         INSERT INTO pod_lifecycle (
             pod_id, deleted_at, delete_reason
         ) VALUES (
@@ -439,21 +1026,39 @@ def save_delete_reason(pod_name, namespace, lifecycle):
         DO UPDATE SET 
             deleted_at = EXCLUDED.deleted_at,
             delete_reason = EXCLUDED.delete_reason,
-            last_updated = CURRENT_TIMESTAMP;
-        """
-
-        values = (pod_id, lifecycle.deleteTime, lifecycle.reason_deletion)
+            last_updated = CURRENT_TIMESTAMP
+        WHERE (pod_lifecycle.deleted_at, pod_lifecycle.delete_reason)
+              IS DISTINCT FROM (EXCLUDED.deleted_at, EXCLUDED.delete_reason);
+        """, (pod_id, deleted_at, reason))
+
+    def forget():
+        # 삭제된 파드: 이후 같은 이름은 새 pod_id로 기록
+        _PROCESS_DIFFER.forget(pod_id)
+        _cache_pod_id(record["pod_name"], record["namespace"], None)
+    return forget
+
+# 스풀 레코드 종류별 기록 함수 (cursor, pod_id, record) → 커밋 후 호출할 함수 또는 None
+# (process는 replay_spool이 COPY로 묶어서 적재)
+_SPOOL_HANDLERS = {
+    "process_diff": _write_process_diff_record,
+    "pod_status": _write_pod_status,
+    "pod_lifecycle": _write_pod_lifecycle,
+    "delete_reason": _write_delete_reason,
+    "bash_history": _write_bash_history,
+    "history_check": _write_history_check,
+}
 
-        cursor.execute(insert_query, values)
+def save_bash_history(pod_name, namespace, last_modified):
+    """bash_history data seve to DB"""
+    return _save_or_spool("bash_history", pod_name, namespace, [[last_modified]])
 
-        conn.commit()
-    except psycopg2.Error as e:
-        logging.error(f"PostgreSQL Error: {e}")
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
+def save_bash_history_result(pod_name, namespace, result):
+    """save result checked hisotry in pod_lifecycle """
+    return _save_or_spool("history_check", pod_name, namespace, [[result]])
 
+def save_delete_reason(pod_name, namespace, lifecycle):
+    return _save_or_spool("delete_reason", pod_name, namespace,
+                          [[lifecycle.deleteTime, lifecycle.reason_deletion]])
 
 def get_last_bash_history(pod_name):
     """PostgreSQL에서 해당 pod의 마지막 bash_history 수정 시간을 가져옴"""
@@ -557,3 +1162,441 @@ def is_exist_in_DB(pod_name, namespace):
         if conn:
             cursor.close()
             conn.close()
+
+def check_pods_in_DB(pods):
+    """
+    여러 pod의 존재/삭제 여부를 한 번의 쿼리로 확인 (is_exist_in_DB, is_deleted_in_DB의 일괄 버전)
+    pods: [(pod_name, namespace)]
+    return:
+        {(pod_name, namespace): {'exists': bool, 'deleted': bool, 'pod_id': 살아 있는 pod_id 또는 None}}
+        DB 연결 실패 시 None
+    살아 있는 pod_id는 get_or_create_pod_id 캐시에도 저장
+    """
+    pods = list(pods)
+    if not pods:
+        return {}
+    conn = None
+
+    try:
+        conn = get_db_connection()
+        if conn is None:
+            logging.error("Database connection failed")
+            return None  # 연결 실패 시 None 반환
+
+        cursor = conn.cursor()
+
+        # exists/deleted는 기존 함수와 같이 pod_name 기준, pod_id는 (pod_name, namespace) 기준
+        cursor.execute("""
+        SELECT q.pod_name, q.namespace,
+               bool_or(pi.pod_id IS NOT NULL) AS exists,
+               bool_or(pl.pod_id IS NOT NULL AND pl.deleted_at IS NULL) AS alive,
+               min(pi.pod_id) FILTER (
+                   WHERE pi.namespace = q.namespace AND pl.deleted_at IS NULL
+               ) AS alive_pod_id
+        FROM unnest(%s::text[], %s::text[]) AS q(pod_name, namespace)
+        LEFT JOIN pod_info pi ON pi.pod_name = q.pod_name
+        LEFT JOIN pod_lifecycle pl ON pl.pod_id = pi.pod_id
+        GROUP BY q.pod_name, q.namespace;
+        """, ([name for name, _ in pods], [ns for _, ns in pods]))
+
+        result = {}
+        for pod_name, namespace, exists, alive, alive_pod_id in cursor.fetchall():
+            result[(pod_name, namespace)] = {
+                'exists': bool(exists),
+                'deleted': bool(exists) and not alive,
+                'pod_id': alive_pod_id
+            }
+            if alive_pod_id is not None:
+                _cache_pod_id(pod_name, namespace, alive_pod_id)
+        return result
+
+    except psycopg2.Error as e:
+        logging.error(f"PostgreSQL Error: {e}")
+        return None
+    finally:
+        if conn:
+            cursor.close()
+            conn.close()
+
+def init_pods_in_DB(pods):
+    """
+    새 pod들의 초기 데이터(pod_info, pod_lifecycle, pod_status)를 하나의 트랜잭션으로 저장
+    pods: [(pod_name, namespace, Pod_Lifecycle, Pod_Info)]
+    check_pods_in_DB로 캐시된 살아 있는 pod_id는 재사용하고, 없는 pod만 pod_info를 새로 만듦
+    스풀에 재생 대기 중인 데이터가 있거나 DB에 연결할 수 없으면 pod별 lifecycle/status 레코드로 스풀에 기록 (True 반환)
+    """
+    pods = list(pods)
+    if not pods:
+        return None
+
+    def spool_all():
+        for pod_name, namespace, lifecycle, info in pods:
+            SPOOL.append(pod_name, namespace, [[lifecycle.createTime]], kind="pod_lifecycle")
+            SPOOL.append(pod_name, namespace, [_pod_status_row(info)], kind="pod_status")
+        return True
+
+    if SPOOL.has_pending():
+        return spool_all()
+
+    conn = None
+
+    try:
+        conn = get_db_connection()
+        if conn is None:
+            logging.error("Database connection failed")
+            return spool_all()
+
+        cursor = conn.cursor()
+
+        # 살아 있는 pod_id가 없는 pod만 pod_info 생성
+        with _POD_ID_CACHE_LOCK:
+            pod_ids = {(name, ns): _POD_ID_CACHE.get((name, ns)) for name, ns, _, _ in pods}
+        missing = [key for key, pod_id in pod_ids.items() if pod_id is None]
+        if missing:
+            rows = execute_values(cursor, """
+            INSERT INTO pod_info (pod_name, namespace) VALUES %s RETURNING pod_name, namespace, pod_id;
+            """, missing, fetch=True)
+            for pod_name, namespace, pod_id in rows:
+                pod_ids[(pod_name, namespace)] = pod_id
+
+        execute_values(cursor, """
+        INSERT INTO pod_lifecycle (pod_id, created_at) VALUES %s
+        ON CONFLICT (pod_id) DO UPDATE SET created_at = EXCLUDED.created_at;
+        """, [(pod_ids[(name, ns)], lifecycle.createTime) for name, ns, lifecycle, _ in pods])
+
+        execute_values(cursor, """
+        INSERT INTO pod_status (
+            pod_id, creation_timestamp, deletion_timestamp,
+            generate_name, node_name, phase,
+            host_ip, pod_ip, start_time
+        ) VALUES %s
+        """ + POD_STATUS_UPSERT, [(pod_ids[(name, ns)], *_pod_status_row(info)) for name, ns, _, info in pods])
+
+        conn.commit()
+        for (pod_name, namespace), pod_id in pod_ids.items():
+            _cache_pod_id(pod_name, namespace, pod_id)
+        return True
+
+    except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+        # 연결 끊김, 타임아웃: 스풀에 보관하고 나중에 재생
+        logging.error(f"PostgreSQL Error (spooled): {e}")
+        return spool_all()
+    except psycopg2.Error as e:
+        conn.rollback()
+        logging.error(f"PostgreSQL Error: {e}")
+    finally:
+        if conn:
+            cursor.close()
+            conn.close()
+
+def save_pod_statuses(pods):
+    """
+    여러 pod의 pod_status를 한 번의 upsert로 저장 (사이클당 한 번 호출)
+    pods: [(pod_name, namespace, Pod_Info)] - 변경된 pod만 넘김
+    같은 값이면 WHERE 조건에 걸려 실제 쓰기는 일어나지 않음
+    스풀에 재생 대기 중인 데이터가 있거나 DB에 연결할 수 없으면 pod별 레코드로 스풀에 기록 (True 반환)
+    """
+    pods = [(pod_name, namespace, _pod_status_row(info)) for pod_name, namespace, info in pods]
+    if not pods:
+        return True
+
+    def spool(targets):
+        for pod_name, namespace, row in targets:
+            SPOOL.append(pod_name, namespace, [row], kind="pod_status")
+        return True
+
+    if SPOOL.has_pending():
+        return spool(pods)
+
+    conn = None
+
+    try:
+        conn = get_db_connection()
+        if conn is None:
+            logging.error("Database connection failed")
+            return spool(pods)
+
+        cursor = conn.cursor()
+
+        rows, unresolved = [], []
+        for pod_name, namespace, row in pods:
+            pod_id = get_or_create_pod_id(pod_name, namespace)
+            if pod_id is None:
+                unresolved.append((pod_name, namespace, row))
+            else:
+                rows.append((pod_id, *row))
+        if rows:
+            execute_values(cursor, """
+            INSERT INTO pod_status (
+                pod_id, creation_timestamp, deletion_timestamp,
+                generate_name, node_name, phase,
+                host_ip, pod_ip, start_time
+            ) VALUES %s
+            """ + POD_STATUS_UPSERT, rows)
+
+        conn.commit()
+        return spool(unresolved)
+
+    except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+        # 연결 끊김, 타임아웃: 스풀에 보관하고 나중에 재생
+        logging.error(f"PostgreSQL Error (spooled): {e}")
+        return spool(pods)
+    except psycopg2.Error as e:
+        conn.rollback()
+        logging.error(f"PostgreSQL Error: {e}")
+    finally:
+        if conn:
+            cursor.close()
+            conn.close()
+
+def _merge_dirty_ranges(marks, lookback_seconds):
+    """
+    (1분 버킷, pod_id) 표시 → pod별로 겹치지 않는 재계산 구간 [start, end)
+    늦게 들어온 행은 같은 프로세스의 다음 샘플(lookback 이내) 증가분도 바꾸므로 뒤로 lookback만큼 늘림
+    """
+    extend = timedelta(seconds=60 + lookback_seconds)
+    ranges = []
+    by_pod = {}
+    for bucket, pod_id in marks:
+        by_pod.setdefault(pod_id, []).append(bucket)
+    for pod_id, buckets in by_pod.items():
+        buckets.sort()
+        start, end = buckets[0], buckets[0] + extend
+        for bucket in buckets[1:]:
+            if bucket <= end:
+                end = max(end, bucket + extend)
+            else:
+                ranges.append((pod_id, start, end))
+                start, end = bucket, bucket + extend
+        ranges.append((pod_id, start, end))
+    return ranges
+
+def refresh_rollups(lookback_seconds=600, batch_marks=5000):
+    """
+    rollup_dirty에 표시된 (버킷, pod)를 원본에서 다시 계산해 롤업 테이블을 덮어씀 (몇 번 실행해도 같은 결과)
+    - 1m: 표시 구간(+ lookback)의 버킷을 지우고 원본에서 다시 집계 (직전 샘플은 lookback_seconds 안에서 찾음)
+    - 1h/1d: 1m 구간이 걸친 버킷을 한 단계 아래 해상도에서 다시 계산
+    원본은 _process_source() (process_diff = true면 변경분 복원 뷰)
+    카운터 감소(재시작, pid 재사용)와 첫 샘플은 증가분 0으로 처리
+    return:
+        처리한 표시 수 (실패 시 None)
+    """
+    conn = None
+
+    try:
+        conn = get_db_connection()
+        if conn is None:
+            logging.error("Database connection failed")
+            return None  # 연결 실패 시 None 반환
+
+        cursor = conn.cursor()
+        source = _process_source()
+
+        # 동시에 두 작업이 같은 구간을 계산하지 않도록 (다른 작업이 실행 중이면 이번 주기는 건너뜀)
+        cursor.execute("SELECT pg_try_advisory_xact_lock(hashtext('process_rollup'));")
+        if not cursor.fetchone()[0]:
+            conn.commit()
+            return 0
+
+        # 이 트랜잭션에 보이는(커밋된) 표시만 가져감, 아직 커밋 전인 표시는 다음 주기에 처리
+        cursor.execute("""
+        DELETE FROM rollup_dirty WHERE seq IN (
+            SELECT seq FROM rollup_dirty ORDER BY seq LIMIT %s
+        ) RETURNING bucket, pod_id;
+        """, (batch_marks,))
+        marks = cursor.fetchall()
+        if not marks:
+            conn.commit()
+            return 0
+
+        cursor.execute("""
+        CREATE TEMP TABLE rollup_ranges (
+            pod_id INTEGER, range_start TIMESTAMP, range_end TIMESTAMP
+        ) ON COMMIT DROP;
+        """)
+        execute_values(cursor, "INSERT INTO rollup_ranges (pod_id, range_start, range_end) VALUES %s",
+                       _merge_dirty_ranges(marks, lookback_seconds))
+
+        cursor.execute("""
+        DELETE FROM process_rollup_1m r USING rollup_ranges g
+        WHERE r.pod_id = g.pod_id AND r.bucket >= g.range_start AND r.bucket < g.range_end;
+        """)
+        cursor.execute(f"""
+        INSERT INTO process_rollup_1m (
+            bucket, pod_id, comm, samples, cpu_ticks, ctxt_switches,
+            read_bytes, write_bytes, rss_sum, rss_max
+        )
+        SELECT
+            date_trunc('minute', timestamp), pod_id, COALESCE(comm, ''), COUNT(*),
+            SUM(GREATEST(cpu - COALESCE(prev_cpu, cpu), 0)),
+            SUM(GREATEST(ctxt - COALESCE(prev_ctxt, ctxt), 0)),
+            SUM(GREATEST(rd - COALESCE(prev_rd, rd), 0)),
+            SUM(GREATEST(wr - COALESCE(prev_wr, wr), 0)),
+            SUM(COALESCE(rss, 0)), MAX(COALESCE(rss, 0))
+        FROM (
+            SELECT
+                pod_id, comm, timestamp, range_start, rss, cpu, ctxt, rd, wr,
+                LAG(cpu) OVER w AS prev_cpu, LAG(ctxt) OVER w AS prev_ctxt,
+                LAG(rd) OVER w AS prev_rd, LAG(wr) OVER w AS prev_wr
+            FROM (
+                SELECT
+                    d.id, d.pod_id, d.comm, d.timestamp, d.pid, d.starttime, d.rss, g.range_start,
+                    COALESCE(d.utime, 0) + COALESCE(d.stime, 0) AS cpu,
+                    COALESCE(d.voluntary_ctxt_switches, 0) + COALESCE(d.nonvoluntary_ctxt_switches, 0) AS ctxt,
+                    COALESCE(d.read_bytes, 0) AS rd,
+                    COALESCE(d.write_bytes, 0) AS wr
+                FROM rollup_ranges g
+                JOIN {source} d
+                  ON d.pod_id = g.pod_id
+                 AND d.timestamp >= g.range_start - make_interval(secs => %(lookback)s)
+                 AND d.timestamp < g.range_end
+            ) raw
+            WINDOW w AS (PARTITION BY pod_id, range_start, pid, starttime ORDER BY timestamp, id)
+        ) d
+        WHERE timestamp >= range_start
+        GROUP BY 1, 2, 3;
+        """, {"lookback": lookback_seconds})
+
+        # 상위 해상도: 1m 재계산 구간이 걸친 버킷을 하위 해상도에서 다시 계산
+        for coarse, fine in (("1h", "1m"), ("1d", "1h")):
+            unit, seconds = ROLLUP_RESOLUTIONS[coarse]
+            cursor.execute(f"""
+            CREATE TEMP TABLE rollup_touched_{coarse} ON COMMIT DROP AS
+            SELECT DISTINCT g.pod_id, b.bucket
+            FROM rollup_ranges g,
+                 generate_series(date_trunc('{unit}', g.range_start), g.range_end - interval '1 microsecond',
+                                 make_interval(secs => {seconds})) AS b(bucket);
+            """)
+            cursor.execute(f"""
+            DELETE FROM process_rollup_{coarse} r USING rollup_touched_{coarse} t
+            WHERE r.pod_id = t.pod_id AND r.bucket = t.bucket;
+            """)
+            cursor.execute(f"""
+            INSERT INTO process_rollup_{coarse} (
+                bucket, pod_id, comm, samples, cpu_ticks, ctxt_switches,
+                read_bytes, write_bytes, rss_sum, rss_max
+            )
+            SELECT
+                t.bucket, f.pod_id, f.comm, SUM(f.samples), SUM(f.cpu_ticks),
+                SUM(f.ctxt_switches), SUM(f.read_bytes), SUM(f.write_bytes), SUM(f.rss_sum), MAX(f.rss_max)
+            FROM rollup_touched_{coarse} t
+            JOIN process_rollup_{fine} f
+              ON f.pod_id = t.pod_id
+             AND f.bucket >= t.bucket AND f.bucket < t.bucket + make_interval(secs => {seconds})
+            GROUP BY 1, 2, 3;
+            """)
+
+        conn.commit()
+        return len(marks)
+
+    except psycopg2.Error as e:
+        conn.rollback()
+        logging.error(f"PostgreSQL Error: {e}")
+    finally:
+        if conn:
+            cursor.close()
+            conn.close()
+
+def query_rollup(resolution, start, end, pod_name=None, namespace=None, by_comm=False):
+    """
+    롤업 테이블 조회
+    resolution: ROLLUP_RESOLUTIONS 키 ('1m', '1h', '1d')
+    by_comm: True면 (pod, comm)별, False면 pod별로 합산
+    return:
+        [{'bucket', 'pod_name', 'namespace', ('comm'), 'samples', 'cpu_ticks', 'ctxt_switches',
+          'read_bytes', 'write_bytes', 'rss_avg', 'rss_max'}] (실패 시 None)
+    """
+    if resolution not in ROLLUP_RESOLUTIONS:
+        raise ValueError(f"unknown rollup resolution: {resolution}")
+    conn = None
+
+    try:
+        conn = get_db_connection()
+        if conn is None:
+            logging.error("Database connection failed")
+            return None  # 연결 실패 시 None 반환
+
+        cursor = conn.cursor()
+
+        group_cols = "r.bucket, p.pod_name, p.namespace" + (", r.comm" if by_comm else "")
+        conditions = ["r.bucket >= %s", "r.bucket < %s"]
+        params = [start, end]
+        if pod_name is not None:
+            conditions.append("p.pod_name = %s")
+            params.append(pod_name)
+        if namespace is not None:
+            conditions.append("p.namespace = %s")
+            params.append(namespace)
+
+        cursor.execute(f"""
+        SELECT {group_cols},
+            SUM(r.samples), SUM(r.cpu_ticks), SUM(r.ctxt_switches),
+            SUM(r.read_bytes), SUM(r.write_bytes),
+            SUM(r.rss_sum)::float / NULLIF(SUM(r.samples), 0), MAX(r.rss_max)
+        FROM process_rollup_{resolution} r
+        JOIN pod_info p ON p.pod_id = r.pod_id
+        WHERE {" AND ".join(conditions)}
+        GROUP BY {group_cols}
+        ORDER BY {group_cols};
+        """, params)
+
+        keys = ["bucket", "pod_name", "namespace"] + (["comm"] if by_comm else []) + [
+            "samples", "cpu_ticks", "ctxt_switches", "read_bytes", "write_bytes", "rss_avg", "rss_max"
+        ]
+        return [dict(zip(keys, row)) for row in cursor.fetchall()]
+
+    except psycopg2.Error as e:
+        logging.error(f"PostgreSQL Error: {e}")
+    finally:
+        if conn:
+            cursor.close()
+            conn.close()
+
+def query_process_data(start, end, pod_name=None, namespace=None, columns=None):
+    """
+    [start, end) 구간의 process_data 행 조회 (compact 스키마면 복원 뷰에서 조회)
+    columns: PROCESS_DATA_COLUMNS 중 일부 (없으면 전체)
+    return:
+        [{'pod_name', 'namespace', 컬럼...}] (실패 시 None)
+    """
+    columns = list(columns or PROCESS_DATA_COLUMNS)
+    unknown = set(columns) - set(PROCESS_DATA_COLUMNS)
+    if unknown:
+        raise ValueError(f"unknown process_data columns: {sorted(unknown)}")
+    conn = None
+
+    try:
+        conn = get_db_connection()
+        if conn is None:
+            logging.error("Database connection failed")
+            return None  # 연결 실패 시 None 반환
+
+        cursor = conn.cursor()
+
+        conditions = ["d.timestamp >= %s", "d.timestamp < %s"]
+        params = [start, end]
+        if pod_name is not None:
+            conditions.append("p.pod_name = %s")
+            params.append(pod_name)
+        if namespace is not None:
+            conditions.append("p.namespace = %s")
+            params.append(namespace)
+
+        cursor.execute(f"""
+        SELECT p.pod_name, p.namespace, {", ".join("d." + c for c in columns)}
+        FROM {_process_source()} d
+        JOIN pod_info p ON p.pod_id = d.pod_id
+        WHERE {" AND ".join(conditions)}
+        ORDER BY d.timestamp, d.id;
+        """, params)
+
+        keys = ["pod_name", "namespace"] + columns
+        return [dict(zip(keys, row)) for row in cursor.fetchall()]
+
+    except psycopg2.Error as e:
+        logging.error(f"PostgreSQL Error: {e}")
+        return None
+    finally:
+        if conn:
+            cursor.close()
+            conn.close()
@@ -0,0 +1,59 @@
+from typing import Dict, Optional
+
+import numpy as np
+
+class ActivityScorer:
+    """
+    여러 신호를 결합한 활동 점수 계산 (파드 내 모든 프로세스를 벡터 연산으로 한 번에 평가)
+    신호:
+      - cpu: CPU 활동률 (0.0 ~ 1.0)
+      - ctxt: 컨텍스트 스위치율 (회/초, 호출 측에서 자체 CPU/I/O 활동이 있는 프로세스에만 전달)
+      - io: 프로세스 I/O 바이트율 (bytes/초)
+      - rss: RSS 변화량 (bytes/초, 절대값)
+      - cgroup_io: 파드(cgroup) I/O 바이트율 (bytes/초, 호출 측에서 자체 활동이 있는 프로세스에만 전달)
+    점수 = sum(weight * min(신호 / scale, 1)) / sum(weight), 0.0 ~ 1.0
+    값이 없는 신호(NaN)는 0으로 간주
+    """
+    SIGNALS = ('cpu', 'ctxt', 'io', 'rss', 'cgroup_io')
+
+    def __init__(self, weights: Dict[str, float], scales: Dict[str, float]):
+        missing = [sig for sig in self.SIGNALS if sig not in weights or sig not in scales]
+        if missing:
+            raise KeyError(f"weights/scales missing signals: {missing}")
+        if any(scales[sig] <= 0 for sig in self.SIGNALS):
+            raise ValueError("scales must be positive")
+
+        self.weights = np.array([weights[sig] for sig in self.SIGNALS], dtype=np.float64)
+        self.scales = np.array([scales[sig] for sig in self.SIGNALS], dtype=np.float64)
+        total = self.weights.sum()
+        if total <= 0:
+            raise ValueError("sum of weights must be positive")
+        self.weights = self.weights / total
+
+    def score(self, signals: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        signals: 신호별 (n,) 배열 (스칼라는 모든 프로세스에 broadcast)
+        return:
+            프로세스별 활동 점수: np.ndarray (n,)
+        """
+        n = max((np.size(v) for v in signals.values()), default=0)
+        matrix = np.zeros((n, len(self.SIGNALS)), dtype=np.float64)
+        for i, sig in enumerate(self.SIGNALS):
+            value = signals.get(sig)
+            if value is None:
+                continue
+            matrix[:, i] = np.broadcast_to(np.asarray(value, dtype=np.float64), (n,))
+
+        normalized = np.clip(np.nan_to_num(matrix / self.scales, nan=0.0), 0.0, 1.0)
+        return normalized @ self.weights
+
+def rate(current: np.ndarray, previous: np.ndarray, time_diff: Optional[float], absolute: bool = False) -> np.ndarray:
+    """
+    누적값(또는 게이지) 배열의 초당 변화율
+    이전 값이 없으면(NaN) 결과도 NaN
+    """
+    if time_diff is None or time_diff <= 0:
+        return np.full(np.shape(current), np.nan)
+    diff = np.asarray(current, dtype=np.float64) - np.asarray(previous, dtype=np.float64)
+    diff = np.abs(diff) if absolute else np.clip(diff, 0, None)
+    return diff / time_diff
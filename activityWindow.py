@@ -0,0 +1,120 @@
+from array import array
+from collections import deque
+from typing import Dict, Optional
+
+class ProcessActivityWindow:
+    """
+    프로세스별 활동 이력 (슬라이딩 윈도우)
+    - 최근 N개 샘플을 고정 크기 배열(링 버퍼)에 저장: CPU 활동률, 컨텍스트 스위치율, I/O 바이트율
+    - 신호별 EWMA 유지
+    - 구간(예: 1h, 24h) 최대값은 단조 큐로 관리하여 O(1)로 조회
+    """
+    SIGNALS = ('cpu', 'ctxt', 'io')
+
+    def __init__(self, size: int = 1440, alpha: float = 0.3, windows: tuple = (3600, 86400)):
+        self.size = size
+        self.alpha = alpha
+        self.windows = tuple(windows)
+
+        # 링 버퍼 (timestamp는 double, 신호 값은 float로 저장)
+        self.timestamps = array('d', bytes(8 * size))
+        self.values: Dict[str, array] = {sig: array('f', bytes(4 * size)) for sig in self.SIGNALS}
+        self.head = 0    # 다음에 쓸 위치
+        self.count = 0   # 저장된 샘플 수
+
+        self.ewma: Dict[str, Optional[float]] = {sig: None for sig in self.SIGNALS}
+
+        # (신호, 윈도우)별 단조 감소 큐: (timestamp, value)
+        self._max_queues: Dict[tuple, deque] = {
+            (sig, w): deque() for sig in self.SIGNALS for w in self.windows
+        }
+
+        # 누적 카운터 → 비율 계산용 이전 값 (timestamp, ctxt_total, io_total)
+        self._last_counters: Optional[tuple] = None
+        self.last_timestamp: Optional[float] = None
+
+    def update(self, timestamp: float, cpu_activity: Optional[float],
+               ctxt_total: Optional[int] = None, io_total: Optional[int] = None):
+        """
+        새 샘플 추가
+        ctxt_total, io_total은 누적값이며 이전 샘플과의 차이로 초당 비율을 계산
+        """
+        ctxt_rate = io_rate = None
+        if self._last_counters is not None:
+            prev_ts, prev_ctxt, prev_io = self._last_counters
+            time_diff = timestamp - prev_ts
+            if time_diff > 0:
+                if ctxt_total is not None and prev_ctxt is not None:
+                    ctxt_rate = max(0, ctxt_total - prev_ctxt) / time_diff
+                if io_total is not None and prev_io is not None:
+                    io_rate = max(0, io_total - prev_io) / time_diff
+        self._last_counters = (timestamp, ctxt_total, io_total)
+
+        # 활동률을 계산할 수 없는 첫 샘플은 이력에 넣지 않음
+        if cpu_activity is None:
+            return
+
+        sample = {
+            'cpu': cpu_activity,
+            'ctxt': ctxt_rate or 0.0,
+            'io': io_rate or 0.0,
+        }
+
+        self.timestamps[self.head] = timestamp
+        for sig, value in sample.items():
+            self.values[sig][self.head] = value
+            prev = self.ewma[sig]
+            self.ewma[sig] = value if prev is None else self.alpha * value + (1 - self.alpha) * prev
+
+            for w in self.windows:
+                q = self._max_queues[(sig, w)]
+                while q and q[-1][1] <= value:
+                    q.pop()
+                q.append((timestamp, value))
+                while q and q[0][0] < timestamp - w:
+                    q.popleft()
+
+        self.head = (self.head + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        self.last_timestamp = timestamp
+
+    def max(self, signal: str = 'cpu', window: int = 3600) -> Optional[float]:
+        """
+        최근 window초 동안의 최대값
+        return:
+            None or 최대값: float (이력이 없으면 None)
+        """
+        q = self._max_queues.get((signal, window))
+        if q is None:
+            raise KeyError(f"window {window} is not tracked (tracked: {self.windows})")
+        if self.last_timestamp is not None:
+            while q and q[0][0] < self.last_timestamp - window:
+                q.popleft()
+        return q[0][1] if q else None
+
+    def percentile(self, signal: str = 'cpu', q: float = 0.95, window: Optional[int] = None) -> Optional[float]:
+        """
+        링 버퍼 안의 샘플로 백분위수 계산 (nearest-rank)
+        window를 지정하면 최근 window초 샘플만 사용
+        """
+        if self.count == 0:
+            return None
+        start = (self.head - self.count) % self.size
+        samples = []
+        for i in range(self.count):
+            idx = (start + i) % self.size
+            if window is not None and self.timestamps[idx] < self.last_timestamp - window:
+                continue
+            samples.append(self.values[signal][idx])
+        if not samples:
+            return None
+        samples.sort()
+        rank = min(len(samples) - 1, max(0, int(round(q * len(samples))) - 1))
+        return samples[rank]
+
+    def memory_usage(self) -> int:
+        """링 버퍼 배열의 메모리 사용량 (bytes)"""
+        size = self.timestamps.buffer_info()[1] * self.timestamps.itemsize
+        for values in self.values.values():
+            size += values.buffer_info()[1] * values.itemsize
+        return size
@@ -0,0 +1,127 @@
+"""
+실험 데이터 Parquet 저장용 싱크 (CSV 싱크와 함께 사용)
+- 컬럼 타입 고정, pod_name/comm/state 등 반복 문자열은 dictionary 인코딩
+- 사이클 동안 행을 메모리에 모았다가 end_cycle_all()에서 사이클 하나를 파일 하나(row group 하나)로 기록
+- 경로: <root>/<dataset>/experiment_id=<id>/cycle=<n>/part-<pid>.parquet (hive 파티션)
+pyarrow가 없으면 ARROW_AVAILABLE = False 이며 싱크를 만들 수 없음
+"""
+import os
+import threading
+from typing import Dict, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    ARROW_AVAILABLE = True
+except ImportError:
+    pa = pq = None
+    ARROW_AVAILABLE = False
+
+# /proc/[pid]/stat 중 unsigned long(주소, 비트맵, 한도) 컬럼: int64 범위를 넘을 수 있음
+UINT64_FIELDS = {
+    "vsize", "rsslim", "startcode", "endcode", "startstack", "kstkesp", "kstkeip",
+    "signal", "blocked", "sigignore", "sigcatch", "wchan",
+    "start_data", "end_data", "start_brk", "arg_start", "arg_end", "env_start", "env_end"
+}
+INT32_FIELDS = {
+    "pid", "ppid", "pgrp", "session", "tty_nr", "tpgid", "exit_signal", "processor",
+    "rt_priority", "priority", "nice", "num_threads", "exit_code"
+}
+DICTIONARY_FIELDS = {"pod_name", "comm", "state", "policy", "role", "reason", "policy_version", "note"}
+FLOAT_FIELDS = {"score"}
+
+def _field(name: str):
+    if name == "timestamp":
+        return pa.field(name, pa.timestamp("s"))
+    if name in DICTIONARY_FIELDS:
+        return pa.field(name, pa.dictionary(pa.int32(), pa.string()))
+    if name in UINT64_FIELDS:
+        return pa.field(name, pa.uint64())
+    if name in INT32_FIELDS:
+        return pa.field(name, pa.int32())
+    if name in FLOAT_FIELDS:
+        return pa.field(name, pa.float64())
+    return pa.field(name, pa.int64())
+
+def schema_for(columns: List[str], string_columns: tuple = ()):
+    """
+    컬럼 이름 목록으로 스키마 생성 (이름별 타입 규칙 적용)
+    string_columns: 규칙과 관계없이 일반 문자열로 둘 컬럼
+    """
+    return pa.schema([
+        pa.field(c, pa.string()) if c in string_columns else _field(c)
+        for c in columns
+    ])
+
+class ArrowSink:
+    """
+    데이터셋 하나(예: process_metrics)의 한 실험에 대한 Parquet writer
+    write(): 행(dict) 목록 추가 (스레드 안전, 파일 I/O 없음)
+    end_cycle(): 모인 행을 사이클 파티션 파일로 기록하고 다음 사이클로 이동
+    """
+    def __init__(self, root: str, dataset: str, experiment_id, schema, compression: str = "zstd"):
+        self.schema = schema
+        self.compression = compression
+        self.base_dir = os.path.join(root, dataset, f"experiment_id={experiment_id}")
+        self.cycle = self._next_cycle()
+        self._rows: List[dict] = []
+        self._lock = threading.Lock()
+
+    def _next_cycle(self) -> int:
+        """같은 실험을 이어서 기록하는 경우 기존 사이클 다음 번호부터 시작"""
+        if not os.path.isdir(self.base_dir):
+            return 0
+        cycles = [
+            int(d.split("=", 1)[1]) for d in os.listdir(self.base_dir)
+            if d.startswith("cycle=") and d.split("=", 1)[1].isdigit()
+        ]
+        return max(cycles) + 1 if cycles else 0
+
+    def write(self, rows: List[dict]):
+        if rows:
+            with self._lock:
+                self._rows.extend(rows)
+
+    def end_cycle(self) -> Optional[str]:
+        """
+        return:
+            기록한 파일 경로 (행이 없으면 None, 사이클 번호는 그래도 증가)
+        """
+        with self._lock:
+            rows, self._rows = self._rows, []
+            cycle = self.cycle
+            self.cycle += 1
+        if not rows:
+            return None
+
+        table = pa.Table.from_pylist(rows, schema=self.schema)
+        cycle_dir = os.path.join(self.base_dir, f"cycle={cycle}")
+        os.makedirs(cycle_dir, exist_ok=True)
+        path = os.path.join(cycle_dir, f"part-{os.getpid()}.parquet")
+        pq.write_table(table, path, compression=self.compression, row_group_size=max(1, table.num_rows))
+        return path
+
+_SINKS: Dict[tuple, ArrowSink] = {}
+_SINKS_LOCK = threading.Lock()
+
+def get_arrow_sink(root: str, dataset: str, experiment_id, schema) -> ArrowSink:
+    """(경로, 데이터셋, 실험 번호)별로 하나의 싱크를 공유"""
+    if not ARROW_AVAILABLE:
+        raise RuntimeError("pyarrow is required for parquet experiment output")
+    key = (os.path.abspath(root), dataset, experiment_id)
+    with _SINKS_LOCK:
+        sink = _SINKS.get(key)
+        if sink is None:
+            sink = ArrowSink(key[0], dataset, experiment_id, schema)
+            _SINKS[key] = sink
+        return sink
+
+def end_cycle_all():
+    """사이클 경계에서 호출: 모든 Parquet 싱크의 이번 사이클 기록"""
+    with _SINKS_LOCK:
+        sinks = list(_SINKS.values())
+    for sink in sinks:
+        try:
+            sink.end_cycle()
+        except Exception as e:
+            print(f"[PARQUET SINK] Failed to write cycle {sink.cycle - 1} of {sink.base_dir}: {e}")
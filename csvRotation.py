@@ -0,0 +1,53 @@
+"""
+CsvSink가 교체(rotate)한 CSV 파일의 이름 규칙과 조각 찾기
+- 교체된 파일: '<이름>.<YYYYmmddTHHMMSS>[-n]<확장자>' (예: process_metrics_experiment3.20250101T120000.csv)
+  → 'process_metrics_experiment*.csv' 같은 glob에도 걸리므로 로더는 base_path로 묶은 뒤 csv_parts 순서로 읽음
+- 원래 이름의 파일이 가장 최근 조각 (교체 직후에는 없을 수 있음)
+fcntl 등 플랫폼 의존 모듈 없이 분석 도구에서도 import 가능
+"""
+import os
+import re
+from datetime import datetime, timezone
+from typing import Iterable, List
+
+ROTATED_REGEX = re.compile(r"^(?P<stem>.+)\.(?P<stamp>\d{8}T\d{6})(?:-(?P<seq>\d+))?(?P<ext>\.[^.]+)$")
+
+def rotated_path(path: str) -> str:
+    """path를 옮길 교체 이름 (현재 시각, 이미 있으면 -1, -2 ...)"""
+    stem, ext = os.path.splitext(path)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    rotated = f"{stem}.{stamp}{ext}"
+    n = 1
+    while os.path.exists(rotated):
+        rotated = f"{stem}.{stamp}-{n}{ext}"
+        n += 1
+    return rotated
+
+def base_path(path: str) -> str:
+    """교체된 조각이면 원래 파일 경로, 아니면 그대로"""
+    m = ROTATED_REGEX.match(os.path.basename(path))
+    if m is None:
+        return path
+    return os.path.join(os.path.dirname(path), m.group("stem") + m.group("ext"))
+
+def csv_parts(path: str) -> List[str]:
+    """
+    원래 파일 경로(또는 그 조각) → 존재하는 조각 경로 목록 (오래된 순서, 원래 이름 파일이 마지막)
+    """
+    base = base_path(str(path))
+    directory = os.path.dirname(base) or "."
+    stem, ext = os.path.splitext(os.path.basename(base))
+    parts = []
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            m = ROTATED_REGEX.match(name)
+            if m and m.group("stem") == stem and m.group("ext") == ext:
+                parts.append(((m.group("stamp"), int(m.group("seq") or 0)), os.path.join(os.path.dirname(base), name)))
+    result = [p for _, p in sorted(parts)]
+    if os.path.exists(base):
+        result.append(base)
+    return result
+
+def group_parts(paths: Iterable[str]) -> List[str]:
+    """glob 결과 등 조각이 섞인 경로 목록 → 중복 없는 원래 파일 경로 목록 (정렬)"""
+    return sorted({base_path(str(p)) for p in paths})
@@ -0,0 +1,198 @@
+"""
+실험 데이터 CSV 저장용 스트리밍 싱크
+- 작업 스레드는 행을 큐에 넣기만 하고, 파일마다 하나의 writer 스레드가 행을 메모리 버퍼에 모아 기록
+- 버퍼가 buffer_size를 넘거나 사이클 경계의 flush_all()에서 파일에 반영
+- 기록은 파일 잠금(flock) 상태에서 os.write 한 번(O_APPEND) → 여러 프로세스가 같은 파일에 써도 행이 섞이지 않음
+- 크기(rotate_bytes) 또는 시간(rotate_seconds) 기준으로 파일 교체
+  (교체된 파일은 '<이름>.<시각>.csv'로 바뀌며(csvRotation), 현재 파일은 항상 원래 이름 유지
+   → 로더는 csvRotation.csv_parts로 조각을 순서대로 이어서 읽음)
+  다른 프로세스가 교체하면 다음 기록 때 inode가 바뀐 것을 보고 새 파일을 다시 엶
+- 헤더는 잠금 상태에서 파일 크기가 0일 때만 기록 → 한 번만 기록
+  기존 파일의 헤더가 다르면(컬럼 추가 등) 기존 파일을 교체 이름으로 옮기고 새 파일 시작
+"""
+import atexit
+import fcntl
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+from csvRotation import rotated_path
+
+_FLUSH = object()
+_CLOSE = object()
+
+class CsvSink:
+    """
+    파일 하나에 대한 비동기 CSV writer
+    write(): 이미 ','로 연결된 행 문자열 목록을 큐에 추가 (파일 I/O 없음)
+    flush(): 지금까지 넣은 행이 파일에 기록될 때까지 대기
+    """
+    def __init__(self, path: str, header: List[str], buffer_size: int = 1 << 20,
+                 rotate_bytes: Optional[int] = None, rotate_seconds: Optional[float] = None):
+        self.path = path
+        self.header = (",".join(header) + "\n").encode("utf-8")
+        self.buffer_size = buffer_size
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._buffer = bytearray()
+        self._fd: Optional[int] = None
+        self._opened_at = 0.0
+        self._error: Optional[Exception] = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name=f"csv-sink:{os.path.basename(path)}", daemon=True)
+        self._thread.start()
+
+    def write(self, rows: List[str]):
+        if rows:
+            self._queue.put(rows)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        return:
+            기록 완료 여부: bool (timeout 초과 시 False)
+        """
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        return done.wait(timeout)
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put((_CLOSE, None))
+            self._thread.join()
+
+    def _open_fd(self):
+        self._fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        self._opened_at = time.monotonic()
+
+    def _close_fd(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _is_current(self) -> bool:
+        """열어 둔 파일이 아직 self.path인지 (다른 프로세스가 교체했으면 False)"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        fst = os.fstat(self._fd)
+        return (st.st_dev, st.st_ino) == (fst.st_dev, fst.st_ino)
+
+    def _lock_current(self):
+        """현재 파일을 열고 잠금 (잠그는 사이 교체되었으면 새 파일로 다시 시도)"""
+        while True:
+            if self._fd is None:
+                self._open_fd()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            if self._is_current():
+                return
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self._close_fd()
+
+    def _header_matches(self) -> bool:
+        """잠금 상태에서 호출: 빈 파일이면 헤더를 쓰고 True, 기존 헤더가 다르면 False"""
+        size = os.fstat(self._fd).st_size
+        if size == 0:
+            self._write_all(self.header)
+            return True
+        return os.pread(self._fd, len(self.header), 0) == self.header
+
+    def _write_all(self, data: bytes):
+        view = memoryview(data)
+        while view:
+            n = os.write(self._fd, view)
+            view = view[n:]
+
+    def _should_rotate(self) -> bool:
+        if self.rotate_bytes is not None and os.fstat(self._fd).st_size >= self.rotate_bytes:
+            return True
+        if self.rotate_seconds is not None and time.monotonic() - self._opened_at >= self.rotate_seconds:
+            return True
+        return False
+
+    def _move_aside(self):
+        """잠금 상태에서 호출: 현재 파일을 '<이름>.<시각>.csv'로 옮김"""
+        os.replace(self.path, rotated_path(self.path))
+
+    def _write_out(self):
+        """버퍼의 행을 잠금 상태에서 한 번에 기록"""
+        if not self._buffer:
+            return
+        self._lock_current()
+        try:
+            while not self._header_matches():
+                # 헤더가 다른 기존 파일 → 옮기고 새 파일을 다시 잠금
+                self._move_aside()
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+                self._close_fd()
+                self._lock_current()
+            self._write_all(self._buffer)
+            self._buffer.clear()
+            rotate = self._should_rotate()
+            if rotate:
+                self._move_aside()
+        finally:
+            if self._fd is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        if rotate:
+            self._close_fd()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if isinstance(item, tuple) and item[0] is _FLUSH:
+                    self._write_out()
+                    item[1].set()
+                    continue
+                if isinstance(item, tuple) and item[0] is _CLOSE:
+                    self._write_out()
+                    self._close_fd()
+                    return
+
+                self._buffer += ("\n".join(item) + "\n").encode("utf-8")
+                if len(self._buffer) >= self.buffer_size:
+                    self._write_out()
+            except Exception as e:
+                # 기록 실패는 수집을 멈추지 않도록 로그만 남김 (버퍼는 다음 기록 때 다시 시도)
+                self._error = e
+                print(f"[CSV SINK] Failed to write {self.path}: {e}")
+                if isinstance(item, tuple) and item[0] is _FLUSH:
+                    item[1].set()
+                if isinstance(item, tuple) and item[0] is _CLOSE:
+                    self._close_fd()
+                    return
+
+_SINKS: Dict[str, CsvSink] = {}
+_SINKS_LOCK = threading.Lock()
+
+def get_sink(path: str, header: List[str], **options) -> CsvSink:
+    """경로별로 하나의 싱크(writer 스레드)를 공유"""
+    path = os.path.abspath(path)
+    with _SINKS_LOCK:
+        sink = _SINKS.get(path)
+        if sink is None:
+            sink = CsvSink(path, header, **options)
+            _SINKS[path] = sink
+        return sink
+
+def flush_all(timeout: Optional[float] = None):
+    """사이클 경계에서 호출: 모든 싱크의 대기 중인 행을 파일에 기록"""
+    with _SINKS_LOCK:
+        sinks = list(_SINKS.values())
+    for sink in sinks:
+        sink.flush(timeout)
+
+def close_all():
+    with _SINKS_LOCK:
+        sinks = list(_SINKS.values())
+        _SINKS.clear()
+    for sink in sinks:
+        sink.close()
+
+atexit.register(close_all)
@@ -0,0 +1,151 @@
+"""
+DB 장애/지연 시 사용하는 로컬 스풀 (append-only 세그먼트 파일)
+- 한 줄 = 한 레코드(JSON): {"kind", "pod_name", "namespace", "rows"}, 기록 후 fsync
+  (kind: process(process_data 행, 기본값), process_diff(변경분 저장용 전체 행),
+   pod_status, pod_lifecycle, delete_reason, bash_history, history_check)
+- 세그먼트: spool-<시각>.log, rotate_bytes를 넘으면 새 세그먼트
+- 스풀에 남은 데이터가 있으면 새 행도 스풀로 보내 순서 유지 (has_pending)
+- 기록은 세그먼트 파일 잠금(flock) 안에서 한 번에 쓰므로, 잠금을 잡은 상태에서 보이는 끊긴 마지막 줄은
+  기록 도중 중단된 잔해 → 재생이 끝나면 세그먼트와 함께 버림
+- 재생은 DB_postgresql.replay_spool이 담당하며, 진행 위치(세그먼트, 오프셋)는 같은 트랜잭션에서
+  DB의 spool_checkpoint에 기록 → 재생 도중 실패해도 중복 없이 이어서 재생
+"""
+import fcntl
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
+
+SEGMENT_PREFIX = "spool-"
+SEGMENT_SUFFIX = ".log"
+
+class Spool:
+    def __init__(self, directory: str, rotate_bytes: int = 64 << 20):
+        self.directory = directory
+        self.rotate_bytes = rotate_bytes
+        self._lock = threading.Lock()
+        self._current: Optional[str] = None
+
+    def segments(self) -> List[str]:
+        """오래된 순서의 세그먼트 경로 목록"""
+        if not os.path.isdir(self.directory):
+            return []
+        return [
+            os.path.join(self.directory, name) for name in sorted(os.listdir(self.directory))
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        ]
+
+    def has_pending(self) -> bool:
+        return bool(self.segments())
+
+    def _segment_for_append(self) -> str:
+        path = self._current
+        if path is not None and os.path.exists(path):
+            size = os.path.getsize(path)
+            if size < self.rotate_bytes and not self._has_partial_tail(path, size):
+                return path
+        suffix = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        self._current = os.path.join(self.directory, f"{SEGMENT_PREFIX}{suffix}{SEGMENT_SUFFIX}")
+        return self._current
+
+    @staticmethod
+    def _has_partial_tail(path: str, size: int) -> bool:
+        """기록 도중 중단되어 마지막 줄이 끊긴 세그먼트에는 이어 쓰지 않음"""
+        if size == 0:
+            return False
+        with open(path, "rb") as f:
+            f.seek(size - 1)
+            return f.read(1) != b"\n"
+
+    def append(self, pod_name: str, namespace: str, rows: List[list], kind: str = "process"):
+        if not rows:
+            return
+        line = json.dumps({"kind": kind, "pod_name": pod_name, "namespace": namespace, "rows": rows},
+                          separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._segment_for_append()
+            while True:
+                f = open(path, "a", encoding="utf-8")
+                fcntl.flock(f, fcntl.LOCK_EX)
+                # 잠금을 기다리는 사이 다른 프로세스가 재생을 마치고 지웠으면 다시 열기
+                try:
+                    if os.path.samestat(os.fstat(f.fileno()), os.stat(path)):
+                        break
+                except FileNotFoundError:
+                    pass
+                f.close()
+            with f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def read(self, path: str, offset: int, max_records: int) -> Tuple[List[Tuple[int, dict]], int]:
+        """
+        offset부터 완전한 줄(레코드)을 최대 max_records개 읽음
+        return:
+            ([(레코드 끝 오프셋, 레코드)], 다음 오프셋) - 깨진 줄은 건너뛰되 오프셋은 진행
+        """
+        records = []
+        with open(path, "rb") as f:
+            f.seek(offset)
+            while len(records) < max_records:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break  # 아직 기록 중이거나 끊긴 마지막 줄
+                offset += len(line)
+                try:
+                    records.append((offset, json.loads(line)))
+                except ValueError as e:
+                    print(f"[SPOOL] Skipping corrupt record in {path}: {e}")
+        return records, offset
+
+    def remove_if_drained(self, path: str, offset: int) -> bool:
+        """
+        끝까지 재생한 세그먼트 삭제 (그 사이 새 레코드가 붙었으면 유지)
+        offset 뒤에 줄바꿈 없는 끊긴 기록만 남았으면 그 잔해와 함께 삭제
+        """
+        with self._lock:
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                return False
+            with f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                f.seek(offset)
+                tail = f.read()
+                if b"\n" in tail:
+                    return False  # 아직 재생하지 않은 완전한 레코드가 있음
+                if tail:
+                    print(f"[SPOOL] Dropping partial record ({len(tail)} bytes) at the end of {path}")
+                os.remove(path)
+            if self._current == path:
+                self._current = None
+            return True
+
+class SpoolReplayer(threading.Thread):
+    """
+    interval 초마다 replay()를 호출해 스풀을 비움
+    replay: 스풀을 받아 재생하고, 남은 데이터가 없으면 True를 반환하는 함수
+    """
+    def __init__(self, spool: Spool, replay: Callable[[Spool], bool], interval: float = 10.0):
+        super().__init__(name="db-spool-replayer", daemon=True)
+        self.spool = spool
+        self.replay = replay
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            if self.spool.has_pending():
+                try:
+                    self.replay(self.spool)
+                except Exception as e:
+                    # 재생 실패는 다음 주기에 다시 시도
+                    print(f"[SPOOL] Replay failed: {e}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop_event.set()
+        self.join(timeout)
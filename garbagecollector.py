@@ -1,7 +1,8 @@
 from kubernetes import client, config
 from pod import Pod
 # from processDB import initialize_database
-from DB_postgresql import initialize_database, is_deleted_in_DB, is_exist_in_DB
+from storageBackend import get_storage_backend
+from processStateStore import PROCESS_STATE_STORE
 
 from datetime import datetime
 import time
@@ -23,15 +24,16 @@ class GarbageCollector():
     def manage(self):
         if self.devMode is True:
             self.namespace = 'gc-simulator'
+        get_storage_backend().start_background_jobs()
 
         while True:
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             print(f"{timestamp} Update Pod List...")
             self.getPodList()
+            self.savePodStatuses()
             print('='*10+f"Start to Check Process Data {self.count} times"+'='*10)
             for p_name, p_obj in self.podlist.items():
                 print(p_name)
-                p_obj.insert_Pod_Info()
 
                 should_gc, gc_reason, type = p_obj.shouldGarbageCollection()
 
@@ -48,6 +50,7 @@ class GarbageCollector():
 
                 print('-' * 50)
 
+            self.reportStateMemory()
             print("Clear!!\n\n")
             self.count+=1
             if self._stop_event.is_set():
@@ -63,6 +66,7 @@ class GarbageCollector():
             print(f"No resources found in {self.namespace} namespace.")
             self.recordDeletedPod(self.podlist)
             self.podlist = {}
+            PROCESS_STATE_STORE.retain(())
             return
 
         #제외할 pod 필터링
@@ -74,24 +78,64 @@ class GarbageCollector():
             )
         ]
         new_podlist = {}
+        new_pods = []
         for p in filtering_pods:
             pod_name = p.metadata.name
             if pod_name in self.podlist:
-                #기존 Pod객체 재사용
+                #기존 Pod객체 재사용 (phase, IP 등 변경 감지를 위해 최신 pod 객체로 교체)
                 new_podlist[pod_name] = self.podlist[pod_name]
+                new_podlist[pod_name].pod = p
             else:
                 new_podlist[pod_name] = Pod(self.v1, p)
-                pod_obj = new_podlist[pod_name]
-
-                if not pod_obj.is_exist_in_DB() or pod_obj.is_deleted_in_DB():
-                    print(f"Initializing new pod: {pod_name}")
-                    pod_obj.init_pod_data()
+                new_pods.append(new_podlist[pod_name])
+
+        # 새 pod들의 DB 존재/삭제 여부를 한 번에 확인하고, 초기화가 필요한 pod는 한 트랜잭션으로 저장
+        if new_pods:
+            states = get_storage_backend().check_pods([(p.pod_name, p.namespace) for p in new_pods])
+            if states is None:
+                # 확인 실패 시 기존과 같이 모두 초기화 시도
+                targets = new_pods
+            else:
+                targets = [
+                    p for p in new_pods
+                    if not states[(p.pod_name, p.namespace)]['exists'] or states[(p.pod_name, p.namespace)]['deleted']
+                ]
+            for p in targets:
+                print(f"Initializing new pod: {p.pod_name}")
+            if get_storage_backend().init_pods([p.prepare_init_data() for p in targets]):
+                for p in targets:
+                    p.mark_pod_status_saved()
 
         removed_pod = set(self.podlist.keys()) - set(new_podlist.keys())
         self.recordDeletedPod(removed_pod)
 
         # 새로운 목록으로 변경
         self.podlist = new_podlist
+        # 목록에서 빠진 파드의 프로세스 상태 제거
+        PROCESS_STATE_STORE.retain(self.podlist.keys())
+
+    def savePodStatuses(self):
+        """
+        모든 pod의 상태를 갱신하고, 마지막 저장 이후 바뀐 pod만 한 번에 upsert
+        변경이 없는 사이클에는 DB 쓰기가 없음
+        """
+        changed = []
+        for p_obj in self.podlist.values():
+            p_obj.insert_Pod_Info()
+            if p_obj.pod_status_changed():
+                changed.append(p_obj)
+        if not changed:
+            return
+        if get_storage_backend().save_pod_statuses([(p.pod_name, p.namespace, p.pod_status) for p in changed]):
+            for p in changed:
+                p.mark_pod_status_saved()
+            print(f"Pod status updated: {len(changed)} pods")
+
+    def reportStateMemory(self):
+        """프로세스 상태 저장소의 메모리 사용량 출력"""
+        usage = PROCESS_STATE_STORE.memory_usage()
+        print(f"Process state: {usage['pods']} pods, {usage['processes']} processes, "
+              f"{usage['bytes'] / 1024:.1f} KiB")
 
     def recordDeletedPod(self, removed_pods):
         """
@@ -110,8 +154,8 @@ class GarbageCollector():
         self.v1.delete_namespaced_pod(p_name, self.namespace)
 
 if __name__ == "__main__":
-    # initialize_database()  # DB 초기화 (sqlite)
-    initialize_database()  # PostgreSQL DB 초기화
+    # 저장소 초기화 (config.ini [storage] backend: postgres 또는 sqlite)
+    get_storage_backend().initialize()
 
     #네임스페이스 값을 비워두면 'default'로 지정
     gc = GarbageCollector(namespace='swlabpods', isDev=True)
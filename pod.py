@@ -5,48 +5,34 @@ from poddata import Pod_Info, Pod_Lifecycle, Reason_Deletion
 from historyManager import HistoryManager
 from processManager import ProcessManager
 # from processDB import save_to_database, get_last_bash_history, save_bash_history
-from DB_postgresql import (
-    save_bash_history_result,
-    save_pod_status,
-    save_pod_lifecycle,
-    save_to_process,
-    get_last_bash_history,
-    save_bash_history,
-    save_delete_reason,
-    is_deleted_in_DB, is_exist_in_DB
-)
+from storageBackend import get_storage_backend
 
 from datetime import datetime, timezone, timedelta
-# pod.py 맨 위 import 근처에 추가
-import threading
-from collections import defaultdict
+import configparser
 import os
-
-# 파일별 락 (동일 프로세스/스레드 간 보호)
-_FILE_LOCKS = defaultdict(threading.Lock)
-# 헤더 썼는지 빠르게 체크하기 위한 집합(프로세스 내 캐시)
-_HEADER_WRITTEN = set()
-_HEADER_WRITTEN_LOCK = threading.Lock()
-
-def _ensure_dir(path: str):
-    os.makedirs(path, exist_ok=True)
-
-def _with_file_lock(fname: str):
-    return _FILE_LOCKS[fname]
-
-def _need_write_header_once(fname: str) -> bool:
-    """
-    프로세스 내에서 헤더를 한 번만 쓰게 하는 보조.
-    파일이 없을 때만 헤더를 쓰되, 스레드 경쟁을 방지.
-    """
-    with _HEADER_WRITTEN_LOCK:
-        if fname in _HEADER_WRITTEN:
-            return False
-        # 디스크에서도 확인 (첫 작성자만 True)
-        need = not os.path.exists(fname)
-        # 바로 표시해 중복 진입 방지
-        _HEADER_WRITTEN.add(fname)
-        return need
+from csvSink import get_sink
+from arrowSink import get_arrow_sink, schema_for
+from sampleLog import get_sample_log
+
+_config = configparser.ConfigParser()
+_config.read(os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.ini"))
+# 실험 데이터 저장 형식 (csv, parquet, samplelog 중 하나 이상, 쉼표로 구분)
+EXPERIMENT_FORMATS = {
+    f.strip() for f in _config.get("storage", "experiment_format", fallback="csv").split(",") if f.strip()
+}
+# 실험 CSV 싱크 교체 옵션 (0이면 교체 안 함)
+CSV_SINK_OPTIONS = {
+    "rotate_bytes": int(_config.getfloat("storage", "csv_rotate_mb", fallback=0) * 1024 * 1024) or None,
+    "rotate_seconds": _config.getfloat("storage", "csv_rotate_seconds", fallback=0) or None,
+}
+
+# 프로세스 수집 시 이중 샘플링 사용 여부와 간격(초)
+PROCESS_DOUBLE_SAMPLING = _config.getboolean("process", "double_sampling", fallback=False)
+PROCESS_DOUBLE_SAMPLING_WINDOW = _config.getfloat("process", "double_sampling_window", fallback=1.0)
+
+def _data_file(name: str) -> str:
+    """실험 데이터 파일 경로 (현재 디렉터리의 data/ 아래)"""
+    return os.path.join(os.getcwd(), "data", name)
 
 class Pod():
     def __init__(self, api, pod):
@@ -58,8 +44,11 @@ class Pod():
         self.processes = list()
         self.pod_status = None  # list -> obj
         self.pod_lifecycle = None  # list -> obj
+        self._saved_status_hash = None  # 마지막으로 DB에 저장한 pod_status 해시
         self.hm = HistoryManager(self.api, self.pod)
-        self.pm = ProcessManager(self.api, self.pod)
+        self.pm = ProcessManager(self.api, self.pod,
+                                 double_sampling=PROCESS_DOUBLE_SAMPLING,
+                                 double_sampling_window=PROCESS_DOUBLE_SAMPLING_WINDOW)
 
         # 분석 결과 (커맨드 히스토리, 프로세스)
         self.result_command_history: bool = None
@@ -83,7 +72,7 @@ class Pod():
         ]
 
         self.CLASSIFICATION_KEYS_ORDER = [
-            "pod_name", "timestamp", "pid", "comm", "role", "state", "score", "reason"
+            "pod_name", "timestamp", "pid", "comm", "role", "state", "score", "reason", "policy_version"
         ]
         self.SUMMARY_KEYS_ORDER = [
             "pod_name", "timestamp", "total", "active_cnt", "idle_cnt", "running_cnt", "bg_active_cnt", "note"
@@ -108,17 +97,23 @@ class Pod():
         self.save_Pod_Info_to_DB()
 
 
+    def prepare_init_data(self):
+        """init_pod_data의 DB 저장 전 단계 (여러 pod를 init_pods_in_DB로 한 번에 저장할 때 사용)"""
+        self.insert_Pod_lifecycle()
+        self.insert_Pod_Info()
+        return self.pod_name, self.namespace, self.pod_lifecycle, self.pod_status
+
     def is_deleted_in_DB(self):
         """Pod이 삭제되었는지 DB에서 확인"""
-        return is_deleted_in_DB(self.pod_name, self.namespace)
+        return get_storage_backend().is_deleted(self.pod_name, self.namespace)
 
     def is_exist_in_DB(self):
         """Pod이 DB에 존재하는지 확인"""
-        return is_exist_in_DB(self.pod_name, self.namespace)
+        return get_storage_backend().is_exist(self.pod_name, self.namespace)
 
     def insert_Pod_Info(self):
         """pod's status save"""
-        p = Pod_Info
+        p = Pod_Info()
 
         p.uid = self.pod.metadata.uid
         # p.labels = self.pod.metadata.labels
@@ -144,7 +139,17 @@ class Pod():
 
     def save_Pod_Info_to_DB(self):
         """pod's status save to DB"""
-        save_pod_status(self.pod_name, self.namespace, self.pod_status)
+        if get_storage_backend().save_pod_status(self.pod_name, self.namespace, self.pod_status):
+            self.mark_pod_status_saved()
+
+    def pod_status_changed(self) -> bool:
+        """마지막 저장 이후 pod_status 추적 필드가 바뀌었는지 여부"""
+        return self.pod_status is not None and self.pod_status.fingerprint() != self._saved_status_hash
+
+    def mark_pod_status_saved(self):
+        """현재 pod_status를 DB에 저장된 상태로 기록"""
+        if self.pod_status is not None:
+            self._saved_status_hash = self.pod_status.fingerprint()
 
     def insert_Pod_lifecycle(self):
         """Save pod's created time"""
@@ -154,7 +159,7 @@ class Pod():
 
     def save_Pod_liftcycle_to_DB(self):
         """Pod's lifecycle save to DB"""
-        save_pod_lifecycle(self.pod_name, self.namespace, self.pod_lifecycle)
+        get_storage_backend().save_pod_lifecycle(self.pod_name, self.namespace, self.pod_lifecycle)
 
     def insert_DeleteReason(self, reason):
         if self.pod_lifecycle is None:
@@ -165,7 +170,7 @@ class Pod():
 
     def save_DeleteReason_to_DB(self):
         """Delete time and reason save to DB"""
-        save_delete_reason(self.pod_name, self.namespace, self.pod_lifecycle)
+        get_storage_backend().save_delete_reason(self.pod_name, self.namespace, self.pod_lifecycle)
 
     def getPodCommandHistory(self):
         """run에서 검사 결과 값을 가져오고, gc로 결과 전달"""
@@ -174,7 +179,7 @@ class Pod():
         print(result)
 
         # pod_lifecycle에 리스토리 검사 결과 저장
-        save_bash_history_result(self.pod_name, self.namespace, result)
+        get_storage_backend().save_bash_history_result(self.pod_name, self.namespace, result)
 
         if lastTime_Bash_history is not None:
             lastTimeStamp_Bash_history = self.hm.checkTimestamp(lastTime_Bash_history)
@@ -194,11 +199,11 @@ class Pod():
             print(f"No bash_history found for pod: {self.pod_name}")
             return
 
-        last_saved = get_last_bash_history(self.pod_name)
+        last_saved = get_storage_backend().get_last_bash_history(self.pod_name)
 
         if last_saved is None or str(last_saved).strip() != str(last_modified_time).strip():
             print(f"New bash_history detected for pod: {self.pod_name}, saving to DB.")
-            save_bash_history(self.pod_name, self.namespace, last_modified_time)
+            get_storage_backend().save_bash_history(self.pod_name, self.namespace, last_modified_time)
         else:
             print(f"No changes in bash_history for pod: {self.pod_name}, skipping DB save.")
 
@@ -220,14 +225,19 @@ class Pod():
         cgroups = processData['cgroups']
         timestamp = self.get_Timestamp()
 
-        self.result_process, self.reason_process, classification, summary = self.pm.analyzePodProcess(self.processes)
+        self.result_process, self.reason_process, classification, summary = self.pm.analyzePodProcess(self.processes, cgroups)
         # print("pod status: ", self.result_process)
         # print("reason process: ", self.reason_process)
 
-        self.saveStatDataToCSV(timestamp, experiment_id)
-        self.saveCgroupMetricsToCSV(cgroups, timestamp, experiment_id)
-        self.saveClassificationToCsv(classification, self.pod_name, experiment_id)
-        self.saveSummaryToCsv(summary, self.pod_name, experiment_id)
+        if "csv" in EXPERIMENT_FORMATS:
+            self.saveStatDataToCSV(timestamp, experiment_id)
+            self.saveCgroupMetricsToCSV(cgroups, timestamp, experiment_id)
+            self.saveClassificationToCsv(classification, self.pod_name, experiment_id)
+            self.saveSummaryToCsv(summary, self.pod_name, experiment_id)
+        if "parquet" in EXPERIMENT_FORMATS:
+            self.saveExperimentDataToParquet(timestamp, cgroups, classification, summary, experiment_id)
+        if "samplelog" in EXPERIMENT_FORMATS:
+            self.saveStatDataToSampleLog(timestamp)
 
     def printProcList(self):
         print('-'*50)
@@ -238,77 +248,126 @@ class Pod():
     def saveStatDataToCSV(self, timestamp, experiment_id=None):
         """
         Save process data in csv file
+        (행은 싱크 큐에 넣고, 파일 기록은 writer 스레드가 담당)
         """
-        log_dir = os.path.join(os.getcwd(), "data")
-        _ensure_dir(log_dir)
-
-        file_name = os.path.join(log_dir, f"process_metrics_experiment{experiment_id}.csv")
-        lock = _with_file_lock(file_name)
-
-        # 한 번의 atomic 구간으로 헤더/레코드 쓰기
-        with lock, open(file_name, mode="a", newline="", encoding="utf-8") as file:
-            # 헤더는 파일 최초 생성자만 기록
-            if _need_write_header_once(file_name):
-                file.write(",".join(self.PROCESS_HEADERS) + "\n")
-
-            for process in self.processes:
-                stat_values = [
-                    self.pod_name, timestamp,
-                    str(process.pid), process.comm, process.state, str(process.ppid),
-                    str(process.pgrp), str(process.session), str(process.tty_nr),
-                    str(process.tpgid), str(process.flags), str(process.minflt),
-                    str(process.cminflt), str(process.majflt), str(process.cmajflt),
-                    str(process.utime), str(process.stime), str(process.cutime),
-                    str(process.cstime), str(process.priority), str(process.nice),
-                    str(process.num_threads), str(process.itrealvalue),
-                    str(process.starttime), str(process.vsize), str(process.rss),
-                    str(process.rsslim), str(process.startcode), str(process.endcode),
-                    str(process.startstack), str(process.kstkesp), str(process.kstkeip),
-                    str(process.signal), str(process.blocked), str(process.sigignore),
-                    str(process.sigcatch), str(process.wchan), str(process.nswap),
-                    str(process.cnswap), str(process.exit_signal), str(process.processor),
-                    str(process.rt_priority), str(process.policy), str(process.delayacct_blkio_ticks),
-                    str(process.guest_time), str(process.cguest_time), str(process.start_data),
-                    str(process.end_data), str(process.start_brk), str(process.arg_start),
-                    str(process.arg_end), str(process.env_start), str(process.env_end),
-                    str(process.exit_code)
-                ]
+        sink = get_sink(_data_file(f"process_metrics_experiment{experiment_id}.csv"), self.PROCESS_HEADERS,
+                        **CSV_SINK_OPTIONS)
+
+        rows = []
+        for process in self.processes:
+            stat_values = [
+                self.pod_name, timestamp,
+                str(process.pid), process.comm, process.state, str(process.ppid),
+                str(process.pgrp), str(process.session), str(process.tty_nr),
+                str(process.tpgid), str(process.flags), str(process.minflt),
+                str(process.cminflt), str(process.majflt), str(process.cmajflt),
+                str(process.utime), str(process.stime), str(process.cutime),
+                str(process.cstime), str(process.priority), str(process.nice),
+                str(process.num_threads), str(process.itrealvalue),
+                str(process.starttime), str(process.vsize), str(process.rss),
+                str(process.rsslim), str(process.startcode), str(process.endcode),
+                str(process.startstack), str(process.kstkesp), str(process.kstkeip),
+                str(process.signal), str(process.blocked), str(process.sigignore),
+                str(process.sigcatch), str(process.wchan), str(process.nswap),
+                str(process.cnswap), str(process.exit_signal), str(process.processor),
+                str(process.rt_priority), str(process.policy), str(process.delayacct_blkio_ticks),
+                str(process.guest_time), str(process.cguest_time), str(process.start_data),
+                str(process.end_data), str(process.start_brk), str(process.arg_start),
+                str(process.arg_end), str(process.env_start), str(process.env_end),
+                str(process.exit_code)
+            ]
 
-                if process.metrics:
-                    metrics_values = [
-                        str(process.metrics.voluntary_ctxt_switches or ""),
-                        str(process.metrics.nonvoluntary_ctxt_switches or ""),
-                        str(process.metrics.vm_rss or ""),
-                        str(process.metrics.read_bytes or ""),
-                        str(process.metrics.write_bytes or "")
-                    ]
-                else:
-                    metrics_values = ["", "", "", "", ""]
+            if process.metrics:
+                metrics_values = [
+                    str(process.metrics.voluntary_ctxt_switches or ""),
+                    str(process.metrics.nonvoluntary_ctxt_switches or ""),
+                    str(process.metrics.vm_rss or ""),
+                    str(process.metrics.read_bytes or ""),
+                    str(process.metrics.write_bytes or "")
+                ]
+            else:
+                metrics_values = ["", "", "", "", ""]
 
-                file.write(",".join([*stat_values, *metrics_values]) + "\n")
+            rows.append(",".join([*stat_values, *metrics_values]))
+        sink.write(rows)
 
     def saveCgroupMetricsToCSV(self, cgroup, timestamp, experiment_id=None):
         """
         Save cgroup metrics (memory, I/O) into CSV file
         """
-        log_dir = os.path.join(os.getcwd(), "data")
-        _ensure_dir(log_dir)
-
-        file_name = os.path.join(log_dir, f"cgroup_experiment{experiment_id}.csv")
-        lock = _with_file_lock(file_name)
+        sink = get_sink(_data_file(f"cgroup_experiment{experiment_id}.csv"), self.CGROUP_HEADERS, **CSV_SINK_OPTIONS)
+
+        row = [
+            self.pod_name, timestamp,
+            str(cgroup.memory_current or ""),
+            str(cgroup.memory_limit or ""),
+            str(cgroup.io_read_bytes or ""),
+            str(cgroup.io_write_bytes or "")
+        ]
+        sink.write([",".join(row)])
 
-        with lock, open(file_name, mode="a", newline="", encoding="utf-8") as file:
-            if _need_write_header_once(file_name):
-                file.write(",".join(self.CGROUP_HEADERS) + "\n")
+    def saveExperimentDataToParquet(self, timestamp, cgroup, classification, summary, experiment_id=None):
+        """
+        프로세스/cgroup/분류/요약 데이터를 타입이 지정된 Parquet 데이터셋으로 저장
+        (사이클 경계에서 arrowSink.end_cycle_all()이 호출될 때 파일로 기록됨)
+        """
+        root = _data_file("parquet")
+        ts = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
 
-            row = [
-                self.pod_name, timestamp,
-                str(cgroup.memory_current or ""),
-                str(cgroup.memory_limit or ""),
-                str(cgroup.io_read_bytes or ""),
-                str(cgroup.io_write_bytes or "")
-            ]
-            file.write(",".join(row) + "\n")
+        rows = []
+        for process in self.processes:
+            row = {h: getattr(process, h, None) for h in self.PROCESS_HEADERS[2:54]}
+            row["pod_name"] = self.pod_name
+            row["timestamp"] = ts
+            m = process.metrics
+            row["voluntary_ctxt_switches"] = m.voluntary_ctxt_switches if m else None
+            row["nonvoluntary_ctxt_switches"] = m.nonvoluntary_ctxt_switches if m else None
+            row["vm_rss_status"] = m.vm_rss if m else None
+            row["read_bytes"] = m.read_bytes if m else None
+            row["write_bytes"] = m.write_bytes if m else None
+            rows.append(row)
+        get_arrow_sink(root, "process_metrics", experiment_id, schema_for(self.PROCESS_HEADERS)).write(rows)
+
+        if cgroup is not None:
+            get_arrow_sink(root, "cgroup", experiment_id, schema_for(self.CGROUP_HEADERS)).write([{
+                "pod_name": self.pod_name,
+                "timestamp": ts,
+                "memory_current": cgroup.memory_current,
+                "memory_limit": cgroup.memory_limit,
+                "io_read_bytes": cgroup.io_read_bytes,
+                "io_write_bytes": cgroup.io_write_bytes
+            }])
+
+        if classification:
+            get_arrow_sink(root, "process_classification", experiment_id,
+                           schema_for(self.CLASSIFICATION_KEYS_ORDER)).write([
+                {
+                    "pod_name": self.pod_name,
+                    "timestamp": ts,
+                    "pid": proc.get("pid"),
+                    "comm": proc.get("comm"),
+                    "role": proc.get("role"),
+                    "state": getattr(proc.get("state"), "value", proc.get("state")),
+                    "score": proc.get("score"),
+                    "reason": proc.get("reason"),
+                    "policy_version": proc.get("policy_version")
+                }
+                for proc in classification
+            ])
+
+        if summary:
+            row = {k: summary.get(k) for k in self.SUMMARY_KEYS_ORDER}
+            row["pod_name"] = self.pod_name
+            row["timestamp"] = ts
+            get_arrow_sink(root, "process_summary", experiment_id, schema_for(self.SUMMARY_KEYS_ORDER)).write([row])
+
+    def saveStatDataToSampleLog(self, timestamp):
+        """
+        프로세스 원본 샘플을 압축 바이너리 로그(data/samples/)에 추가
+        (실험 번호와 관계없이 하나의 로그에 누적, 세그먼트는 크기/시간 기준으로 교체됨)
+        """
+        ts = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+        get_sample_log(_data_file("samples")).append(self.pod_name, ts, self.processes)
 
     def saveProcessDataToDB(self):
         """Save Pod's process data to DB"""
@@ -369,10 +428,15 @@ class Pod():
                 "arg_end": process.arg_end,
                 "env_start": process.env_start,
                 "env_end": process.env_end,
-                "exit_code": process.exit_code
+                "exit_code": process.exit_code,
+                "voluntary_ctxt_switches": process.metrics.voluntary_ctxt_switches if process.metrics else None,
+                "nonvoluntary_ctxt_switches": process.metrics.nonvoluntary_ctxt_switches if process.metrics else None,
+                "vm_rss": process.metrics.vm_rss if process.metrics else None,
+                "read_bytes": process.metrics.read_bytes if process.metrics else None,
+                "write_bytes": process.metrics.write_bytes if process.metrics else None
             })
 
-        save_to_process(self.pod_name, self.namespace, processes)
+        get_storage_backend().save_processes(self.pod_name, self.namespace, processes)
 
     def saveClassificationToCsv(self, classification, pod_name, experiment_id=None):
         """
@@ -383,11 +447,8 @@ class Pod():
         if not classification:
             return
 
-        log_dir = os.path.join(os.getcwd(), "data")
-        _ensure_dir(log_dir)
-
-        filename = os.path.join(log_dir, f"process_classification_experiment{experiment_id}.csv")
-        lock = _with_file_lock(filename)
+        sink = get_sink(_data_file(f"process_classification_experiment{experiment_id}.csv"),
+                        self.CLASSIFICATION_KEYS_ORDER, **CSV_SINK_OPTIONS)
 
         ts = self.get_Timestamp()
 
@@ -398,15 +459,11 @@ class Pod():
                 "timestamp": ts
             }
             base.update(proc)  # 기존 키를 넣되, 최종 출력은 고정 순서대로
-            return [str(base.get(k, "")) for k in self.CLASSIFICATION_KEYS_ORDER]
+            return ",".join(str(base.get(k, "")) for k in self.CLASSIFICATION_KEYS_ORDER)
 
-        with lock, open(filename, "a", newline="", encoding="utf-8") as f:
-            if _need_write_header_once(filename):
-                f.write(",".join(self.CLASSIFICATION_KEYS_ORDER) + "\n")
-            for proc in classification:
-                f.write(",".join(_row_from(proc)) + "\n")
+        sink.write([_row_from(proc) for proc in classification])
 
-        #print(f"[SAVE - classification] Appended {len(classification)} rows from {pod_name} to {filename}")
+        #print(f"[SAVE - classification] Appended {len(classification)} rows from {pod_name}")
 
     def saveSummaryToCsv(self, summary, pod_name, experiment_id=None):
         """
@@ -415,24 +472,17 @@ class Pod():
         if not summary:
             return
 
-        log_dir = os.path.join(os.getcwd(), "data")
-        _ensure_dir(log_dir)
-
-        filename = os.path.join(log_dir, f"process_summary_experiment{experiment_id}.csv")
-        lock = _with_file_lock(filename)
+        sink = get_sink(_data_file(f"process_summary_experiment{experiment_id}.csv"), self.SUMMARY_KEYS_ORDER,
+                        **CSV_SINK_OPTIONS)
 
         ts = self.get_Timestamp()
         # 고정 키 순서에 맞춰 값 매핑
         base = {"pod_name": pod_name, "timestamp": ts}
         base.update(summary)
 
-        with lock, open(filename, "a", newline="", encoding="utf-8") as f:
-            if _need_write_header_once(filename):
-                f.write(",".join(self.SUMMARY_KEYS_ORDER) + "\n")
-            row = [str(base.get(k, "")) for k in self.SUMMARY_KEYS_ORDER]
-            f.write(",".join(row) + "\n")
+        sink.write([",".join(str(base.get(k, "")) for k in self.SUMMARY_KEYS_ORDER)])
 
-        #print(f"[SAVE - summary] Appended summary for {pod_name} to {filename}")
+        #print(f"[SAVE - summary] Appended summary for {pod_name}")
 
     def shouldGarbageCollection(self):
         """
@@ -1,4 +1,5 @@
 from enum import Enum
+import hashlib
 
 class Reason_Deletion(Enum):
     GC_h = 'GarbageCollector - No usage history for more than a week'
@@ -30,6 +31,20 @@ class Pod_Info:
         self.podIP = None
         self.startTime = None  # pod start time
 
+    # pod_status 테이블에 저장되는 필드 (변경 감지 대상)
+    TRACKED_FIELDS = (
+        'creation_timestamp', 'deletion_timestamp', 'generate_name', 'node_name',
+        'phase', 'hostIP', 'podIP', 'startTime'
+    )
+
+    def fingerprint(self) -> str:
+        """저장 대상 필드의 해시 (값이 바뀌었을 때만 DB에 쓰기 위함)"""
+        h = hashlib.sha1()
+        for field in self.TRACKED_FIELDS:
+            h.update(repr(getattr(self, field)).encode())
+            h.update(b"\x1f")
+        return h.hexdigest()
+
 class Pod_Lifecycle:
     def __init__(self):
         self.createTime = None  # pod 생성 시간
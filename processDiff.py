@@ -0,0 +1,101 @@
+"""
+프로세스 스냅샷 차분 (변경된 행만 저장)
+- 정적 필드(주소, 부모/세션, 터미널 등)는 프로세스마다 identity로 한 번만 저장
+- 동적 필드(카운터, 상태 등)는 직전 스냅샷과 달라졌을 때만 sample로 저장
+- 사라진 프로세스는 gone으로 보고 (reconstruction 시 생존 구간 계산용)
+DB와 무관한 순수 로직이며, 실제 저장은 DB_postgresql.save_process_diff가 담당
+"""
+import hashlib
+import threading
+from typing import Dict, Hashable, List, Optional, Tuple
+
+# (pid, starttime)과 함께 프로세스를 식별하는 정적 필드 (값이 바뀌면 새 identity 버전)
+# 대부분 exec/reparent 때만 바뀌는 값 (같은 해시가 다시 나타나면 DB에는 새 버전으로 저장)
+STATIC_FIELDS = (
+    "comm", "ppid", "pgrp", "session", "tty_nr",
+    "itrealvalue", "rsslim", "startcode", "endcode", "startstack", "exit_signal",
+    "start_data", "end_data", "start_brk", "arg_start", "arg_end", "env_start", "env_end",
+)
+# 사이클마다 바뀔 수 있는 필드 (하나라도 바뀌면 sample 행 저장)
+# tpgid(포그라운드 작업), flags, nice/priority, 시그널 핸들러, 스케줄링 정책은 값이 오갈 수 있으므로 여기에 둠
+DYNAMIC_FIELDS = (
+    "state", "minflt", "cminflt", "majflt", "cmajflt", "utime", "stime", "cutime", "cstime",
+    "num_threads", "vsize", "rss", "kstkesp", "kstkeip", "signal", "blocked", "wchan",
+    "nswap", "cnswap", "processor", "delayacct_blkio_ticks", "guest_time", "cguest_time", "exit_code",
+    "tpgid", "flags", "priority", "nice", "sigignore", "sigcatch", "rt_priority", "policy",
+    "voluntary_ctxt_switches", "nonvoluntary_ctxt_switches", "vm_rss", "read_bytes", "write_bytes",
+)
+
+def static_hash(row: dict) -> str:
+    """정적 필드 해시 (identity 버전 구분용)"""
+    h = hashlib.sha1()
+    for field in STATIC_FIELDS:
+        h.update(repr(row.get(field)).encode())
+        h.update(b"\x1f")
+    return h.hexdigest()[:16]
+
+class SnapshotDiff:
+    """한 파드의 한 사이클 차분 결과"""
+    __slots__ = ("new_identities", "samples", "gone", "first_snapshot")
+
+    def __init__(self):
+        self.new_identities: List[dict] = []      # 처음 보는 (pid, starttime, static_hash) 행
+        self.samples: List[Tuple[tuple, dict]] = []  # ((pid, starttime, static_hash), 행): 동적 필드가 바뀐 행
+        self.gone: List[tuple] = []               # 직전 스냅샷에 있었지만 사라진 identity 키
+        self.first_snapshot = False               # 이 파드의 첫 스냅샷 여부 (재시작 직후 포함)
+
+class SnapshotDiffer:
+    """
+    파드별 직전 스냅샷을 기억하고 새 스냅샷과 비교
+    키: (pid, starttime, static_hash) → identity id, 동적 필드 튜플
+    """
+    def __init__(self):
+        self._pods: Dict[Hashable, Dict[tuple, list]] = {}
+        self._lock = threading.Lock()
+
+    def diff(self, pod_key: Hashable, rows: List[dict]) -> SnapshotDiff:
+        result = SnapshotDiff()
+        with self._lock:
+            previous = self._pods.get(pod_key)
+        result.first_snapshot = previous is None
+        previous = previous or {}
+
+        seen = set()
+        for row in rows:
+            key = (row.get("pid"), row.get("starttime"), static_hash(row))
+            seen.add(key)
+            dynamic = tuple(row.get(f) for f in DYNAMIC_FIELDS)
+            entry = previous.get(key)
+            if entry is None:
+                result.new_identities.append(row)
+                result.samples.append((key, row))
+            elif entry[1] != dynamic:
+                result.samples.append((key, row))
+
+        result.gone = [key for key in previous if key not in seen]
+        return result
+
+    def commit(self, pod_key: Hashable, rows: List[dict], identity_ids: Dict[tuple, int]):
+        """
+        DB 저장이 성공한 뒤 호출: 이번 스냅샷을 다음 비교 기준으로 기록
+        identity_ids: 새로 만든 identity의 id (기존 identity는 이전 id 유지)
+        """
+        with self._lock:
+            previous = self._pods.get(pod_key, {})
+            current = {}
+            for row in rows:
+                key = (row.get("pid"), row.get("starttime"), static_hash(row))
+                identity_id = identity_ids.get(key)
+                if identity_id is None and key in previous:
+                    identity_id = previous[key][0]
+                current[key] = [identity_id, tuple(row.get(f) for f in DYNAMIC_FIELDS)]
+            self._pods[pod_key] = current
+
+    def identity_id(self, pod_key: Hashable, key: tuple) -> Optional[int]:
+        with self._lock:
+            entry = self._pods.get(pod_key, {}).get(key)
+        return entry[0] if entry else None
+
+    def forget(self, pod_key: Hashable):
+        with self._lock:
+            self._pods.pop(pod_key, None)
@@ -4,6 +4,13 @@ import csv
 from enum import Enum
 from typing import Dict, Optional
 from process import CgroupMetrics, ProcessMetrics, Process, Mode_State, Policy_State
+from activityWindow import ProcessActivityWindow
+from activityScore import ActivityScorer, rate
+from processTree import ProcessTree
+from processStateStore import ProcessStateStore, PROCESS_STATE_STORE
+from processPolicy import CompiledPolicy, builtin_policy, configured_policy_file, get_policy_handle
+
+import numpy as np
 
 from kubernetes import client, config, stream
 import time
@@ -27,18 +34,48 @@ class ProcessStatePolicy:
     ACTIVE_NEW_AGE_THRESHOLD = 5 * 60           # 5분 미만(신규 프로세스)
     ACTIVE_AGE_THRESHOLD = 1 * 60 * 60          # 1시간 미만 (활동률 0일 경우 idle)
     IDLE_AGE_THRESHOLD = 24 * 60 * 60           # 24시간 미만 (활동률 0일 경우 inactive)
+    # 활동 이력(슬라이딩 윈도우) 기준
+    ACTIVITY_HISTORY_SIZE = 1440                # 프로세스별 보관 샘플 수 (60초 주기 기준 24시간)
+    ACTIVITY_EWMA_ALPHA = 0.3
+    ACTIVITY_SHORT_WINDOW = 1 * 60 * 60         # 최근 1시간 내 활동이 있으면 활성
+    ACTIVITY_LONG_WINDOW = 24 * 60 * 60         # long_max 조회 범위 (기본 규칙에서는 사용하지 않음, 정책 파일용)
+    # 다중 신호 활동 점수 기준 (cpu, 컨텍스트 스위치, I/O, RSS 변화, cgroup I/O)
+    SCORE_WEIGHTS = {'cpu': 0.4, 'ctxt': 0.2, 'io': 0.2, 'rss': 0.1, 'cgroup_io': 0.1}
+    # 이 값 이상이면 해당 신호 만점 (ctxt: 바쁜 이벤트 루프 수준, 1Hz heartbeat/sleep 루프는 1% 수준)
+    SCORE_SCALES = {'cpu': 0.01, 'ctxt': 100.0, 'io': 4096, 'rss': 4096, 'cgroup_io': 4096}
+    ACTIVE_SCORE_THRESHOLD = 0.2    # 점수 이상이면 활성
+    IDLE_SCORE_THRESHOLD = 0.05     # 점수 초과면 GC 대상이 아닌 유휴
+    # 세션 단위 판단 (프로세스 트리를 세션별로 집계하여 GC 결정, 기본값은 프로세스별 판단)
+    SESSION_LEVEL_DECISION = False
 
 class ProcessManager:
-    def __init__(self, api_instance, pod):
+    def __init__(self, api_instance, pod, double_sampling: bool = False, double_sampling_window: float = 1.0,
+                 state_store: Optional[ProcessStateStore] = None, policy=None,
+                 policy_file: Optional[str] = None):
         self.v1 = api_instance
         self.pod = pod
         self.namespace: str = pod.metadata.namespace
 
         self.cpu_ticks_per_sec = 10
-        self.previous_cpu_states: dict = {}  # pod별 이전 CPU 통계 저장하는 딕셔너리
+        # pod별 이전 사이클 통계 저장소 ((pid, starttime) 키, 파드 삭제 시 GarbageCollector가 정리)
+        self.state_store: ProcessStateStore = state_store if state_store is not None else PROCESS_STATE_STORE
         self.sampling_interval = 60
         self.time = time
 
+        # 이중 샘플링 모드: 한 번의 exec 안에서 utime/stime을 window 간격으로 두 번 읽음
+        self.double_sampling: bool = double_sampling
+        self.double_sampling_window: float = double_sampling_window  # 초 단위
+        self.instant_cpu_states: dict = {}  # 이번 수집의 첫 번째 샘플 {'elapsed': 초, 'processes': {(pid, starttime): ticks}}
+        # 분류 기준 (ProcessStatePolicy 또는 임계값을 바꾼 하위 클래스)
+        self.policy = policy if policy is not None else ProcessStatePolicy
+        self.scorer = ActivityScorer(self.policy.SCORE_WEIGHTS, self.policy.SCORE_SCALES)
+        # 분류 규칙 (판정 테이블): 정책 파일이 있으면 파일에서, 없으면 self.policy 상수로 생성
+        # policy를 직접 지정하지 않았으면 config.ini [policy] file 설정을 사용
+        if policy_file is None and policy is None:
+            policy_file = configured_policy_file()
+        self.policy_handle = get_policy_handle(policy_file) if policy_file else None
+        self._builtin_policy: CompiledPolicy = builtin_policy(self.policy)
+
     def getPorcessData(self):
         """
         프로세스 정보를 수집하는 함수를 최종적으로 실햄
@@ -47,6 +84,9 @@ class ProcessManager:
         if not stat_data:
             return None
 
+        if self.double_sampling:
+            stat_data = self._splitDoubleSample(stat_data)
+
         processes = self.insertProcessStatData(stat_data)
         cgroups = self.getCgroupMetrics()
 
@@ -57,8 +97,18 @@ class ProcessManager:
 
     def getProcStat(self):
         # 자기 자신을 제외하고, PPID가 1인 'sleep' 프로세스도 제외하는 쉘 스크립트 사용
+        # 이중 샘플링 모드에서는 같은 exec 안에서 utime/stime을 먼저 한 번 읽고 window만큼 대기
+        first_sample = ""
+        if self.double_sampling:
+            first_sample = (
+                "echo \"#U0 $(cut -d' ' -f1 /proc/uptime)\"; "
+                "cat /proc/[0-9]*/stat 2>/dev/null | awk '{print \"#S\", $1, $14, $15, $22}'; "
+                f"sleep {self.double_sampling_window}; "
+                "echo \"#U1 $(cut -d' ' -f1 /proc/uptime)\"; "
+            )
         command = [
             "sh", "-c",
+            first_sample +
             "SELF_PID=$$ && "
             "for stat in /proc/[0-9]*/stat; do "
             "  if [ -r \"$stat\" ]; then "
@@ -91,6 +141,41 @@ class ProcessManager:
                 print(f"An unexpected error occurred: {e}")
             return None
 
+    def _splitDoubleSample(self, stat_data: str) -> str:
+        """
+        이중 샘플링 출력에서 첫 번째 샘플(#S)과 uptime(#U0, #U1) 라인을 분리
+        첫 번째 샘플은 instant_cpu_states에 저장하고, 나머지 /proc/stat 라인만 반환
+        """
+        samples = {}
+        uptime_start = uptime_end = None
+        stat_lines = []
+        for line in stat_data.splitlines():
+            if not line.startswith("#"):
+                stat_lines.append(line)
+                continue
+            fields = line.split()
+            try:
+                if fields[0] == "#S" and len(fields) >= 5:
+                    samples[(int(fields[1]), int(fields[4]))] = int(fields[2]) + int(fields[3])
+                elif fields[0] == "#U0" and len(fields) >= 2:
+                    uptime_start = float(fields[1])
+                elif fields[0] == "#U1" and len(fields) >= 2:
+                    uptime_end = float(fields[1])
+            except ValueError:
+                continue
+
+        # uptime을 읽지 못하면 설정된 window를 경과 시간으로 사용
+        if uptime_start is not None and uptime_end is not None and uptime_end > uptime_start:
+            elapsed = uptime_end - uptime_start
+        else:
+            elapsed = float(self.double_sampling_window)
+
+        self.instant_cpu_states = {
+            'elapsed': elapsed,
+            'processes': samples
+        }
+        return "\n".join(stat_lines)
+
     def getCmdlineInPod(self, pid):
         """
         풀 커맨드(cmdline)를 얻으려면 Pod 안의 /proc/[pid]/cmdline을 읽어야함
@@ -305,8 +390,11 @@ class ProcessManager:
 
         return cgroup_metrics
 
-    def analyzePodProcess(self, processes):
+    def analyzePodProcess(self, processes, cgroups: Optional[CgroupMetrics] = None,
+                          current_time: Optional[float] = None, boot_time: Optional[float] = None):
         """
+        cgroups: 파드 cgroup 메트릭 (있으면 cgroup I/O 변화량을 활동 점수에 반영)
+        current_time, boot_time: 지정하면 해당 시각 기준으로 분석 (기록된 데이터 재생용, exec 생략)
         return:
         분석결과
           - should_gc(gc여부): bool
@@ -321,19 +409,21 @@ class ProcessManager:
                 'process_summary': {}
             }
         pod_name = self.pod.metadata.name
-        current_time = time.time()
+        if current_time is None:
+            current_time = time.time()
 
         # btime 계산 (시스템 부팅 시간)
-        exec_command = stream.stream(
-            self.v1.connect_get_namespaced_pod_exec,
-            self.pod.metadata.name,
-            self.namespace,
-            command=["cat", "/proc/uptime"],
-            stderr=True, stdin=False,
-            stdout=True, tty=False
-        )
-        uptime = float(exec_command.split()[0])
-        boot_time = current_time - uptime
+        if boot_time is None:
+            exec_command = stream.stream(
+                self.v1.connect_get_namespaced_pod_exec,
+                self.pod.metadata.name,
+                self.namespace,
+                command=["cat", "/proc/uptime"],
+                stderr=True, stdin=False,
+                stdout=True, tty=False
+            )
+            uptime = float(exec_command.split()[0])
+            boot_time = current_time - uptime
 
         process_classification: list = []
         process_summary: dict = {
@@ -343,8 +433,50 @@ class ProcessManager:
             'gc_candidates': 0,     # 비활성 = gc 대상
             'zombie': 0,            # 좀비
         }
+        # 프로세스 트리 구성 (pid 인덱스, 세션/그룹)
+        tree = ProcessTree(processes)
+
+        # 세션 단위 판단 시 Running/Uninterruptible 조상을 가진 프로세스는 세션이 이미 활성이므로
+        # 분류 규칙 평가 없이 활성으로 처리
+        covered = set()
+        if self.policy.SESSION_LEVEL_DECISION:
+            for p, parent in tree.iter_top_down():
+                if parent is None or p.state in self.policy.INACTIVE_STATES:
+                    continue
+                if parent.pid in covered or parent.state in self.policy.ACTIVE_STATES:
+                    covered.add(p.pid)
+        evaluated = [p for p in processes if p.pid not in covered]
+
+        # CPU 활동률과 다중 신호 활동 점수 (파드 내 프로세스 전체를 한 번에 계산)
+        cpu_activities = [
+            self._calculate_cpu_activity(p.pid, p.utime, p.stime, pod_name, current_time, p.starttime)
+            for p in evaluated
+        ]
+        scores = self._calculate_activity_scores(evaluated, cpu_activities, cgroups, pod_name, current_time)
+
+        results = {}
+        classifications = self._classify_processes(evaluated, pod_name, current_time, boot_time,
+                                                   cpu_activities, scores)
+        for process, classification, score in zip(evaluated, classifications, scores):
+            classification['score'] = float(score)
+            results[process.pid] = classification
+        policy_version = self.decision_policy().version
+        for pid in covered:
+            p = tree.by_pid[pid]
+            # 활동 이력은 계속 갱신 (부모가 유휴가 되었을 때 오래된 이력으로 분류되지 않도록)
+            cpu_activity = self._calculate_cpu_activity(p.pid, p.utime, p.stime, pod_name, current_time, p.starttime)
+            self._update_activity_window(p, pod_name, cpu_activity, current_time)
+            results[pid] = {
+                'pid': p.pid,
+                'comm': p.comm,
+                'state': ProcessStateClassification.ACTIVE,
+                'reason': 'active_parent',
+                'cpu_activity': cpu_activity,
+                'policy_version': policy_version
+            }
+
         for process in processes:
-            classification = self._classify_process(process, pod_name, current_time, boot_time)
+            classification = results[process.pid]
             # print(classification)
             process_classification.append(classification)
 
@@ -355,183 +487,264 @@ class ProcessManager:
                 process_summary['idle'] += 1
             elif classification['state'] == ProcessStateClassification.GC:
                 process_summary['gc_candidates'] += 1
-                if classification['reason'] == 'Zombie':
+                if process.state in self.policy.INACTIVE_STATES:
                     process_summary['zombie'] += 1
 
+        # 세션 단위 집계
+        session_states = tree.rollup(
+            {pid: c['state'] for pid, c in results.items()},
+            ProcessStateClassification.ACTIVE, ProcessStateClassification.GC, ProcessStateClassification.IDLE,
+            by='session'
+        )
+        process_summary['sessions'] = len(session_states)
+        process_summary['active_sessions'] = sum(
+            1 for st in session_states.values() if st == ProcessStateClassification.ACTIVE)
+        process_summary['idle_sessions'] = sum(
+            1 for st in session_states.values() if st == ProcessStateClassification.IDLE)
+        process_summary['gc_sessions'] = sum(
+            1 for st in session_states.values() if st == ProcessStateClassification.GC)
+
         # print(process_summary)
         # 현재 CPU 통계 저장
-        self._update_cpu_states(pod_name, processes, current_time)
+        self._update_cpu_states(pod_name, processes, current_time, cgroups)
 
         # GC 여부 결정
         gc_decision = self._make_gc_decision(process_summary)
 
         return gc_decision['should_gc'], gc_decision['reason'], process_classification, process_summary
 
-    def _classify_process(self, p, pod_name: str, current_time, btime) -> Dict:
+    def _classify_processes(self, processes, pod_name: str, current_time, btime,
+                            cpu_activities, scores) -> list:
         """
-        각 프로세스의 상태를 분류
+        파드 내 프로세스들의 상태를 판정 테이블(정책)로 한 번에 분류
+        cpu_activities: 프로세스별 CPU 활동률 (없으면 None)
+        scores: 프로세스별 다중 신호 활동 점수 (0.0 ~ 1.0)
         return:
-            프로세스의 상태: dict
+            프로세스별 상태: list[dict]
         """
-        # 1. 프로세스 상태 기반 판단
-        # Zombie/Dead 프로세스
-        if p.state in ProcessStatePolicy.INACTIVE_STATES:
-            return {
+        decision_policy = self.decision_policy()
+        n = len(processes)
+        facts = {
+            'process_state': np.array([p.state for p in processes], dtype=object),
+            'cpu_activity': np.full(n, np.nan),
+            'age': np.empty(n),
+            'score': np.asarray(scores, dtype=float),
+            'recent_max': np.full(n, np.nan),
+            'long_max': np.full(n, np.nan),
+        }
+        for i, (p, cpu_activity) in enumerate(zip(processes, cpu_activities)):
+            # 프로세스 나이(경과 시간) 계산
+            facts['age'][i] = self._calculate_process_age(p.starttime, btime, current_time)
+            if cpu_activity is not None:
+                facts['cpu_activity'][i] = cpu_activity
+            if p.state in self.policy.INACTIVE_STATES:
+                continue
+            # 활동 이력 갱신 후 최근 1h/24h 최대 활동률 조회
+            window = self._update_activity_window(p, pod_name, cpu_activity, current_time)
+            recent_max = window.max('cpu', self.policy.ACTIVITY_SHORT_WINDOW)
+            long_max = window.max('cpu', self.policy.ACTIVITY_LONG_WINDOW)
+            if recent_max is not None:
+                facts['recent_max'][i] = recent_max
+            if long_max is not None:
+                facts['long_max'][i] = long_max
+
+        states, reasons = decision_policy.classify_many(facts)
+
+        return [
+            {
                 'pid': p.pid,
                 'comm': p.comm,
-                'state': ProcessStateClassification.GC,
-                'reason': 'Zombie',
-                'cpu_activity': 0
+                'state': ProcessStateClassification(state),
+                'reason': reason,
+                'cpu_activity': cpu_activity,
+                'age_hours': age / 3600,
+                'policy_version': decision_policy.version
             }
+            for p, cpu_activity, age, state, reason
+            in zip(processes, cpu_activities, facts['age'], states, reasons)
+        ]
 
-        # CPU 활동률 계산
-        cpu_activity = self._calculate_cpu_activity(p.pid, p.utime, p.stime, pod_name, current_time)
-        # 프로세스 나이(경과 시간) 계산
-        process_age = self._calculate_process_age(p.starttime, btime, current_time)
+    def _classify_process(self, p, pod_name: str, current_time, btime,
+                          cpu_activity: Optional[float], score: float = 0.0) -> Dict:
+        """
+        각 프로세스의 상태를 분류 (단일 프로세스용, 분류 규칙은 _classify_processes와 동일)
+        return:
+            프로세스의 상태: dict
+        """
+        return self._classify_processes([p], pod_name, current_time, btime, [cpu_activity], [score])[0]
 
-        # Running/Uninterruptible 프로세스는 활성
-        if p.state in ProcessStatePolicy.ACTIVE_STATES:
-            return {
-                'pid': p.pid,
-                'comm': p.comm,
-                'state': ProcessStateClassification.ACTIVE,
-                'reason': 'Running_state',
-                'cpu_activity': cpu_activity,
-                'age_hours': process_age / 3600
-            }
+    def decision_policy(self) -> CompiledPolicy:
+        """
+        현재 적용할 분류 정책
+        정책 파일을 사용하는 경우 파일이 바뀌었으면 다시 로드된 정책을 반환
+        """
+        if self.policy_handle is not None:
+            return self.policy_handle.get()
+        return self._builtin_policy
 
-        # # 2. 프로세스 경과 시간 기반 판단 (활성)
-        # # 결과 시간 < 5분
-        # if process_age < ProcessStatePolicy.ACTIVE_NEW_AGE_THRESHOLD:
-        #     return {
-        #         'pid': p.pid,
-        #         'comm': p.comm,
-        #         'state': ProcessStateClassification.ACTIVE,
-        #         'reason': 'new_process_5m',
-        #         'cpu_activity': cpu_activity,
-        #         'age_hours': process_age / 3600
-        #     }
-
-        # 3. CPU 활동률 기반 상태 판단
-        # CPU 활동률이 None일 경우
-        if cpu_activity is None:
-            return {
-                'pid': p.pid,
-                'comm': p.comm,
-                'state': ProcessStateClassification.IDLE,
-                'reason': 'cpu_activity_None',
-                'cpu_activity': cpu_activity,
-                'age_hours': process_age / 3600
-            }
-        # CPU 활동률 > 1%
-        if cpu_activity > ProcessStatePolicy.ACTIVE_CPU_THRESHOLD:
-            return {
-                'pid': p.pid,
-                'comm': p.comm,
-                'state': ProcessStateClassification.ACTIVE,
-                'reason': 'high_cpu_activity',
-                'cpu_activity': cpu_activity,
-                'age_hours': process_age / 3600
-            }
+    def _calculate_cpu_activity(self, pid, utime, stime, pod_name, current_time, starttime=None) -> Optional[float]:
+        """
+        CPU 활동률 계산
+        이전 사이클과 비교한 장기 활동률과, 이중 샘플링으로 얻은 순간 활동률을 결합
+        둘 다 있으면 더 큰 값을 사용 (활성 프로세스를 놓치지 않도록)
+        starttime: 같은 pid라도 시작 시각이 다르면 다른 프로세스(pid 재사용)로 봄
+        return:
+            None or CPU 활동률 (0.0 ~ 1.0): float
+            두 값이 모두 없을 경우 None 반환
+        """
+        long_activity = self._calculate_long_cpu_activity(pid, utime, stime, pod_name, current_time, starttime)
+        instant_activity = self._calculate_instant_cpu_activity(pid, utime, stime, starttime)
 
-        # 4. 종합적인 분류
-        # CPU 활동률이 매우 낮거나 없는 경우 (CPU activity < 1%)
-        # 경과 시간 >= 24h
-        if process_age >= ProcessStatePolicy.IDLE_AGE_THRESHOLD:
-            return {
-                'pid': p.pid,
-                'comm': p.comm,
-                'state': ProcessStateClassification.GC,
-                'reason': 'very_old_process',
-                'cpu_activity': cpu_activity,
-                'age_hours': process_age / 3600
-            }
-        # 경과 시간 < 1h
-        elif process_age < ProcessStatePolicy.ACTIVE_AGE_THRESHOLD:
-            # 0 < CPU 활동률 <= 1%
-            if cpu_activity > ProcessStatePolicy.IDLE_CPU_THRESHOLD:
-                return {
-                    'pid': p.pid,
-                    'comm': p.comm,
-                    'state': ProcessStateClassification.ACTIVE,
-                    'reason': 'low_cpu_activity_1h',
-                    'cpu_activity': cpu_activity,
-                    'age_hours': process_age / 3600
-                }
-            # CPU 활동률 = 0
-            elif cpu_activity == ProcessStatePolicy.IDLE_CPU_THRESHOLD:
-                return {
-                    'pid': p.pid,
-                    'comm': p.comm,
-                    'state': ProcessStateClassification.IDLE,
-                    'reason': 'very_low_cpu_activity_1h',
-                    'cpu_activity': cpu_activity,
-                    'age_hours': process_age / 3600
-                }
-        # 경과 시간 < 24h
-        elif process_age < ProcessStatePolicy.IDLE_AGE_THRESHOLD:
-            # 0 < CPU 활동률 <= 1%
-            if cpu_activity > ProcessStatePolicy.IDLE_CPU_THRESHOLD:
-                return {
-                    'pid': p.pid,
-                    'comm': p.comm,
-                    'state': ProcessStateClassification.IDLE,
-                    'reason': 'old_process',
-                    'cpu_activity': cpu_activity,
-                    'age_hours': process_age / 3600
-                }
-            # CPU 활동률 = 0
-            elif cpu_activity == ProcessStatePolicy.IDLE_CPU_THRESHOLD:
-                return {
-                    'pid': p.pid,
-                    'comm': p.comm,
-                    'state': ProcessStateClassification.GC,
-                    'reason': 'old_and_very_low_cpu_activity',
-                    'cpu_activity': cpu_activity,
-                    'age_hours': process_age / 3600
-                }
-        # 모두 해당하지 않는 경우(예외, idle로 간주)
-        return{
-            'pid': p.pid,
-            'comm': p.comm,
-            'state': ProcessStateClassification.IDLE,
-            'reason': 'except_idle',
-            'cpu_activity': cpu_activity,
-            'age_hours': process_age / 3600
-        }
+        if long_activity is None:
+            return instant_activity
+        if instant_activity is None:
+            return long_activity
+        return max(long_activity, instant_activity)
 
-    def _calculate_cpu_activity(self, pid, utime, stime, pod_name, current_time) -> Optional[float]:
+    def _calculate_instant_cpu_activity(self, pid, utime, stime, starttime=None) -> Optional[float]:
+        """
+        같은 exec 안의 두 샘플로 순간 CPU 활동률 계산
+        return:
+            None or CPU 활동률 (0.0 ~ 1.0): float
+            이중 샘플링을 하지 않았거나 첫 번째 샘플에 프로세스가 없으면 None 반환
+        """
+        first_samples = self.instant_cpu_states.get('processes', {})
+        first_ticks = first_samples.get((pid, starttime))
+        if first_ticks is None:
+            return None
+
+        elapsed = self.instant_cpu_states.get('elapsed', 0)
+        if elapsed <= 0:
+            return None
+
+        cpu_diff = ((utime + stime) - first_ticks) / self.cpu_ticks_per_sec
+        return max(0.0, min(1.0, cpu_diff / elapsed))
+
+    def _calculate_long_cpu_activity(self, pid, utime, stime, pod_name, current_time, starttime=None) -> Optional[float]:
         """
         CPU 활동률 계산 (이전 계산 값과 비교)
         return:
             None or CPU 활동률 (0.0 ~ 1.0): float
             이전 계산 값이 없을 경우 None 반환
         """
-        if pod_name not in self.previous_cpu_states:
+        prev_state = self.state_store.get(pod_name)
+        if prev_state is None or prev_state.timestamp is None:
             # print(f"No previous CPU data process {pid} in {pod_name}")
             return None
 
-        prev_states = self.previous_cpu_states[pod_name].get('processes', {})
-        if pid not in prev_states:
+        prev_ticks = prev_state.cpu_ticks_of(pid, starttime)
+        if prev_ticks is None:
             return None
 
-        prev_process = prev_states[pid]
-        time_diff = current_time - self.previous_cpu_states[pod_name]['timestamp']
+        time_diff = current_time - prev_state.timestamp
 
         if time_diff <= 0:
             return None
 
         # CPU 시간 차이 계산 (utime + stime)
-        current_cpu_time = (utime + stime) / self.cpu_ticks_per_sec
-        prev_cpu_time = (prev_process['utime'] + prev_process['stime']) / self.cpu_ticks_per_sec
-
-        cpu_diff = current_cpu_time - prev_cpu_time
+        cpu_diff = ((utime + stime) - prev_ticks) / self.cpu_ticks_per_sec
 
         # CPU 활동률 = CPU 시간 증가량 / 실제 경과 시간
         cpu_activity = cpu_diff / time_diff
 
         return max(0.0, min(1.0, cpu_activity))  # 0.0 ~ 1.0 범위 제한
 
+    def _calculate_activity_scores(self, processes, cpu_activities, cgroups, pod_name, current_time) -> np.ndarray:
+        """
+        파드 내 모든 프로세스의 다중 신호 활동 점수 계산
+        이전 사이클의 누적값과 비교해 컨텍스트 스위치율, I/O 바이트율, RSS 변화량, cgroup I/O율을 구함
+        return:
+            프로세스별 활동 점수 (0.0 ~ 1.0): np.ndarray
+        """
+        prev_state = self.state_store.get(pod_name)
+        if prev_state is not None and prev_state.timestamp is None:
+            prev_state = None
+        time_diff = current_time - prev_state.timestamp if prev_state else None
+
+        n = len(processes)
+        current = np.full((n, 3), np.nan)
+        previous = np.full((n, 3), np.nan)
+        for i, p in enumerate(processes):
+            current[i] = self._activity_counters(p)
+            if prev_state is not None:
+                prev_counters = prev_state.counters_of(p.pid, p.starttime)
+                if prev_counters is not None:
+                    previous[i] = prev_counters
+
+        cgroup_io_rate = np.nan
+        cgroup_io = self._cgroup_io_total(cgroups)
+        if prev_state and cgroup_io is not None and prev_state.cgroup_io is not None:
+            cgroup_io_rate = rate(cgroup_io, prev_state.cgroup_io, time_diff)
+
+        cpu = np.array([np.nan if c is None else c for c in cpu_activities], dtype=np.float64)
+        io = rate(current[:, 1], previous[:, 1], time_diff)
+        # 파드 전체 I/O는 자체 CPU/I/O 활동이 있는 프로세스에만 반영
+        # (모든 프로세스에 나눠 주면 백그라운드 I/O만으로 오래된 유휴 프로세스가 IDLE_SCORE_THRESHOLD를 넘음)
+        # 컨텍스트 스위치도 같은 조건: 타이머로 깨어나기만 하는 대기 루프는 ctxt만으로 활성이 되지 않음
+        # (/proc/[pid]/status의 ctxt는 메인 스레드 값이라 작업 스레드의 활동은 cpu로 드러남)
+        with np.errstate(invalid='ignore'):
+            own_activity = (cpu > 0) | (io > 0)
+        signals = {
+            'cpu': cpu,
+            'ctxt': np.where(own_activity, rate(current[:, 0], previous[:, 0], time_diff), np.nan),
+            'io': io,
+            'rss': rate(current[:, 2], previous[:, 2], time_diff, absolute=True),
+            'cgroup_io': np.where(own_activity, cgroup_io_rate, np.nan),
+        }
+        return self.scorer.score(signals)
+
+    def _activity_counters(self, p) -> tuple:
+        """
+        활동 점수용 누적값 (컨텍스트 스위치 합, I/O 바이트 합, RSS bytes), 없으면 NaN
+        """
+        ctxt = io = np.nan
+        rss = p.rss * 4096 if p.rss is not None else np.nan
+        m = p.metrics
+        if m is not None:
+            if m.voluntary_ctxt_switches is not None or m.nonvoluntary_ctxt_switches is not None:
+                ctxt = (m.voluntary_ctxt_switches or 0) + (m.nonvoluntary_ctxt_switches or 0)
+            if m.read_bytes is not None or m.write_bytes is not None:
+                io = (m.read_bytes or 0) + (m.write_bytes or 0)
+            if m.vm_rss is not None:
+                rss = m.vm_rss
+        return ctxt, io, rss
+
+    @staticmethod
+    def _cgroup_io_total(cgroups: Optional[CgroupMetrics]) -> Optional[int]:
+        if cgroups is None:
+            return None
+        if cgroups.io_read_bytes is None and cgroups.io_write_bytes is None:
+            return None
+        return (cgroups.io_read_bytes or 0) + (cgroups.io_write_bytes or 0)
+
+    def _update_activity_window(self, p, pod_name, cpu_activity, current_time) -> ProcessActivityWindow:
+        """
+        프로세스 활동 이력에 현재 샘플 추가
+        return:
+            해당 프로세스의 활동 이력: ProcessActivityWindow
+        """
+        windows = self.state_store.windows(pod_name)
+        key = (p.pid, p.starttime)
+        window = windows.get(key)
+        if window is None:
+            window = ProcessActivityWindow(
+                size=self.policy.ACTIVITY_HISTORY_SIZE,
+                alpha=self.policy.ACTIVITY_EWMA_ALPHA,
+                windows=(self.policy.ACTIVITY_SHORT_WINDOW, self.policy.ACTIVITY_LONG_WINDOW)
+            )
+            windows[key] = window
+
+        ctxt_total = io_total = None
+        m = p.metrics
+        if m is not None:
+            if m.voluntary_ctxt_switches is not None or m.nonvoluntary_ctxt_switches is not None:
+                ctxt_total = (m.voluntary_ctxt_switches or 0) + (m.nonvoluntary_ctxt_switches or 0)
+            if m.read_bytes is not None or m.write_bytes is not None:
+                io_total = (m.read_bytes or 0) + (m.write_bytes or 0)
+
+        window.update(current_time, cpu_activity, ctxt_total, io_total)
+        return window
+
     def _calculate_process_age(self, starttime, btime, current_time) -> float:
         """
         프로세스 나이 계산 (단위: 초)
@@ -543,21 +756,15 @@ class ProcessManager:
         p_start_time = btime + (starttime / self.cpu_ticks_per_sec)
         return current_time - p_start_time
 
-    def _update_cpu_states(self, pod_name, processes, current_time):
+    def _update_cpu_states(self, pod_name, processes, current_time, cgroups=None):
         """
-        현재 CPU 통계를 저장
+        현재 CPU 통계와 활동 점수용 누적값을 저장 (사라진 프로세스의 상태와 활동 이력은 제거됨)
         """
-        self.previous_cpu_states[pod_name] = {
-            'timestamp': current_time,
-            'processes': {}
-        }
-
-        for p in processes:
-            self.previous_cpu_states[pod_name]['processes'][p.pid] = {
-                'utime': p.utime,
-                'stime': p.stime,
-                'comm': p.comm
-            }
+        self.state_store.update(
+            pod_name, processes, current_time,
+            [self._activity_counters(p) for p in processes],
+            self._cgroup_io_total(cgroups)
+        )
 
     def _make_gc_decision(self, summary: dict) -> Dict:
         """
@@ -565,6 +772,9 @@ class ProcessManager:
         Return:
             GC 결정 결과: dict
         """
+        if self.policy.SESSION_LEVEL_DECISION and 'sessions' in summary:
+            return self._make_session_gc_decision(summary)
+
         # 1. 활성 프로세스가 있으면 유지
         if summary['active'] > 0:
             return{
@@ -599,6 +809,40 @@ class ProcessManager:
             'reason': f"Pod has {summary['idle']} idle and {summary['gc_candidates']} inactive process"
         }
 
+    def _make_session_gc_decision(self, summary: dict) -> Dict:
+        """
+        세션 단위 집계 결과를 바탕으로 GC 결정
+        (자식 프로세스가 활성이면 부모 쉘이 유휴여도 세션 전체를 활성으로 봄)
+        Return:
+            GC 결정 결과: dict
+        """
+        # 1. 활성 세션이 있으면 유지
+        if summary['active_sessions'] > 0:
+            return {
+                'should_gc': False,
+                'reason': f"Pod has {summary['active_sessions']} active session(s)"
+            }
+
+        # 2. Zombie 프로세스가 있으면 즉시 GC
+        if summary['zombie'] > 0:
+            return {
+                'should_gc': True,
+                'reason': f"Found {summary['zombie']} zombie process(es)"
+            }
+
+        # 3. 모든 세션이 비활성이면 GC
+        if summary['gc_sessions'] == summary['sessions']:
+            return {
+                'should_gc': True,
+                'reason': f"All sessions inactive, {summary['gc_sessions']} GC candidate session(s)"
+            }
+
+        # 4. 기본적으로 GC하지 않음
+        return {
+            'should_gc': False,
+            'reason': f"Pod has {summary['idle_sessions']} idle and {summary['gc_sessions']} inactive session(s)"
+        }
+
 if __name__ == "__main__":
     startTime = time.time()
 
@@ -0,0 +1,289 @@
+"""
+선언형 프로세스 분류 정책
+- 정책 파일(TOML 또는 YAML)의 규칙 목록을 로드 시점에 판정 테이블(클로저 체인)로 컴파일
+- 규칙은 위에서부터 처음 만족하는 것을 적용 (마지막 규칙은 조건 없는 기본 규칙)
+- 단일 프로세스 판정(classify)과 파드 단위 벡터 판정(classify_many) 모두 지원
+- PolicyHandle은 파일 변경(mtime)을 감지해 재시작 없이 다시 로드
+- 정책마다 version(파일 version + 내용 해시)을 가져 분류 결과에 기록
+
+정책 파일 예 (TOML):
+    version = "default-1"
+
+    [[rules]]
+    state = "gc"
+    reason = "Zombie"
+    when = { process_state = ["Zombie", "Dead"] }
+
+    [[rules]]
+    state = "active"
+    reason = "high_cpu_activity"
+    when = { cpu_activity = { gt = 0.01 } }
+
+    [[rules]]
+    state = "idle"
+    reason = "except_idle"
+
+조건 키(facts): process_state, cpu_activity, age, score, recent_max, long_max
+숫자 조건: gt, ge, lt, le, eq, 값이 없는 경우는 "none"
+"""
+import configparser
+import hashlib
+import json
+import logging
+import os
+import threading
+import tomllib
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+CLASSIFICATION_STATES = ('active', 'idle', 'gc')
+NUMERIC_FACTS = ('cpu_activity', 'age', 'score', 'recent_max', 'long_max')
+OPERATORS = {
+    'gt': np.greater,
+    'ge': np.greater_equal,
+    'lt': np.less,
+    'le': np.less_equal,
+    'eq': np.equal,
+}
+
+class PolicyError(ValueError):
+    """정책 파일 형식 오류"""
+
+class CompiledPolicy:
+    """
+    컴파일된 판정 테이블
+    rules: [(스칼라 조건 함수, 벡터 조건 함수, state, reason)]
+    """
+    def __init__(self, version: str, rules: List[Tuple[Callable, Callable, str, str]], source: Optional[str] = None):
+        self.version = version
+        self.rules = rules
+        self.source = source
+
+    def classify(self, facts: Dict[str, object]) -> Tuple[str, str]:
+        """
+        facts: {'process_state': str, 'cpu_activity': float|None, 'age': float, ...}
+        return:
+            (state, reason)
+        """
+        for predicate, _, state, reason in self.rules:
+            if predicate(facts):
+                return state, reason
+        raise PolicyError(f"policy {self.version} has no matching rule")
+
+    def classify_many(self, facts: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        facts: 조건 키별 (n,) 배열 (숫자 값이 없으면 NaN, process_state는 문자열 배열)
+        return:
+            (state 배열, reason 배열): 규칙 순서대로 처음 만족한 규칙의 결과
+        """
+        n = len(facts['process_state'])
+        states = np.empty(n, dtype=object)
+        reasons = np.empty(n, dtype=object)
+        unassigned = np.ones(n, dtype=bool)
+        for _, predicate, state, reason in self.rules:
+            if not unassigned.any():
+                break
+            hit = unassigned & predicate(facts, n)
+            states[hit] = state
+            reasons[hit] = reason
+            unassigned &= ~hit
+        if unassigned.any():
+            raise PolicyError(f"policy {self.version} has no matching rule")
+        return states, reasons
+
+def _compile_condition(key: str, cond) -> Tuple[Callable, Callable]:
+    """조건 하나를 (스칼라 함수, 벡터 함수)로 변환"""
+    if key == 'process_state':
+        allowed = frozenset([cond] if isinstance(cond, str) else cond)
+        allowed_array = np.array(sorted(allowed), dtype=object)
+        return (lambda f: f['process_state'] in allowed,
+                lambda f, n: np.isin(f['process_state'], allowed_array))
+
+    if key not in NUMERIC_FACTS:
+        raise PolicyError(f"unknown condition key: {key}")
+
+    if cond == 'none':
+        return (lambda f: f.get(key) is None,
+                lambda f, n: np.isnan(f[key]))
+    if not isinstance(cond, dict) or not cond:
+        raise PolicyError(f"condition for {key} must be 'none' or a table of operators")
+
+    checks = []
+    for op, value in cond.items():
+        if op not in OPERATORS:
+            raise PolicyError(f"unknown operator '{op}' for {key}")
+        checks.append((OPERATORS[op], float(value)))
+
+    def scalar(f):
+        v = f.get(key)
+        if v is None:
+            return False
+        return all(bool(fn(v, value)) for fn, value in checks)
+
+    def vector(f, n):
+        arr = f[key]
+        mask = np.ones(n, dtype=bool)
+        for fn, value in checks:
+            mask &= fn(arr, value)   # NaN은 모든 비교에서 False
+        return mask
+
+    return scalar, vector
+
+def _compile_rule(rule: dict) -> Tuple[Callable, Callable, str, str]:
+    state = rule.get('state')
+    reason = rule.get('reason')
+    if state not in CLASSIFICATION_STATES:
+        raise PolicyError(f"rule state must be one of {CLASSIFICATION_STATES}: {rule}")
+    if not reason:
+        raise PolicyError(f"rule needs a reason: {rule}")
+
+    compiled = [_compile_condition(k, v) for k, v in (rule.get('when') or {}).items()]
+    scalars = tuple(c[0] for c in compiled)
+    vectors = tuple(c[1] for c in compiled)
+
+    if not compiled:
+        return (lambda f: True), (lambda f, n: np.ones(n, dtype=bool)), state, reason
+
+    def scalar(f):
+        return all(check(f) for check in scalars)
+
+    def vector(f, n):
+        mask = np.ones(n, dtype=bool)
+        for check in vectors:
+            mask &= check(f, n)
+        return mask
+
+    return scalar, vector, state, reason
+
+def compile_policy(spec: dict, source: Optional[str] = None) -> CompiledPolicy:
+    """정책 명세(dict)를 판정 테이블로 컴파일"""
+    rules = spec.get('rules')
+    if not rules:
+        raise PolicyError("policy has no rules")
+    if rules[-1].get('when'):
+        raise PolicyError("last rule must be an unconditional default rule")
+
+    digest = hashlib.sha1(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()[:8]
+    version = f"{spec.get('version', 'unversioned')}+{digest}"
+    return CompiledPolicy(version, [_compile_rule(r) for r in rules], source)
+
+def load_policy_file(path: str) -> CompiledPolicy:
+    """TOML(.toml) 또는 YAML(.yaml/.yml) 정책 파일 로드 및 컴파일"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.toml':
+        with open(path, 'rb') as f:
+            spec = tomllib.load(f)
+    elif ext in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError as e:
+            raise PolicyError("PyYAML is required for YAML policy files") from e
+        with open(path, encoding='utf-8') as f:
+            spec = yaml.safe_load(f)
+    else:
+        raise PolicyError(f"unsupported policy file type: {path}")
+    return compile_policy(spec, source=path)
+
+def default_policy_spec(policy) -> dict:
+    """
+    ProcessStatePolicy(또는 임계값을 바꾼 하위 클래스)의 상수로 기본 분류 규칙 생성
+    """
+    inactive = sorted(policy.INACTIVE_STATES)
+    active = sorted(policy.ACTIVE_STATES)
+    return {
+        'version': f"builtin-{policy.__name__}",
+        'rules': [
+            {'state': 'gc', 'reason': 'Zombie', 'when': {'process_state': inactive}},
+            {'state': 'active', 'reason': 'Running_state', 'when': {'process_state': active}},
+            {'state': 'active', 'reason': 'recent_activity_1h',
+             'when': {'recent_max': {'gt': policy.ACTIVE_CPU_THRESHOLD}}},
+            {'state': 'idle', 'reason': 'cpu_activity_None', 'when': {'cpu_activity': 'none'}},
+            {'state': 'active', 'reason': 'high_cpu_activity',
+             'when': {'cpu_activity': {'gt': policy.ACTIVE_CPU_THRESHOLD}}},
+            {'state': 'active', 'reason': 'multi_signal_activity',
+             'when': {'score': {'ge': policy.ACTIVE_SCORE_THRESHOLD}}},
+            {'state': 'idle', 'reason': 'multi_signal_idle',
+             'when': {'age': {'ge': policy.ACTIVE_AGE_THRESHOLD},
+                      'score': {'gt': policy.IDLE_SCORE_THRESHOLD}}},
+            {'state': 'gc', 'reason': 'very_old_process',
+             'when': {'age': {'ge': policy.IDLE_AGE_THRESHOLD}}},
+            {'state': 'active', 'reason': 'low_cpu_activity_1h',
+             'when': {'age': {'lt': policy.ACTIVE_AGE_THRESHOLD},
+                      'cpu_activity': {'gt': policy.IDLE_CPU_THRESHOLD}}},
+            {'state': 'idle', 'reason': 'very_low_cpu_activity_1h',
+             'when': {'age': {'lt': policy.ACTIVE_AGE_THRESHOLD},
+                      'cpu_activity': {'eq': policy.IDLE_CPU_THRESHOLD}}},
+            {'state': 'idle', 'reason': 'old_process',
+             'when': {'age': {'lt': policy.IDLE_AGE_THRESHOLD},
+                      'cpu_activity': {'gt': policy.IDLE_CPU_THRESHOLD}}},
+            {'state': 'gc', 'reason': 'old_and_very_low_cpu_activity',
+             'when': {'age': {'lt': policy.IDLE_AGE_THRESHOLD},
+                      'cpu_activity': {'eq': policy.IDLE_CPU_THRESHOLD}}},
+            {'state': 'idle', 'reason': 'except_idle'},
+        ]
+    }
+
+class PolicyHandle:
+    """
+    파일 기반 정책 핸들 (핫 리로드)
+    get()을 호출할 때 파일 mtime이 바뀌었으면 다시 컴파일
+    새 파일에 오류가 있으면 기존 정책을 유지하고 로그만 남김
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = os.stat(path).st_mtime_ns
+        self._policy = load_policy_file(path)
+
+    def get(self) -> CompiledPolicy:
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            logging.error(f"Policy file unavailable, keeping {self._policy.version}: {e}")
+            return self._policy
+
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    try:
+                        self._policy = load_policy_file(self.path)
+                        print(f"Policy reloaded: {self._policy.version}")
+                    except (PolicyError, OSError, tomllib.TOMLDecodeError) as e:
+                        logging.error(f"Policy reload failed, keeping {self._policy.version}: {e}")
+                    self._mtime = mtime
+        return self._policy
+
+_HANDLES: Dict[str, PolicyHandle] = {}
+_HANDLES_LOCK = threading.Lock()
+
+def get_policy_handle(path: str) -> PolicyHandle:
+    """경로별로 하나의 핸들을 공유 (모든 파드가 같은 정책 파일을 감시)"""
+    path = os.path.abspath(path)
+    with _HANDLES_LOCK:
+        handle = _HANDLES.get(path)
+        if handle is None:
+            handle = PolicyHandle(path)
+            _HANDLES[path] = handle
+        return handle
+
+_BUILTIN: Dict[type, CompiledPolicy] = {}
+
+def builtin_policy(policy) -> CompiledPolicy:
+    """ProcessStatePolicy 클래스별 기본 판정 테이블 (클래스당 한 번만 컴파일)"""
+    compiled = _BUILTIN.get(policy)
+    if compiled is None:
+        compiled = compile_policy(default_policy_spec(policy))
+        _BUILTIN[policy] = compiled
+    return compiled
+
+def configured_policy_file(config_path: Optional[str] = None) -> Optional[str]:
+    """config.ini의 [policy] file 설정 (없거나 비어 있으면 None, 상대 경로는 config.ini 기준)"""
+    if config_path is None:
+        config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.ini")
+    parser = configparser.ConfigParser()
+    parser.read(config_path)
+    path = parser.get("policy", "file", fallback="").strip()
+    if not path:
+        return None
+    return path if os.path.isabs(path) else os.path.join(os.path.dirname(config_path), path)
@@ -0,0 +1,305 @@
+"""
+프로세스 이력 조회 (Postgres → pandas/NumPy)
+- iter_process_frames: 서버 측 이름 있는 커서(itersize)로 구간 [start, end)의 원본 행을 청크 단위 DataFrame으로 반환
+- load_usage_series: 롤업 테이블(1m/1h/1d)에서 pod 또는 (pod, comm)별 시계열 조회 (resolution='auto'면 구간에 맞게 선택)
+- iter_process_extract: 대용량 추출용. COPY ... TO STDOUT (FORMAT binary)를 임시 파일로 받은 뒤
+  청크 단위로 NumPy 배열로 디코딩 → 메모리 사용량이 전체 크기와 무관
+모든 조회는 timestamp 범위 조건을 사용하므로 timestamp 인덱스를 탐
+"""
+import struct
+import tempfile
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from DB_postgresql import get_db_connection, _process_source, ROLLUP_RESOLUTIONS
+from processRollup import pick_resolution
+from storageBackend import PROCESS_DATA_COLUMNS, UNSIGNED_COLUMNS
+
+# 별도 지정이 없을 때 읽는 컬럼 (분석 도구가 쓰는 컬럼)
+DEFAULT_COLUMNS = (
+    "timestamp", "pid", "comm", "state", "ppid", "starttime",
+    "utime", "stime", "cutime", "minflt", "majflt", "num_threads",
+    "vsize", "rss", "rsslim", "vm_rss",
+    "voluntary_ctxt_switches", "nonvoluntary_ctxt_switches", "read_bytes", "write_bytes"
+)
+TEXT_COLUMNS = {"pod_name", "namespace", "comm", "state", "policy"}
+CATEGORY_COLUMNS = ("pod_name", "namespace", "comm", "state", "policy")
+ROLLUP_METRICS = ("samples", "cpu_ticks", "ctxt_switches", "read_bytes", "write_bytes", "rss_avg", "rss_max")
+
+def _columns(columns: Optional[Sequence[str]]) -> List[str]:
+    columns = list(columns or DEFAULT_COLUMNS)
+    unknown = set(columns) - set(PROCESS_DATA_COLUMNS)
+    if unknown:
+        raise ValueError(f"unknown process_data columns: {sorted(unknown)}")
+    return columns
+
+def _where(start, end, pods, namespace, comms):
+    """공통 조건절 (timestamp 범위 + 선택적 pod/namespace/comm 필터)"""
+    conditions = ["d.timestamp >= %s", "d.timestamp < %s"]
+    params: list = [start, end]
+    if pods:
+        conditions.append("p.pod_name = ANY(%s)")
+        params.append(list(pods))
+    if namespace is not None:
+        conditions.append("p.namespace = %s")
+        params.append(namespace)
+    if comms:
+        conditions.append("d.comm = ANY(%s)")
+        params.append(list(comms))
+    return " AND ".join(conditions), params
+
+def _compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """문자열 컬럼은 category, timestamp는 datetime, NULL이 섞인 숫자 컬럼은 숫자형으로 변환"""
+    for c in df.columns:
+        if c in CATEGORY_COLUMNS:
+            df[c] = df[c].astype("category")
+        elif c == "timestamp":
+            df[c] = pd.to_datetime(df[c])
+        elif df[c].dtype == object:
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+    return df
+
+def iter_process_frames(start, end, pods: Optional[Sequence[str]] = None, namespace: str = None,
+                        comms: Optional[Sequence[str]] = None, columns: Optional[Sequence[str]] = None,
+                        itersize: int = 50000) -> Iterator[pd.DataFrame]:
+    """
+    [start, end) 구간 원본 행을 (timestamp, pid) 순서로 itersize행씩 반환
+    서버 측 커서를 쓰므로 클라이언트 메모리에는 한 청크만 올라옴
+    """
+    columns = _columns(columns)
+    where, params = _where(start, end, pods, namespace, comms)
+    conn = get_db_connection()
+    if conn is None:
+        raise ConnectionError("Database connection failed")
+    try:
+        with conn.cursor(name="process_history") as cursor:
+            cursor.itersize = itersize
+            cursor.execute(f"""
+            SELECT p.pod_name, {", ".join("d." + c for c in columns)}
+            FROM {_process_source()} d
+            JOIN pod_info p ON p.pod_id = d.pod_id
+            WHERE {where}
+            ORDER BY d.timestamp, d.id;
+            """, params)
+            keys = ["pod_name"] + columns
+            while True:
+                rows = cursor.fetchmany(itersize)
+                if not rows:
+                    break
+                yield _compact_frame(pd.DataFrame.from_records(rows, columns=keys))
+    finally:
+        conn.close()
+
+def load_process_frame(start, end, **kwargs) -> pd.DataFrame:
+    """iter_process_frames 결과를 하나의 DataFrame으로 (category 컬럼은 청크 간 범주를 합침)"""
+    frames = list(iter_process_frames(start, end, **kwargs))
+    if not frames:
+        return pd.DataFrame(columns=["pod_name"] + _columns(kwargs.get("columns")))
+    df = pd.concat(frames, ignore_index=True)
+    for c in CATEGORY_COLUMNS:
+        if c in df.columns and df[c].dtype != "category":
+            df[c] = df[c].astype("category")
+    return df
+
+def load_usage_series(start, end, pods: Optional[Sequence[str]] = None, namespace: str = None,
+                      by: str = "pod", resolution: str = "auto", max_points: int = 500,
+                      itersize: int = 50000) -> pd.DataFrame:
+    """
+    롤업 시계열
+    by: 'pod' 또는 'comm' ((pod, comm)별)
+    resolution: '1m' | '1h' | '1d' | 'auto' (구간 길이/max_points에 맞는 가장 거친 해상도)
+    return:
+        bucket, pod_name, namespace, (comm), ROLLUP_METRICS 컬럼 DataFrame (attrs['resolution']에 해상도)
+    """
+    if by not in ("pod", "comm"):
+        raise ValueError("by must be 'pod' or 'comm'")
+    if resolution == "auto":
+        resolution = pick_resolution(start, end, max_points)
+    if resolution not in ROLLUP_RESOLUTIONS:
+        raise ValueError(f"unknown rollup resolution: {resolution}")
+
+    group_cols = "r.bucket, p.pod_name, p.namespace" + (", r.comm" if by == "comm" else "")
+    conditions = ["r.bucket >= %s", "r.bucket < %s"]
+    params: list = [start, end]
+    if pods:
+        conditions.append("p.pod_name = ANY(%s)")
+        params.append(list(pods))
+    if namespace is not None:
+        conditions.append("p.namespace = %s")
+        params.append(namespace)
+
+    conn = get_db_connection()
+    if conn is None:
+        raise ConnectionError("Database connection failed")
+    frames = []
+    try:
+        with conn.cursor(name="usage_series") as cursor:
+            cursor.itersize = itersize
+            cursor.execute(f"""
+            SELECT {group_cols},
+                SUM(r.samples), SUM(r.cpu_ticks), SUM(r.ctxt_switches),
+                SUM(r.read_bytes), SUM(r.write_bytes),
+                SUM(r.rss_sum)::float / NULLIF(SUM(r.samples), 0), MAX(r.rss_max)
+            FROM process_rollup_{resolution} r
+            JOIN pod_info p ON p.pod_id = r.pod_id
+            WHERE {" AND ".join(conditions)}
+            GROUP BY {group_cols}
+            ORDER BY {group_cols};
+            """, params)
+            keys = ["bucket", "pod_name", "namespace"] + (["comm"] if by == "comm" else []) + list(ROLLUP_METRICS)
+            while True:
+                rows = cursor.fetchmany(itersize)
+                if not rows:
+                    break
+                frames.append(pd.DataFrame.from_records(rows, columns=keys))
+    finally:
+        conn.close()
+
+    keys = ["bucket", "pod_name", "namespace"] + (["comm"] if by == "comm" else []) + list(ROLLUP_METRICS)
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=keys)
+    df["bucket"] = pd.to_datetime(df["bucket"])
+    for c in ("pod_name", "namespace", "comm"):
+        if c in df.columns:
+            df[c] = df[c].astype("category")
+    df.attrs["resolution"] = resolution
+    return df
+
+# ---------------------------
+# COPY (FORMAT binary) 추출
+# ---------------------------
+_PGCOPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+_PG_EPOCH = np.datetime64("2000-01-01T00:00:00", "us")
+
+def _column_kind(column: str) -> str:
+    if column == "timestamp":
+        return "timestamp"
+    if column in TEXT_COLUMNS:
+        return "text"
+    if column in UNSIGNED_COLUMNS:
+        return "float8"  # 2^63 이상 값이 있을 수 있으므로 실수로 추출
+    return "int8"
+
+def _select_expr(column: str, kind: str) -> str:
+    if kind == "text":
+        return f"d.{column}::text"
+    if kind == "float8":
+        return f"d.{column}::numeric::float8"
+    if kind == "int8":
+        return f"d.{column}::int8"
+    return f"d.{column}"
+
+class _ColumnBuffer:
+    """한 청크 동안 한 컬럼의 값을 모으고 NumPy 배열로 변환"""
+    def __init__(self, kind: str, size: int):
+        self.kind = kind
+        self.mask = np.zeros(size, dtype=bool)  # True = NULL
+        if kind == "text":
+            self.values = np.empty(size, dtype=object)
+        elif kind == "float8":
+            self.values = np.full(size, np.nan, dtype=np.float64)
+        else:
+            self.values = np.zeros(size, dtype=np.int64)
+
+    def finish(self, n: int):
+        values, mask = self.values[:n], self.mask[:n]
+        if self.kind == "timestamp":
+            out = (_PG_EPOCH + values.astype("timedelta64[us]")).astype("datetime64[ns]")
+            out[mask] = np.datetime64("NaT")
+            return out
+        if self.kind == "int8":
+            return pd.arrays.IntegerArray(values.copy(), mask.copy())
+        return values.copy()
+
+def iter_copy_binary(stream, columns: Sequence[str], kinds: Sequence[str],
+                     chunk_rows: int = 200000, read_size: int = 1 << 22) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    COPY binary 스트림을 chunk_rows행씩 {컬럼: 배열}로 디코딩
+    kinds: 컬럼별 'int8' | 'float8' | 'timestamp' | 'text'
+    """
+    buf = bytearray(stream.read(max(read_size, 19)))
+    if bytes(buf[:11]) != _PGCOPY_SIGNATURE:
+        raise ValueError("not a PGCOPY binary stream")
+    _, ext_len = struct.unpack_from(">ii", buf, 11)
+    pos = 19 + ext_len
+    eof = False
+
+    ncols = len(columns)
+    buffers = [_ColumnBuffer(k, chunk_rows) for k in kinds]
+    n = 0
+    while True:
+        # 튜플 하나가 버퍼 경계에 걸치면 더 읽어서 이어 붙임
+        if not eof and len(buf) - pos < read_size // 2:
+            more = stream.read(read_size)
+            if more:
+                del buf[:pos]
+                pos = 0
+                buf += more
+            else:
+                eof = True
+        if len(buf) - pos < 2:
+            break
+        (field_count,) = struct.unpack_from(">h", buf, pos)
+        if field_count == -1:
+            break  # 트레일러
+        if field_count != ncols:
+            raise ValueError(f"expected {ncols} fields, got {field_count}")
+        pos += 2
+        for i, b in enumerate(buffers):
+            (length,) = struct.unpack_from(">i", buf, pos)
+            pos += 4
+            if length < 0:
+                b.mask[n] = True
+                continue
+            if b.kind == "text":
+                b.values[n] = buf[pos:pos + length].decode("utf-8")
+            elif b.kind == "float8":
+                (b.values[n],) = struct.unpack_from(">d", buf, pos)
+            else:  # int8, timestamp(마이크로초)
+                (b.values[n],) = struct.unpack_from(">q", buf, pos)
+            pos += length
+        n += 1
+        if n == chunk_rows:
+            yield {c: b.finish(n) for c, b in zip(columns, buffers)}
+            buffers = [_ColumnBuffer(k, chunk_rows) for k in kinds]
+            n = 0
+    if n:
+        yield {c: b.finish(n) for c, b in zip(columns, buffers)}
+
+def iter_process_extract(start, end, pods: Optional[Sequence[str]] = None, namespace: str = None,
+                         comms: Optional[Sequence[str]] = None, columns: Optional[Sequence[str]] = None,
+                         chunk_rows: int = 200000) -> Iterator[pd.DataFrame]:
+    """
+    대용량 구간 추출: 서버가 binary COPY로 보낸 결과를 임시 파일에 받은 뒤 chunk_rows행씩 DataFrame으로 반환
+    (DB 연결은 COPY가 끝나면 바로 반환)
+    """
+    columns = _columns(columns)
+    out_columns = ["pod_name"] + columns
+    kinds = [_column_kind(c) for c in out_columns]
+    exprs = ["p.pod_name::text"] + [_select_expr(c, k) for c, k in zip(columns, kinds[1:])]
+    where, params = _where(start, end, pods, namespace, comms)
+
+    conn = get_db_connection()
+    if conn is None:
+        raise ConnectionError("Database connection failed")
+    with tempfile.TemporaryFile() as spill:
+        try:
+            with conn.cursor() as cursor:
+                query = cursor.mogrify(f"""
+                SELECT {", ".join(exprs)}
+                FROM {_process_source()} d
+                JOIN pod_info p ON p.pod_id = d.pod_id
+                WHERE {where}
+                ORDER BY d.timestamp, d.id
+                """, params).decode()
+                cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT binary)", spill)
+        finally:
+            conn.close()
+        spill.seek(0)
+        for chunk in iter_copy_binary(spill, out_columns, kinds, chunk_rows):
+            df = pd.DataFrame(chunk)
+            for c in CATEGORY_COLUMNS:
+                if c in df.columns:
+                    df[c] = df[c].astype("category")
+            yield df
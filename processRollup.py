@@ -0,0 +1,94 @@
+"""
+프로세스 메트릭 롤업 (1m/1h/1d 집계 테이블)
+- RollupWorker: 백그라운드 스레드에서 주기적으로 DB_postgresql.refresh_rollups 실행
+  (행을 넣을 때 트리거가 표시한 (버킷, pod)만 원본에서 다시 계산)
+- query_usage: 조회 구간과 원하는 점 개수에 맞는 가장 거친 해상도를 골라 롤업 테이블 조회
+집계 SQL은 DB_postgresql에 있고, 이 모듈은 주기 실행과 해상도 선택만 담당
+"""
+import configparser
+import os
+import threading
+from datetime import datetime
+from typing import List, Optional
+
+from DB_postgresql import ROLLUP_RESOLUTIONS, refresh_rollups, query_rollup
+
+_config = configparser.ConfigParser()
+_config.read(os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.ini"))
+
+ROLLUP_ENABLED = _config.getboolean("rollup", "enabled", fallback=False)
+ROLLUP_INTERVAL = _config.getfloat("rollup", "interval", fallback=60.0)
+ROLLUP_LOOKBACK = _config.getint("rollup", "lookback", fallback=600)
+
+def pick_resolution(start: datetime, end: datetime, max_points: int = 500,
+                    step_seconds: Optional[float] = None) -> str:
+    """
+    버킷 길이가 요청 간격(step_seconds, 없으면 (end - start) / max_points) 이하인 해상도 중 가장 거친 것
+    모든 해상도가 요청 간격보다 길면 가장 세밀한 해상도(1m)
+    """
+    if step_seconds is None:
+        step_seconds = (end - start).total_seconds() / max(1, max_points)
+    chosen = min(ROLLUP_RESOLUTIONS, key=lambda r: ROLLUP_RESOLUTIONS[r][1])
+    for resolution, (_, seconds) in sorted(ROLLUP_RESOLUTIONS.items(), key=lambda item: item[1][1]):
+        if seconds <= step_seconds:
+            chosen = resolution
+    return chosen
+
+def query_usage(start: datetime, end: datetime, pod_name: str = None, namespace: str = None,
+                by_comm: bool = False, max_points: int = 500,
+                step_seconds: Optional[float] = None) -> Optional[List[dict]]:
+    """
+    구간 [start, end)의 pod(또는 pod, comm)별 사용량
+    return:
+        query_rollup 결과에 'resolution' 키를 더한 행 목록 (실패 시 None)
+    """
+    resolution = pick_resolution(start, end, max_points, step_seconds)
+    rows = query_rollup(resolution, start, end, pod_name, namespace, by_comm)
+    if rows is None:
+        return None
+    for row in rows:
+        row["resolution"] = resolution
+    return rows
+
+class RollupWorker(threading.Thread):
+    """
+    interval 초마다 롤업 갱신 (밀린 표시가 batch 단위로 남아 있으면 바로 이어서 처리)
+    stop()으로 종료
+    """
+    def __init__(self, interval: float = ROLLUP_INTERVAL, lookback_seconds: int = ROLLUP_LOOKBACK,
+                 batch_marks: int = 5000):
+        super().__init__(name="process-rollup", daemon=True)
+        self.interval = interval
+        self.lookback_seconds = lookback_seconds
+        self.batch_marks = batch_marks
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                while not self._stop_event.is_set():
+                    count = refresh_rollups(self.lookback_seconds, self.batch_marks)
+                    if not count or count < self.batch_marks:
+                        break
+            except Exception as e:
+                # 롤업 실패는 수집을 멈추지 않도록 로그만 남김
+                print(f"[ROLLUP] Failed to refresh rollups: {e}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop_event.set()
+        self.join(timeout)
+
+_WORKER: Optional[RollupWorker] = None
+_WORKER_LOCK = threading.Lock()
+
+def start_rollup_worker() -> Optional[RollupWorker]:
+    """config.ini [rollup] enabled = true일 때만 워커 시작 (프로세스당 하나)"""
+    global _WORKER
+    if not ROLLUP_ENABLED:
+        return None
+    with _WORKER_LOCK:
+        if _WORKER is None or not _WORKER.is_alive():
+            _WORKER = RollupWorker()
+            _WORKER.start()
+        return _WORKER
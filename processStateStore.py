@@ -0,0 +1,135 @@
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+class PodProcessState:
+    """
+    파드 하나의 직전 사이클 상태
+    (pid, starttime) → 행 번호 인덱스 하나와 고정 크기 배열로 저장 (프로세스별 dict 생성 없음)
+    """
+    __slots__ = ('timestamp', 'index', 'cpu_ticks', 'counters', 'cgroup_io', 'windows')
+
+    COUNTERS = 3  # 컨텍스트 스위치 합, I/O 바이트 합, RSS bytes
+
+    def __init__(self):
+        self.timestamp: Optional[float] = None
+        self.index: Dict[tuple, int] = {}
+        self.cpu_ticks = array('q')
+        self.counters = array('d')
+        self.cgroup_io: Optional[int] = None
+        self.windows: Dict[tuple, object] = {}  # (pid, starttime)별 활동 이력
+
+    def lookup(self, pid, starttime) -> Optional[int]:
+        """직전 스냅샷에서 같은 프로세스(pid 재사용 제외)의 행 번호"""
+        return self.index.get((pid, starttime))
+
+    def cpu_ticks_of(self, pid, starttime) -> Optional[int]:
+        row = self.index.get((pid, starttime))
+        return None if row is None else self.cpu_ticks[row]
+
+    def counters_of(self, pid, starttime) -> Optional[tuple]:
+        row = self.index.get((pid, starttime))
+        if row is None:
+            return None
+        base = row * self.COUNTERS
+        return tuple(self.counters[base:base + self.COUNTERS])
+
+    def memory_usage(self) -> int:
+        """대략적인 메모리 사용량 (bytes)"""
+        size = sys.getsizeof(self.index) + sys.getsizeof(self.windows)
+        size += self.cpu_ticks.buffer_info()[1] * self.cpu_ticks.itemsize
+        size += self.counters.buffer_info()[1] * self.counters.itemsize
+        for window in self.windows.values():
+            size += window.memory_usage()
+        return size
+
+class ProcessStateStore:
+    """
+    파드별 직전 사이클 프로세스 상태 저장소
+    - 키: (pid, starttime) → 재사용된 PID를 다른 프로세스로 구분
+    - GarbageCollector의 podlist에서 빠진 파드는 retain/evict로 제거
+    - max_pods를 넘으면 가장 오래 갱신되지 않은 파드부터 제거
+    """
+    def __init__(self, max_pods: int = 10000):
+        self.max_pods = max_pods
+        self._pods: "OrderedDict[str, PodProcessState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, pod_name: str) -> Optional[PodProcessState]:
+        return self._pods.get(pod_name)
+
+    def windows(self, pod_name: str) -> Dict[tuple, object]:
+        """파드의 활동 이력 딕셔너리 (없으면 빈 상태 생성)"""
+        with self._lock:
+            state = self._pods.get(pod_name)
+            if state is None:
+                state = PodProcessState()
+                self._pods[pod_name] = state
+                self._evict_overflow()
+            return state.windows
+
+    def update(self, pod_name: str, processes: list, timestamp: float, counters: list,
+               cgroup_io: Optional[int] = None):
+        """
+        새 스냅샷으로 파드 상태 교체
+        counters: 프로세스 순서와 같은 (ctxt, io, rss) 튜플 목록
+        사라진 프로세스의 활동 이력도 함께 정리
+        """
+        index = {}
+        cpu_ticks = array('q', bytes(8 * len(processes)))
+        flat = array('d', bytes(8 * PodProcessState.COUNTERS * len(processes)))
+        for row, (p, c) in enumerate(zip(processes, counters)):
+            index[(p.pid, p.starttime)] = row
+            cpu_ticks[row] = (p.utime or 0) + (p.stime or 0)
+            base = row * PodProcessState.COUNTERS
+            flat[base:base + PodProcessState.COUNTERS] = array('d', c)
+
+        with self._lock:
+            state = self._pods.get(pod_name)
+            if state is None:
+                state = PodProcessState()
+                self._pods[pod_name] = state
+            state.timestamp = timestamp
+            state.index = index
+            state.cpu_ticks = cpu_ticks
+            state.counters = flat
+            state.cgroup_io = cgroup_io
+            for key in [k for k in state.windows if k not in index]:
+                del state.windows[key]
+            self._pods.move_to_end(pod_name)
+            self._evict_overflow()
+
+    def evict(self, pod_name: str):
+        with self._lock:
+            self._pods.pop(pod_name, None)
+
+    def retain(self, pod_names: Iterable[str]):
+        """pod_names에 없는 파드 상태를 모두 제거"""
+        keep = set(pod_names)
+        with self._lock:
+            for name in [n for n in self._pods if n not in keep]:
+                del self._pods[name]
+
+    def _evict_overflow(self):
+        while len(self._pods) > self.max_pods:
+            self._pods.popitem(last=False)
+
+    def memory_usage(self) -> dict:
+        """
+        return:
+            {'pods': 파드 수, 'processes': 프로세스 수, 'bytes': 전체 bytes, 'per_pod': {pod_name: bytes}}
+        """
+        with self._lock:
+            per_pod = {name: state.memory_usage() for name, state in self._pods.items()}
+            processes = sum(len(state.index) for state in self._pods.values())
+        return {
+            'pods': len(per_pod),
+            'processes': processes,
+            'bytes': sum(per_pod.values()) + sys.getsizeof(self._pods),
+            'per_pod': per_pod,
+        }
+
+# ProcessManager들이 공유하는 기본 저장소 (GarbageCollector가 podlist 기준으로 정리)
+PROCESS_STATE_STORE = ProcessStateStore()
@@ -0,0 +1,91 @@
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List
+
+class ProcessTree:
+    """
+    ppid/pgrp/session 기반 프로세스 트리 (파드 단위)
+    - pid를 키로 하는 인덱스와 자식 목록을 O(n)으로 구성
+    - 프로세스 분류 결과를 세션/트리(루트 프로세스 기준) 단위로 집계
+    """
+    def __init__(self, processes: Iterable):
+        self.by_pid: Dict[int, object] = {}
+        self.children: Dict[int, List[int]] = defaultdict(list)
+        self.sessions: Dict[int, List[int]] = defaultdict(list)
+        self.groups: Dict[int, List[int]] = defaultdict(list)
+        self.roots: List[int] = []
+
+        for p in processes:
+            self.by_pid[p.pid] = p
+
+        for pid, p in self.by_pid.items():
+            if p.ppid in self.by_pid and p.ppid != pid:
+                self.children[p.ppid].append(pid)
+            else:
+                # 부모가 파드 밖(또는 수집되지 않음)이면 루트
+                self.roots.append(pid)
+            self.sessions[p.session].append(pid)
+            self.groups[p.pgrp].append(pid)
+
+    def iter_top_down(self):
+        """
+        부모가 자식보다 먼저 나오도록 순회 (BFS)
+        yield: (process, parent process 또는 None)
+        """
+        visited = set()
+        queue = deque((pid, None) for pid in self.roots)
+        while queue:
+            pid, parent_pid = queue.popleft()
+            if pid in visited:
+                continue
+            visited.add(pid)
+            yield self.by_pid[pid], (self.by_pid[parent_pid] if parent_pid is not None else None)
+            for child in self.children.get(pid, ()):
+                queue.append((child, pid))
+
+        # 순환 등으로 루트에서 닿지 않은 프로세스도 누락 없이 반환
+        for pid, p in self.by_pid.items():
+            if pid not in visited:
+                visited.add(pid)
+                yield p, None
+
+    def tree_roots(self) -> Dict[int, int]:
+        """
+        return:
+            pid별 소속 트리의 루트 pid: dict
+        """
+        root_of = {}
+        for p, parent in self.iter_top_down():
+            root_of[p.pid] = root_of.get(parent.pid, parent.pid) if parent is not None else p.pid
+        return root_of
+
+    def rollup(self, states: Dict[int, object], active, gc, idle, by: str = 'session') -> Dict[int, object]:
+        """
+        프로세스별 분류 결과를 세션(by='session') 또는 트리(by='tree') 단위로 집계
+        - 구성원 중 하나라도 active면 active
+        - 모든 구성원이 gc면 gc
+        - 그 외는 idle
+        states: {pid: 분류 상태}
+        return:
+            {session id 또는 루트 pid: 분류 상태}
+        """
+        if by == 'session':
+            members = self.sessions
+        elif by == 'tree':
+            members = defaultdict(list)
+            for pid, root in self.tree_roots().items():
+                members[root].append(pid)
+        else:
+            raise ValueError(f"unknown rollup key: {by}")
+
+        result = {}
+        for key, pids in members.items():
+            member_states = [states[pid] for pid in pids if pid in states]
+            if not member_states:
+                continue
+            if any(s == active for s in member_states):
+                result[key] = active
+            elif all(s == gc for s in member_states):
+                result[key] = gc
+            else:
+                result[key] = idle
+        return result
@@ -0,0 +1,357 @@
+"""
+프로세스 샘플 바이너리 로그 (Postgres 없이 장기간 원본 샘플 보관용)
+- 추가만 하는 세그먼트 파일에 블록 단위로 기록, 블록마다 zstd(zstandard 설치 시) 또는 zlib 압축
+- 누적 카운터(utime, stime, minflt, read_bytes, ...)는 블록 안에서 같은 (pod, pid, starttime)의
+  직전 값과의 차이로 저장 → 블록 하나만으로 복원 가능(임의 접근)
+- 세그먼트는 크기/시간 기준으로 교체, 세그먼트마다 블록 색인(<세그먼트>.idx, JSON lines) 유지
+- SampleLogReader.read()는 build_normalized_usage_table에 바로 넣을 수 있는 DataFrame 반환
+
+블록 형식: MAGIC | u32 header 길이 | u32 payload 길이 | header(JSON) | 압축된 payload
+payload: u32 문자열 표 길이 | 문자열 표(JSON) | timestamp(double) | 문자열 컬럼(u32 인덱스) | 숫자 컬럼(int64)
+"""
+import atexit
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MAGIC = b"PSL1"
+BLOCK_HEADER = struct.Struct("<II")
+NULL = -(1 << 63)  # 값 없음
+
+STRING_COLUMNS = ("pod_name", "comm", "state")
+INT_COLUMNS = (
+    "pid", "starttime", "ppid", "session",
+    "utime", "stime", "cutime", "cstime", "minflt", "majflt", "cminflt", "cmajflt",
+    "num_threads", "vsize", "rss", "rsslim", "vm_rss_status",
+    "voluntary_ctxt_switches", "nonvoluntary_ctxt_switches", "read_bytes", "write_bytes",
+)
+# 블록 안에서 직전 값과의 차이로 저장하는 누적 카운터
+DELTA_COLUMNS = frozenset((
+    "utime", "stime", "cutime", "cstime", "minflt", "majflt", "cminflt", "cmajflt",
+    "voluntary_ctxt_switches", "nonvoluntary_ctxt_switches", "read_bytes", "write_bytes",
+))
+# int64 범위를 넘을 수 있는 unsigned 값 (2의 보수로 저장, 읽을 때 복원)
+UNSIGNED_COLUMNS = frozenset(("vsize", "rsslim"))
+METRIC_ATTRS = {
+    "voluntary_ctxt_switches": "voluntary_ctxt_switches",
+    "nonvoluntary_ctxt_switches": "nonvoluntary_ctxt_switches",
+    "vm_rss_status": "vm_rss",
+    "read_bytes": "read_bytes",
+    "write_bytes": "write_bytes",
+}
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return zlib.compress(data, 6)
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed sample log blocks")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+def _to_int64(value) -> int:
+    if value is None:
+        return NULL
+    value = int(value)
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+class SampleLogWriter:
+    """
+    샘플 로그 writer (스레드 안전)
+    append(): 파드 한 사이클의 프로세스 목록 추가
+    block_rows/block_seconds: 이 행 수 또는 시간을 넘으면 블록을 압축해 기록
+    rotate_bytes/rotate_seconds: 세그먼트 교체 기준
+    """
+    def __init__(self, directory: str, block_rows: int = 50000, block_seconds: float = 300,
+                 rotate_bytes: int = 256 << 20, rotate_seconds: float = 24 * 60 * 60,
+                 codec: Optional[str] = None):
+        self.directory = directory
+        self.block_rows = block_rows
+        self.block_seconds = block_seconds
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.codec = codec or ("zstd" if zstandard is not None else "zlib")
+
+        self._lock = threading.Lock()
+        self._segment = None
+        self._segment_path: Optional[str] = None
+        self._segment_opened = 0.0
+        self._reset_block()
+        os.makedirs(directory, exist_ok=True)
+
+    def _reset_block(self):
+        self._strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self._timestamps = array("d")
+        self._string_cols = {c: array("I") for c in STRING_COLUMNS}
+        self._int_cols = {c: array("q") for c in INT_COLUMNS}
+        self._last: Dict[tuple, List[int]] = {}  # (pod, pid, starttime) → 누적 카운터 직전 값
+        self._pods = set()
+        self._block_started = time.monotonic()
+
+    def _string_id(self, s) -> int:
+        s = "" if s is None else str(s)
+        sid = self._string_ids.get(s)
+        if sid is None:
+            sid = len(self._strings)
+            self._strings.append(s)
+            self._string_ids[s] = sid
+        return sid
+
+    def append(self, pod_name: str, timestamp: float, processes: Iterable):
+        """
+        timestamp: epoch 초 (UTC)
+        processes: Process 목록 (metrics 포함)
+        """
+        with self._lock:
+            pod_id = self._string_id(pod_name)
+            self._pods.add(pod_name)
+            for p in processes:
+                self._timestamps.append(timestamp)
+                self._string_cols["pod_name"].append(pod_id)
+                self._string_cols["comm"].append(self._string_id(p.comm))
+                self._string_cols["state"].append(self._string_id(p.state))
+
+                key = (pod_name, p.pid, p.starttime)
+                last = self._last.get(key)
+                if last is None:
+                    last = self._last[key] = [NULL] * len(INT_COLUMNS)
+                for i, col in enumerate(INT_COLUMNS):
+                    if col in METRIC_ATTRS:
+                        value = getattr(p.metrics, METRIC_ATTRS[col], None) if p.metrics else None
+                    else:
+                        value = getattr(p, col, None)
+                    value = _to_int64(value)
+                    if col in DELTA_COLUMNS and value != NULL:
+                        prev = last[i]
+                        last[i] = value
+                        if prev != NULL:
+                            value -= prev
+                    self._int_cols[col].append(value)
+
+            if (len(self._timestamps) >= self.block_rows
+                    or time.monotonic() - self._block_started >= self.block_seconds):
+                self._write_block()
+
+    def flush(self):
+        """현재 블록을 기록"""
+        with self._lock:
+            self._write_block()
+            if self._segment is not None:
+                self._segment.flush()
+
+    def close(self):
+        with self._lock:
+            self._write_block()
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+
+    def _open_segment(self):
+        name = "samples-" + datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        path = os.path.join(self.directory, name + ".psl")
+        n = 1
+        while os.path.exists(path):
+            path = os.path.join(self.directory, f"{name}-{n}.psl")
+            n += 1
+        self._segment = open(path, "ab")
+        self._segment_path = path
+        self._segment_opened = time.monotonic()
+
+    def _write_block(self):
+        rows = len(self._timestamps)
+        if rows == 0:
+            return
+
+        strings = json.dumps(self._strings).encode("utf-8")
+        parts = [struct.pack("<I", len(strings)), strings, self._timestamps.tobytes()]
+        parts += [self._string_cols[c].tobytes() for c in STRING_COLUMNS]
+        parts += [self._int_cols[c].tobytes() for c in INT_COLUMNS]
+        payload = _compress(b"".join(parts), self.codec)
+
+        header = json.dumps({
+            "codec": self.codec,
+            "rows": rows,
+            "min_ts": min(self._timestamps),
+            "max_ts": max(self._timestamps),
+            "pods": sorted(self._pods),
+            "columns": list(INT_COLUMNS),
+        }).encode("utf-8")
+
+        if self._segment is None:
+            self._open_segment()
+        offset = self._segment.tell()
+        self._segment.write(MAGIC + BLOCK_HEADER.pack(len(header), len(payload)) + header + payload)
+        self._segment.flush()
+        length = self._segment.tell() - offset
+
+        entry = json.loads(header)
+        entry.update(offset=offset, length=length)
+        entry.pop("columns")
+        with open(self._segment_path + ".idx", "a", encoding="utf-8") as idx:
+            idx.write(json.dumps(entry) + "\n")
+
+        self._reset_block()
+        if (self._segment.tell() >= self.rotate_bytes
+                or time.monotonic() - self._segment_opened >= self.rotate_seconds):
+            self._segment.close()
+            self._segment = None
+
+def _decode_block(header: dict, payload: bytes) -> dict:
+    """압축 해제된 블록을 컬럼별 numpy 배열로 복원 (누적 카운터 차분 복원 포함)"""
+    import numpy as np
+    import pandas as pd
+
+    data = _decompress(payload, header["codec"])
+    rows = header["rows"]
+    (strings_len,) = struct.unpack_from("<I", data, 0)
+    pos = 4
+    strings = np.array(json.loads(data[pos:pos + strings_len].decode("utf-8")), dtype=object)
+    pos += strings_len
+
+    columns = {}
+    columns["timestamp"] = np.frombuffer(data, dtype="<f8", count=rows, offset=pos)
+    pos += 8 * rows
+    for c in STRING_COLUMNS:
+        columns[c] = strings[np.frombuffer(data, dtype="<u4", count=rows, offset=pos)]
+        pos += 4 * rows
+
+    ints = {}
+    for c in header["columns"]:
+        ints[c] = np.frombuffer(data, dtype="<i8", count=rows, offset=pos)
+        pos += 8 * rows
+
+    keys = pd.DataFrame({"pod": columns["pod_name"], "pid": ints["pid"], "starttime": ints["starttime"]})
+    group_ids = keys.groupby(["pod", "pid", "starttime"], sort=False).ngroup().to_numpy()
+
+    for c, raw in ints.items():
+        nulls = raw == NULL
+        if c in DELTA_COLUMNS:
+            # 키별로 값이 있는 행만 누적합 → 원래 누적값
+            values = pd.Series(np.where(nulls, 0, raw)).groupby(group_ids).cumsum().to_numpy()
+        else:
+            values = raw
+        if c in UNSIGNED_COLUMNS:
+            values = values.astype("uint64")
+        if nulls.any():
+            values = values.astype("float64")
+            values[nulls] = np.nan
+        columns[c] = values
+    return columns
+
+class SampleLogReader:
+    """
+    샘플 로그 reader
+    색인(.idx)으로 파드/시간 범위에 해당하는 블록만 읽음 (색인이 없으면 블록 헤더를 순서대로 읽어 재구성)
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def segments(self) -> List[str]:
+        return sorted(
+            os.path.join(self.directory, f) for f in os.listdir(self.directory) if f.endswith(".psl")
+        )
+
+    def index(self, segment: str) -> List[dict]:
+        idx_path = segment + ".idx"
+        if os.path.exists(idx_path):
+            with open(idx_path, encoding="utf-8") as f:
+                return [json.loads(line) for line in f if line.strip()]
+        return list(self._scan(segment))
+
+    @staticmethod
+    def _scan(segment: str) -> Iterator[dict]:
+        with open(segment, "rb") as f:
+            while True:
+                offset = f.tell()
+                head = f.read(len(MAGIC) + BLOCK_HEADER.size)
+                if len(head) < len(MAGIC) + BLOCK_HEADER.size or head[:4] != MAGIC:
+                    return
+                header_len, payload_len = BLOCK_HEADER.unpack(head[4:])
+                entry = json.loads(f.read(header_len))
+                f.seek(payload_len, os.SEEK_CUR)
+                entry.update(offset=offset, length=f.tell() - offset)
+                yield entry
+
+    def blocks(self, pods: Optional[Iterable[str]] = None, start: Optional[float] = None,
+               end: Optional[float] = None) -> Iterator[dict]:
+        """조건에 맞는 블록을 컬럼 dict로 반환 (start, end: epoch 초)"""
+        pods = set(pods) if pods is not None else None
+        for segment in self.segments():
+            entries = [
+                e for e in self.index(segment)
+                if (start is None or e["max_ts"] >= start)
+                and (end is None or e["min_ts"] <= end)
+                and (pods is None or pods.intersection(e["pods"]))
+            ]
+            if not entries:
+                continue
+            with open(segment, "rb") as f:
+                for e in entries:
+                    f.seek(e["offset"])
+                    block = f.read(e["length"])
+                    header_len, payload_len = BLOCK_HEADER.unpack_from(block, len(MAGIC))
+                    body = len(MAGIC) + BLOCK_HEADER.size
+                    header = json.loads(block[body:body + header_len])
+                    yield _decode_block(header, block[body + header_len:body + header_len + payload_len])
+
+    def read(self, pods: Optional[Iterable[str]] = None, start: Optional[float] = None,
+             end: Optional[float] = None):
+        """
+        return:
+            pd.DataFrame (CSV와 같은 컬럼 이름, timestamp는 datetime)
+        """
+        import numpy as np
+        import pandas as pd
+
+        frames = [pd.DataFrame(cols) for cols in self.blocks(pods, start, end)]
+        if not frames:
+            return pd.DataFrame(columns=["timestamp", *STRING_COLUMNS, *INT_COLUMNS])
+        df = pd.concat(frames, ignore_index=True)
+
+        mask = np.ones(len(df), dtype=bool)
+        if pods is not None:
+            mask &= df["pod_name"].isin(list(pods)).to_numpy()
+        if start is not None:
+            mask &= (df["timestamp"] >= start).to_numpy()
+        if end is not None:
+            mask &= (df["timestamp"] <= end).to_numpy()
+        df = df[mask].reset_index(drop=True)
+        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s")
+        return df
+
+_WRITERS: Dict[str, SampleLogWriter] = {}
+_WRITERS_LOCK = threading.Lock()
+
+def get_sample_log(directory: str, **options) -> SampleLogWriter:
+    """디렉터리별로 하나의 writer 공유"""
+    directory = os.path.abspath(directory)
+    with _WRITERS_LOCK:
+        writer = _WRITERS.get(directory)
+        if writer is None:
+            writer = SampleLogWriter(directory, **options)
+            _WRITERS[directory] = writer
+        return writer
+
+def close_all():
+    with _WRITERS_LOCK:
+        writers = list(_WRITERS.values())
+        _WRITERS.clear()
+    for writer in writers:
+        writer.close()
+
+atexit.register(close_all)
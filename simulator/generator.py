@@ -6,6 +6,8 @@ from multiprocessing import Process, Event
 import random
 
 from pod import Pod
+from csvSink import flush_all
+from arrowSink import end_cycle_all
 from processManager import ProcessManager
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -167,6 +169,10 @@ class Generator:
                             except Exception as e:
                                 print(f"[WARN] Fail to collect status for a pod: {e}")
 
+                    # 사이클 경계: 이번 회차 데이터를 파일에 반영
+                    flush_all()
+                    end_cycle_all()
+
                     elapsed = time.perf_counter() - start_ts
                     print(f"[TIMING] Collected statuses for {len(self.pod_list)} pods [{elapsed:.3f}s]")
 
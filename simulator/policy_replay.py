@@ -0,0 +1,269 @@
+"""
+기록된 실험 데이터(process_metrics_experiment*.csv)를 가상 시간으로 재생하여
+ProcessStatePolicy 임계값 변형별 GC 결정을 평가하는 오프라인 재생 엔진
+
+- 각 파드의 사이클(같은 pod_name, timestamp 행 묶음)을 순서대로 ProcessManager 분류/_make_gc_decision에 통과
+- 실제 시각 대신 CSV의 timestamp를 사용하므로 대기 없이 재생
+- (파일 × 정책 변형) 단위로 여러 코어에서 병렬 실행
+- 파드 이름으로 알 수 있는 실제 유형(active/idle/running/background)과 비교한 혼동 행렬 출력
+
+사용 예 (저장소 루트에서):
+    python -m simulator.policy_replay data/ --set ACTIVE_CPU_THRESHOLD=0.005,0.01,0.02 --workers 8
+"""
+import argparse
+import ast
+import csv
+import glob
+import itertools
+import os
+import re
+from datetime import datetime, timezone
+from multiprocessing import Pool
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from csvRotation import csv_parts, group_parts
+from process import Process, ProcessMetrics
+from processManager import ProcessManager, ProcessStatePolicy
+from processStateStore import ProcessStateStore
+
+# 파드 이름 접두사 → 실제 유형, 유형별로 GC 되어야 하는지
+POD_TYPES = ('active', 'idle', 'running', 'background')
+EXPECTED_GC = {'active': False, 'idle': True, 'running': False, 'background': False}
+
+# 헤더 없는(과거) CSV용 컬럼 순서 (Pod.PROCESS_HEADERS와 동일)
+PROCESS_HEADERS = [
+    "pod_name", "timestamp", "pid", "comm", "state", "ppid", "pgrp", "session", "tty_nr", "tpgid", "flags",
+    "minflt", "cminflt", "majflt", "cmajflt", "utime", "stime", "cutime", "cstime", "priority", "nice",
+    "num_threads", "itrealvalue", "starttime", "vsize", "rss", "rsslim", "startcode", "endcode",
+    "startstack", "kstkesp", "kstkeip", "signal", "blocked", "sigignore", "sigcatch", "wchan", "nswap",
+    "cnswap", "exit_signal", "processor", "rt_priority", "policy", "delayacct_blkio_ticks", "guest_time",
+    "cguest_time", "start_data", "end_data", "start_brk", "arg_start", "arg_end", "env_start", "env_end",
+    "exit_code", "voluntary_ctxt_switches", "nonvoluntary_ctxt_switches", "vm_rss_status",
+    "read_bytes", "write_bytes"
+]
+TEXT_FIELDS = {"pod_name", "timestamp", "comm", "state", "policy"}
+METRIC_FIELDS = {
+    "voluntary_ctxt_switches": "voluntary_ctxt_switches",
+    "nonvoluntary_ctxt_switches": "nonvoluntary_ctxt_switches",
+    "vm_rss_status": "vm_rss",
+    "read_bytes": "read_bytes",
+    "write_bytes": "write_bytes",
+}
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+POD_NAME_REGEX = re.compile(r"^(.*?)-(\d+)$")
+# Generator.createPod가 붙이는 접두사 (createPod_atOnce는 접두사 없음)
+EXPERIMENT_PREFIX = "experiment-"
+
+
+def pod_type_of(pod_name: str) -> Optional[str]:
+    """
+    Generator가 만드는 파드 이름에서 실제 유형 추출, 알 수 없는 유형이면 None
+    'active-3', 'experiment-active-3' -> 'active'
+    'background-3', 'experiment-background-ac-3' -> 'background'
+    """
+    m = POD_NAME_REGEX.match(pod_name)
+    base = m.group(1) if m else pod_name
+    if base.startswith(EXPERIMENT_PREFIX):
+        base = base[len(EXPERIMENT_PREFIX):]
+    for t in POD_TYPES:
+        if base == t or base.startswith(t + '-'):
+            return t
+    return None
+
+
+def _to_int(value: str) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return int(float(value))
+        except ValueError:
+            return None
+
+
+def _row_to_process(row: dict) -> Process:
+    p = Process()
+    for field in PROCESS_HEADERS[2:54]:
+        value = row.get(field)
+        setattr(p, field, value if field in TEXT_FIELDS else _to_int(value))
+    metrics = ProcessMetrics()
+    for column, attr in METRIC_FIELDS.items():
+        setattr(metrics, attr, _to_int(row.get(column)))
+    p.metrics = metrics
+    return p
+
+
+def _iter_rows(path: str) -> Iterator[dict]:
+    """교체된 조각을 오래된 순서로 이어서 행 단위로 반환 (조각마다 헤더 유무를 따로 판단)"""
+    for part in csv_parts(path):
+        with open(part, newline="", encoding="utf-8") as f:
+            first = f.readline()
+            f.seek(0)
+            has_header = first.split(",", 1)[0].strip() == "pod_name"
+            yield from csv.DictReader(f, fieldnames=None if has_header else PROCESS_HEADERS)
+
+
+def iter_snapshots(path: str) -> Iterator[Tuple[str, float, List[Process]]]:
+    """
+    CSV를 스트리밍으로 읽어 파드 사이클 단위로 반환
+    (Pod.saveStatDataToCSV는 한 파드의 한 사이클을 연속된 행으로 기록함)
+    yield: (pod_name, timestamp(epoch 초), 프로세스 목록)
+    """
+    key = None
+    processes: List[Process] = []
+    for row in _iter_rows(path):
+        row_key = (row["pod_name"], row["timestamp"])
+        if row_key != key:
+            if processes:
+                yield key[0], _parse_timestamp(key[1]), processes
+            key = row_key
+            processes = []
+        if _to_int(row.get("pid")) is None:
+            continue
+        processes.append(_row_to_process(row))
+    if processes:
+        yield key[0], _parse_timestamp(key[1]), processes
+
+
+def _parse_timestamp(ts: str) -> float:
+    return datetime.strptime(ts, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc).timestamp()
+
+
+def build_policy(overrides: Dict[str, object]):
+    """ProcessStatePolicy의 임계값 일부를 바꾼 하위 클래스 생성"""
+    unknown = [k for k in overrides if not hasattr(ProcessStatePolicy, k)]
+    if unknown:
+        raise KeyError(f"Unknown ProcessStatePolicy attribute(s): {unknown}")
+    return type("ReplayPolicy", (ProcessStatePolicy,), dict(overrides))
+
+
+def variant_name(overrides: Dict[str, object]) -> str:
+    if not overrides:
+        return "baseline"
+    return ", ".join(f"{k}={v}" for k, v in sorted(overrides.items()))
+
+
+def _empty_matrix() -> Dict[str, Dict[str, int]]:
+    return {t: {'gc': 0, 'keep': 0} for t in POD_TYPES}
+
+
+def replay_file(path: str, overrides: Dict[str, object], warmup_cycles: int = 0,
+                policy_file: Optional[str] = None) -> dict:
+    """
+    한 실험 파일을 하나의 정책 변형으로 재생
+    warmup_cycles: 파드별 처음 N 사이클(이전 기록이 없는 구간)은 집계에서 제외
+    policy_file: 분류 규칙 정책 파일 (없으면 ProcessStatePolicy 기본 규칙, 임계값 변형은 규칙에도 반영)
+    return:
+        {'matrix': {pod_type: {'gc': n, 'keep': n}}, 'cycles': 평가한 사이클 수}
+    """
+    policy = build_policy(overrides)
+    store = ProcessStateStore()
+    managers: Dict[str, ProcessManager] = {}
+    boot_times: Dict[str, float] = {}
+    seen_cycles: Dict[str, int] = {}
+    matrix = _empty_matrix()
+    cycles = 0
+
+    for pod_name, ts, processes in iter_snapshots(path):
+        pm = managers.get(pod_name)
+        if pm is None:
+            pod = SimpleNamespace(metadata=SimpleNamespace(name=pod_name, namespace="replay"))
+            pm = ProcessManager(None, pod, state_store=store, policy=policy, policy_file=policy_file)
+            managers[pod_name] = pm
+            # 부팅 시각은 기록되지 않으므로, 첫 관측 시점에 가장 먼저 시작한 프로세스가 막 시작했다고 가정
+            starttimes = [p.starttime for p in processes if p.starttime is not None]
+            boot_times[pod_name] = ts - (min(starttimes) / pm.cpu_ticks_per_sec if starttimes else 0)
+
+        should_gc, _, _, _ = pm.analyzePodProcess(processes, current_time=ts, boot_time=boot_times[pod_name])
+
+        seen_cycles[pod_name] = seen_cycles.get(pod_name, 0) + 1
+        pod_type = pod_type_of(pod_name)
+        if pod_type is None or seen_cycles[pod_name] <= warmup_cycles:
+            continue
+        matrix[pod_type]['gc' if should_gc else 'keep'] += 1
+        cycles += 1
+
+    return {'matrix': matrix, 'cycles': cycles}
+
+
+def replay(files: List[str], variants: List[Dict[str, object]], workers: Optional[int] = None,
+           warmup_cycles: int = 0, policy_file: Optional[str] = None) -> Dict[str, dict]:
+    """
+    (파일 × 정책 변형) 조합을 프로세스 풀에서 병렬 재생하고 변형별로 합산
+    return:
+        {변형 이름: {'matrix': ..., 'cycles': n}}
+    """
+    tasks = [(f, v, warmup_cycles, policy_file) for v in variants for f in files]
+    with Pool(processes=workers) as pool:
+        outputs = pool.starmap(replay_file, tasks)
+
+    results: Dict[str, dict] = {variant_name(v): {'matrix': _empty_matrix(), 'cycles': 0} for v in variants}
+    for (_, overrides, _, _), out in zip(tasks, outputs):
+        total = results[variant_name(overrides)]
+        total['cycles'] += out['cycles']
+        for t in POD_TYPES:
+            for decision in ('gc', 'keep'):
+                total['matrix'][t][decision] += out['matrix'][t][decision]
+    return results
+
+
+def confusion(matrix: Dict[str, Dict[str, int]]) -> Dict[str, float]:
+    """GC 되어야 하는 파드(idle)를 양성으로 본 이진 혼동 행렬과 지표"""
+    tp = fn = fp = tn = 0
+    for t, counts in matrix.items():
+        if EXPECTED_GC[t]:
+            tp += counts['gc']
+            fn += counts['keep']
+        else:
+            fp += counts['gc']
+            tn += counts['keep']
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return {'tp': tp, 'fn': fn, 'fp': fp, 'tn': tn, 'precision': precision, 'recall': recall}
+
+
+def print_report(results: Dict[str, dict]):
+    for name, result in results.items():
+        matrix = result['matrix']
+        c = confusion(matrix)
+        print("=" * 60)
+        print(f"[{name}] cycles={result['cycles']}")
+        print(f"{'pod_type':<12}{'gc':>10}{'keep':>10}")
+        for t in POD_TYPES:
+            print(f"{t:<12}{matrix[t]['gc']:>10}{matrix[t]['keep']:>10}")
+        print(f"TP={c['tp']} FN={c['fn']} FP={c['fp']} TN={c['tn']} "
+              f"precision={c['precision']:.3f} recall={c['recall']:.3f}")
+
+
+def parse_variants(settings: List[str]) -> List[Dict[str, object]]:
+    """['A=1,2', 'B=0.1'] -> [{'A': 1, 'B': 0.1}, {'A': 2, 'B': 0.1}] (모든 조합)"""
+    if not settings:
+        return [{}]
+    keys, value_lists = [], []
+    for s in settings:
+        key, values = s.split("=", 1)
+        keys.append(key.strip())
+        value_lists.append([ast.literal_eval(v.strip()) for v in values.split(",")])
+    return [dict(zip(keys, combo)) for combo in itertools.product(*value_lists)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded experiments through ProcessStatePolicy variants")
+    parser.add_argument("data_dir", help="process_metrics_experiment*.csv 가 있는 디렉터리")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=V1,V2",
+                        help="바꿔볼 ProcessStatePolicy 값 (여러 번 지정하면 모든 조합)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--warmup", type=int, default=0, help="파드별 집계에서 제외할 처음 사이클 수")
+    parser.add_argument("--policy", default=None, help="분류 규칙 정책 파일 (TOML/YAML)")
+    args = parser.parse_args()
+
+    # 교체된 조각은 원래 파일 하나로 묶어 iter_snapshots에서 순서대로 이어서 재생
+    files = group_parts(glob.glob(os.path.join(args.data_dir, "process_metrics_experiment*.csv")))
+    if not files:
+        raise SystemExit(f"No experiment files in {args.data_dir}")
+
+    print_report(replay(files, parse_variants(args.set), workers=args.workers, warmup_cycles=args.warmup,
+                        policy_file=args.policy))
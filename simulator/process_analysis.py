@@ -1,11 +1,16 @@
 import pandas as pd
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from csvRotation import csv_parts
 
 DATA_DIR = "data"
 FILE_NAME = "process_classification_experiment10.csv"
 file_path = os.path.join(DATA_DIR, FILE_NAME)
 
-df = pd.read_csv(file_path)
+# 교체된 조각(헤더가 바뀌어 옮겨진 이전 파일 포함)까지 순서대로 이어서 읽음
+df = pd.concat([pd.read_csv(part) for part in csv_parts(file_path)], ignore_index=True)
 df = df[df["pid"] != 1]
 
 # state 컬럼에서 'ProcessStateClassification.' 문자열 제거
@@ -0,0 +1,25 @@
+import pytest
+
+from simulator.policy_replay import pod_type_of
+
+
+# simulator/generator.py가 만드는 파드 이름 형식
+@pytest.mark.parametrize("pod_name, expected", [
+    # Generator.createPod
+    ("experiment-active-0", "active"),
+    ("experiment-idle-1", "idle"),
+    ("experiment-running-2", "running"),
+    ("experiment-background-ac-3", "background"),
+    # Generator.createPod_atOnce
+    ("active-10", "active"),
+    ("idle-4", "idle"),
+    ("running-7", "running"),
+    ("background-12", "background"),
+])
+def test_pod_type_of_generator_names(pod_name, expected):
+    assert pod_type_of(pod_name) == expected
+
+
+@pytest.mark.parametrize("pod_name", ["experiment-pod", "ssh-user-0", "inactive-1"])
+def test_pod_type_of_unknown(pod_name):
+    assert pod_type_of(pod_name) is None
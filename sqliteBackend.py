@@ -0,0 +1,413 @@
+"""
+SQLite 저장소 백엔드 (Postgres 없이 소규모/엣지 클러스터에서 사용)
+- WAL 모드: 쓰기 중에도 읽기가 막히지 않음
+- 쓰기는 하나의 연결(+ 잠금)로만 수행 → 파일 잠금 경합과 재시도 대기가 없음
+- 읽기는 스레드별 연결 사용
+- 프로세스 행은 executemany로 한 트랜잭션에 저장, SQL 문은 모듈 상수로 두어 sqlite3 statement 캐시(준비된 문장) 재사용
+- sqlite INTEGER는 부호 있는 64비트이므로 unsigned 주소/비트맵 값은 2^64를 빼서 저장하고 조회 시 복원
+"""
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict
+
+from storageBackend import StorageBackend, PROCESS_DATA_COLUMNS, UNSIGNED_COLUMNS
+
+logging.basicConfig(filename="error.log", level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+INT64_MAX = (1 << 63) - 1
+_TEXT_COLUMNS = {"timestamp", "comm", "state", "policy"}
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS pod_info (
+        pod_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        pod_name TEXT NOT NULL,
+        namespace TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS pod_info_name_idx ON pod_info (pod_name, namespace)",
+    """
+    CREATE TABLE IF NOT EXISTS process_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        pod_id INTEGER REFERENCES pod_info(pod_id) ON DELETE CASCADE,
+        """ + ",\n        ".join(
+        f"{c} {'TEXT' if c in _TEXT_COLUMNS else 'INTEGER'}" for c in PROCESS_DATA_COLUMNS
+    ) + """
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS process_data_timestamp_idx ON process_data (timestamp)",
+    """
+    CREATE TABLE IF NOT EXISTS bash_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        pod_id INTEGER REFERENCES pod_info(pod_id) ON DELETE CASCADE,
+        last_modified TEXT,
+        timestamp TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS pod_status (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        pod_id INTEGER UNIQUE REFERENCES pod_info(pod_id) ON DELETE CASCADE,
+        creation_timestamp TEXT,
+        deletion_timestamp TEXT,
+        generate_name TEXT,
+        node_name TEXT,
+        phase TEXT,
+        host_ip TEXT,
+        pod_ip TEXT,
+        start_time TEXT,
+        last_updated TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS pod_lifecycle (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        pod_id INTEGER UNIQUE REFERENCES pod_info(pod_id) ON DELETE CASCADE,
+        created_at TEXT,
+        deleted_at TEXT,
+        delete_reason TEXT,
+        history_check INTEGER DEFAULT 0,
+        last_updated TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+]
+
+# 살아 있는 pod_id: 생명주기 정보가 없거나 삭제 시간이 없는 pod
+SELECT_ALIVE_POD_ID = """
+SELECT pi.pod_id FROM pod_info pi
+LEFT JOIN pod_lifecycle pl ON pl.pod_id = pi.pod_id
+WHERE pi.pod_name = ? AND pi.namespace = ? AND pl.deleted_at IS NULL
+ORDER BY pi.pod_id LIMIT 1
+"""
+INSERT_POD = "INSERT INTO pod_info (pod_name, namespace) VALUES (?, ?)"
+INSERT_PROCESS = (
+    f"INSERT INTO process_data (pod_id, {', '.join(PROCESS_DATA_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * (len(PROCESS_DATA_COLUMNS) + 1))})"
+)
+UPSERT_LIFECYCLE_CREATED = """
+INSERT INTO pod_lifecycle (pod_id, created_at) VALUES (?, ?)
+ON CONFLICT (pod_id) DO UPDATE SET created_at = excluded.created_at
+"""
+UPSERT_POD_STATUS = """
+INSERT INTO pod_status (
+    pod_id, creation_timestamp, deletion_timestamp, generate_name, node_name,
+    phase, host_ip, pod_ip, start_time
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (pod_id) DO UPDATE SET
+    deletion_timestamp = excluded.deletion_timestamp, node_name = excluded.node_name,
+    phase = excluded.phase, host_ip = excluded.host_ip, pod_ip = excluded.pod_ip,
+    start_time = excluded.start_time, last_updated = CURRENT_TIMESTAMP
+WHERE pod_status.deletion_timestamp IS NOT excluded.deletion_timestamp
+   OR pod_status.node_name IS NOT excluded.node_name
+   OR pod_status.phase IS NOT excluded.phase
+   OR pod_status.host_ip IS NOT excluded.host_ip
+   OR pod_status.pod_ip IS NOT excluded.pod_ip
+   OR pod_status.start_time IS NOT excluded.start_time
+"""
+UPSERT_DELETE_REASON = """
+INSERT INTO pod_lifecycle (pod_id, deleted_at, delete_reason) VALUES (?, ?, ?)
+ON CONFLICT (pod_id) DO UPDATE SET
+    deleted_at = excluded.deleted_at, delete_reason = excluded.delete_reason,
+    last_updated = CURRENT_TIMESTAMP
+WHERE pod_lifecycle.deleted_at IS NOT excluded.deleted_at
+   OR pod_lifecycle.delete_reason IS NOT excluded.delete_reason
+"""
+UPDATE_HISTORY_CHECK = """
+UPDATE pod_lifecycle SET history_check = ?, last_updated = CURRENT_TIMESTAMP WHERE pod_id = ?
+"""
+INSERT_BASH_HISTORY = "INSERT INTO bash_history (pod_id, last_modified) VALUES (?, ?)"
+SELECT_LAST_BASH_HISTORY = """
+SELECT b.last_modified FROM bash_history b
+JOIN pod_info p ON p.pod_id = b.pod_id
+WHERE p.pod_name = ? ORDER BY b.id DESC LIMIT 1
+"""
+SELECT_POD_STATE = """
+SELECT COUNT(pi.pod_id), SUM(pl.pod_id IS NOT NULL AND pl.deleted_at IS NULL), COUNT(pl.pod_id)
+FROM pod_info pi
+LEFT JOIN pod_lifecycle pl ON pl.pod_id = pi.pod_id
+WHERE pi.pod_name = ?
+"""
+
+def _to_db(value):
+    """sqlite가 담을 수 없는 unsigned 64비트 값을 부호 있는 값으로 변환"""
+    if isinstance(value, int) and value > INT64_MAX:
+        return value - (1 << 64)
+    return value
+
+def _text(value):
+    """datetime 등은 ISO 문자열로 저장"""
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return str(value)
+
+def _status_values(pod_id, info):
+    return (
+        pod_id, _text(info.creation_timestamp), _text(info.deletion_timestamp),
+        info.generate_name, info.node_name, info.phase,
+        info.hostIP, info.podIP, _text(info.startTime)
+    )
+
+class SqliteBackend(StorageBackend):
+    def __init__(self, path: str, cached_statements: int = 256):
+        self.path = path
+        self.cached_statements = cached_statements
+        # 쓰기 전용 연결 하나를 모든 스레드가 잠금으로 공유
+        self._writer = self._connect()
+        self._write_lock = threading.Lock()
+        self._readers = threading.local()
+        self._pod_ids: Dict[tuple, int] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            conn.execute("PRAGMA query_only=ON")
+            self._readers.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        """쓰기 트랜잭션 (실패 시 롤백)"""
+        with self._write_lock:
+            cursor = self._writer.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            finally:
+                cursor.close()
+
+    def initialize(self):
+        try:
+            with self._write() as cursor:
+                for statement in SCHEMA:
+                    cursor.execute(statement)
+        except sqlite3.Error as e:
+            logging.error(f"SQLite Error: {e}")
+
+    def close(self):
+        with self._write_lock:
+            self._writer.close()
+
+    # pod 등록
+    def _pod_id(self, cursor, pod_name, namespace):
+        """쓰기 트랜잭션 안에서 살아 있는 pod_id를 찾거나 생성"""
+        key = (pod_name, namespace)
+        pod_id = self._pod_ids.get(key)
+        if pod_id is not None:
+            return pod_id
+        row = cursor.execute(SELECT_ALIVE_POD_ID, key).fetchone()
+        pod_id = row[0] if row else cursor.execute(INSERT_POD, key).lastrowid
+        self._pod_ids[key] = pod_id
+        return pod_id
+
+    def get_or_create_pod_id(self, pod_name, namespace):
+        key = (pod_name, namespace)
+        if key in self._pod_ids:
+            return self._pod_ids[key]
+        try:
+            with self._write() as cursor:
+                return self._pod_id(cursor, pod_name, namespace)
+        except sqlite3.Error as e:
+            logging.error(f"SQLite Error: {e}")
+            return None
+
+    def _pod_state(self, pod_name):
+        """(pod_info 행 수, 살아 있는 행 수, 생명주기 행 수) - pod_name 기준 (Postgres 백엔드와 동일)"""
+        return self._reader().execute(SELECT_POD_STATE, (pod_name,)).fetchone()
+
+    def is_exist(self, pod_name, namespace):
+        try:
+            return self._pod_state(pod_name)[0] > 0
+        except sqlite3.Error as e:
+            logging.error(f"SQLite Error: {e}")
+            return None
+
+    def is_deleted(self, pod_name, namespace):
+        try:
+            count, alive, _ = self._pod_state(pod_name)
+            return count > 0 and not alive
+        except sqlite3.Error as e:
+            logging.error(f"SQLite Error: {e}")
+            return None
+
+    def check_pods(self, pods):
+        result = {}
+        try:
+            reader = self._reader()
+            for pod_name, namespace in pods:
+                count, alive, _ = self._pod_state(pod_name)
+                row = reader.execute(SELECT_ALIVE_POD_ID, (pod_name, namespace)).fetchone()
+                result[(pod_name, namespace)] = {
+                    'exists': count > 0,
+                    'deleted': count > 0 and not alive,
+                    'pod_id': row[0] if row else None,
+                }
+                if row:
+                    self._pod_ids[(pod_name, namespace)] = row[0]
+            return result
+        except sqlite3.Error as e:
+            logging.error(f"SQLite Error: {e}")
+            return None
+
+    def init_pods(self, pods):
+        pods = list(pods)
+        if not pods:
+            return None
+        try:
+            with self._write() as cursor:
+                ids = {(name, ns): self._pod_id(cursor, name, ns) for name, ns, _, _ in pods}
+                cursor.executemany(UPSERT_LIFECYCLE_CREATED, [
+                    (ids[(name, ns)], _text(lifecycle.createTime)) for name, ns, lifecycle, _ in pods
+                ])
+                cursor.executemany(UPSERT_POD_STATUS, [
+                    _status_values(ids[(name, ns)], info) for name, ns, _, info in pods
+                ])
+            return True
+        except sqlite3.Error as e:
+            self._pod_ids.clear()  # 롤백된 pod_id가 캐시에 남지 않도록
+            logging.error(f"SQLite Error: {e}")
+            return None
+
+    # 상태, 생명주기
+    def save_pod_status(self, pod_name, namespace, pod_info):
+        return self.save_pod_statuses([(pod_name, namespace, pod_info)])
+
+    def save_pod_statuses(self, pods):
+        pods = list(pods)
+        if not pods:
+            return True
+        try:
+            with self._write() as cursor:
+                cursor.executemany(UPSERT_POD_STATUS, [
+                    _status_values(self._pod_id(cursor, name, ns), info) for name, ns, info in pods
+                ])
+            return True
+        except sqlite3.Error as e:
+            self._pod_ids.clear()
+            logging.error(f"SQLite Error: {e}")
+            return None
+
+    def save_pod_lifecycle(self, pod_name, namespace, lifecycle):
+        try:
+            with self._write() as cursor:
+                cursor.execute(UPSERT_LIFECYCLE_CREATED, (
+                    self._pod_id(cursor, pod_name, namespace), _text(lifecycle.createTime)
+                ))
+            return True
+        except sqlite3.Error as e:
+            self._pod_ids.clear()
+            logging.error(f"SQLite Error: {e}")
+            return None
+
+    def save_delete_reason(self, pod_name, namespace, lifecycle):
+        try:
+            with self._write() as cursor:
+                cursor.execute(UPSERT_DELETE_REASON, (
+                    self._pod_id(cursor, pod_name, namespace),
+                    _text(lifecycle.deleteTime), _text(lifecycle.reason_deletion)
+                ))
+            # 삭제된 pod의 id는 더 이상 재사용하지 않음
+            self._pod_ids.pop((pod_name, namespace), None)
+            return True
+        except sqlite3.Error as e:
+            self._pod_ids.clear()
+            logging.error(f"SQLite Error: {e}")
+            return None
+
+    def save_bash_history_result(self, pod_name, namespace, result):
+        try:
+            with self._write() as cursor:
+                cursor.execute(UPDATE_HISTORY_CHECK, (int(bool(result)), self._pod_id(cursor, pod_name, namespace)))
+            return True
+        except sqlite3.Error as e:
+            self._pod_ids.clear()
+            logging.error(f"SQLite Error: {e}")
+            return None
+
+    # 프로세스 데이터
+    def save_processes(self, pod_name, namespace, processes):
+        if not processes:
+            return True
+        try:
+            with self._write() as cursor:
+                pod_id = self._pod_id(cursor, pod_name, namespace)
+                cursor.executemany(INSERT_PROCESS, [
+                    (pod_id, *(_to_db(process.get(c)) for c in PROCESS_DATA_COLUMNS)) for process in processes
+                ])
+            return True
+        except sqlite3.Error as e:
+            self._pod_ids.clear()
+            logging.error(f"SQLite Error: {e}")
+            return None
+
+    def query_processes(self, start, end, pod_name=None, namespace=None, columns=None):
+        columns = list(columns or PROCESS_DATA_COLUMNS)
+        unknown = set(columns) - set(PROCESS_DATA_COLUMNS)
+        if unknown:
+            raise ValueError(f"unknown process_data columns: {sorted(unknown)}")
+
+        conditions = ["d.timestamp >= ?", "d.timestamp < ?"]
+        params = [_text(start), _text(end)]
+        if pod_name is not None:
+            conditions.append("p.pod_name = ?")
+            params.append(pod_name)
+        if namespace is not None:
+            conditions.append("p.namespace = ?")
+            params.append(namespace)
+
+        try:
+            rows = self._reader().execute(f"""
+            SELECT p.pod_name, p.namespace, {", ".join("d." + c for c in columns)}
+            FROM process_data d
+            JOIN pod_info p ON p.pod_id = d.pod_id
+            WHERE {" AND ".join(conditions)}
+            ORDER BY d.timestamp, d.id
+            """, params).fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"SQLite Error: {e}")
+            return None
+
+        keys = ["pod_name", "namespace"] + columns
+        unsigned = [i for i, key in enumerate(keys) if key in UNSIGNED_COLUMNS]
+        result = []
+        for row in rows:
+            row = list(row)
+            for i in unsigned:
+                if isinstance(row[i], int) and row[i] < 0:
+                    row[i] += 1 << 64
+            result.append(dict(zip(keys, row)))
+        return result
+
+    # bash history
+    def save_bash_history(self, pod_name, namespace, last_modified):
+        try:
+            with self._write() as cursor:
+                cursor.execute(INSERT_BASH_HISTORY, (self._pod_id(cursor, pod_name, namespace), _text(last_modified)))
+            return True
+        except sqlite3.Error as e:
+            self._pod_ids.clear()
+            logging.error(f"SQLite Error: {e}")
+            return None
+
+    def get_last_bash_history(self, pod_name):
+        try:
+            row = self._reader().execute(SELECT_LAST_BASH_HISTORY, (pod_name,)).fetchone()
+            return row[0] if row and row[0] else None
+        except sqlite3.Error as e:
+            logging.error(f"SQLite Error: {e}")
+            return None
@@ -0,0 +1,186 @@
+"""
+저장소 백엔드 인터페이스
+- StorageBackend: pod 등록, 상태/생명주기, 프로세스 데이터 일괄 저장, bash history, 조회
+- PostgresBackend: DB_postgresql 함수를 그대로 사용
+- SqliteBackend (sqliteBackend.py): Postgres 없이 단일 노드에서 GC를 돌릴 때 사용
+config.ini [storage] backend = postgres | sqlite 로 선택하며, get_storage_backend()가 프로세스당 하나를 만들어 공유
+"""
+import configparser
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_config = configparser.ConfigParser()
+_config.read(os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.ini"))
+
+# process_data에 저장하는 컬럼 (pod_id 제외, 모든 백엔드와 스풀 레코드의 행 순서 기준)
+PROCESS_DATA_COLUMNS = (
+    "timestamp", "pid", "comm", "state", "ppid", "pgrp", "session", "tty_nr", "tpgid",
+    "flags", "minflt", "cminflt", "majflt", "cmajflt", "utime", "stime", "cutime", "cstime", "priority",
+    "nice", "num_threads", "itrealvalue", "starttime", "vsize", "rss", "rsslim", "startcode", "endcode", "startstack",
+    "kstkesp", "kstkeip", "signal", "blocked", "sigignore", "sigcatch", "wchan", "nswap", "cnswap", "exit_signal",
+    "processor", "rt_priority", "policy", "delayacct_blkio_ticks", "guest_time", "cguest_time", "start_data", "end_data", "start_brk", "arg_start",
+    "arg_end", "env_start", "env_end", "exit_code",
+    "voluntary_ctxt_switches", "nonvoluntary_ctxt_switches", "vm_rss", "read_bytes", "write_bytes"
+)
+
+# 2^63 이상이 될 수 있는 unsigned long 컬럼 (/proc/[pid]/stat), 부호 있는 64비트 컬럼에는 2^64를 빼서 저장
+UNSIGNED_COLUMNS = {
+    "vsize", "rsslim", "startcode", "endcode", "startstack", "kstkesp", "kstkeip",
+    "signal", "blocked", "sigignore", "sigcatch", "wchan",
+    "start_data", "end_data", "start_brk", "arg_start", "arg_end", "env_start", "env_end"
+}
+
+class StorageBackend(ABC):
+    """
+    pods 인자 형식은 DB_postgresql의 일괄 함수와 동일
+    - check_pods: [(pod_name, namespace)]
+    - init_pods: [(pod_name, namespace, Pod_Lifecycle, Pod_Info)]
+    - save_pod_statuses: [(pod_name, namespace, Pod_Info)]
+    저장 함수는 성공 시 True, 실패 시 None을 반환
+    """
+
+    @abstractmethod
+    def initialize(self):
+        """테이블 생성"""
+
+    def start_background_jobs(self):
+        """백엔드별 백그라운드 작업(스풀 재생, 롤업 등) 시작"""
+
+    def close(self):
+        pass
+
+    # pod 등록
+    @abstractmethod
+    def get_or_create_pod_id(self, pod_name: str, namespace: str) -> Optional[int]: ...
+
+    @abstractmethod
+    def is_exist(self, pod_name: str, namespace: str) -> Optional[bool]: ...
+
+    @abstractmethod
+    def is_deleted(self, pod_name: str, namespace: str) -> Optional[bool]: ...
+
+    @abstractmethod
+    def check_pods(self, pods: Iterable[Tuple[str, str]]) -> Optional[Dict[tuple, dict]]: ...
+
+    @abstractmethod
+    def init_pods(self, pods: Iterable[tuple]) -> Optional[bool]: ...
+
+    # 상태, 생명주기
+    @abstractmethod
+    def save_pod_status(self, pod_name: str, namespace: str, pod_info) -> Optional[bool]: ...
+
+    @abstractmethod
+    def save_pod_statuses(self, pods: Iterable[tuple]) -> Optional[bool]: ...
+
+    @abstractmethod
+    def save_pod_lifecycle(self, pod_name: str, namespace: str, lifecycle) -> Optional[bool]: ...
+
+    @abstractmethod
+    def save_delete_reason(self, pod_name: str, namespace: str, lifecycle) -> Optional[bool]: ...
+
+    @abstractmethod
+    def save_bash_history_result(self, pod_name: str, namespace: str, result: bool) -> Optional[bool]: ...
+
+    # 프로세스 데이터
+    @abstractmethod
+    def save_processes(self, pod_name: str, namespace: str, processes: List[dict]) -> Optional[bool]:
+        """한 pod의 한 사이클 프로세스 행(dict) 일괄 저장"""
+
+    @abstractmethod
+    def query_processes(self, start, end, pod_name: str = None, namespace: str = None,
+                        columns: Optional[List[str]] = None) -> Optional[List[dict]]:
+        """[start, end) 구간의 프로세스 행 (pod_name, namespace 컬럼 포함)"""
+
+    # bash history
+    @abstractmethod
+    def save_bash_history(self, pod_name: str, namespace: str, last_modified) -> Optional[bool]: ...
+
+    @abstractmethod
+    def get_last_bash_history(self, pod_name: str): ...
+
+class PostgresBackend(StorageBackend):
+    """
+    DB_postgresql 모듈 위임
+    process_diff: True면 프로세스 데이터를 변경분만 저장 (save_process_diff)
+    """
+    def __init__(self, process_diff: bool = False):
+        import DB_postgresql
+        self.db = DB_postgresql
+        self.process_diff = process_diff
+
+    def initialize(self):
+        self.db.initialize_database()
+
+    def start_background_jobs(self):
+        from processRollup import start_rollup_worker
+        self.db.start_spool_replayer()
+        start_rollup_worker()
+
+    def get_or_create_pod_id(self, pod_name, namespace):
+        return self.db.get_or_create_pod_id(pod_name, namespace)
+
+    def is_exist(self, pod_name, namespace):
+        return self.db.is_exist_in_DB(pod_name, namespace)
+
+    def is_deleted(self, pod_name, namespace):
+        return self.db.is_deleted_in_DB(pod_name, namespace)
+
+    def check_pods(self, pods):
+        return self.db.check_pods_in_DB(pods)
+
+    def init_pods(self, pods):
+        return self.db.init_pods_in_DB(pods)
+
+    def save_pod_status(self, pod_name, namespace, pod_info):
+        return self.db.save_pod_status(pod_name, namespace, pod_info)
+
+    def save_pod_statuses(self, pods):
+        return self.db.save_pod_statuses(pods)
+
+    def save_pod_lifecycle(self, pod_name, namespace, lifecycle):
+        return self.db.save_pod_lifecycle(pod_name, namespace, lifecycle)
+
+    def save_delete_reason(self, pod_name, namespace, lifecycle):
+        return self.db.save_delete_reason(pod_name, namespace, lifecycle)
+
+    def save_bash_history_result(self, pod_name, namespace, result):
+        return self.db.save_bash_history_result(pod_name, namespace, result)
+
+    def save_processes(self, pod_name, namespace, processes):
+        if self.process_diff:
+            return self.db.save_process_diff(pod_name, namespace, processes)
+        return self.db.save_to_process(pod_name, namespace, processes)
+
+    def query_processes(self, start, end, pod_name=None, namespace=None, columns=None):
+        return self.db.query_process_data(start, end, pod_name, namespace, columns)
+
+    def save_bash_history(self, pod_name, namespace, last_modified):
+        return self.db.save_bash_history(pod_name, namespace, last_modified)
+
+    def get_last_bash_history(self, pod_name):
+        return self.db.get_last_bash_history(pod_name)
+
+_BACKEND: Optional[StorageBackend] = None
+_BACKEND_LOCK = threading.Lock()
+
+def create_storage_backend(name: str = None) -> StorageBackend:
+    """이름('postgres', 'sqlite')으로 백엔드 생성 (없으면 config.ini [storage] backend)"""
+    name = (name or _config.get("storage", "backend", fallback="postgres")).strip().lower()
+    if name in ("postgres", "postgresql"):
+        return PostgresBackend(process_diff=_config.getboolean("storage", "process_diff", fallback=False))
+    if name == "sqlite":
+        from sqliteBackend import SqliteBackend
+        path = _config.get("storage", "sqlite_path", fallback="gc_data.db")
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+        return SqliteBackend(path)
+    raise ValueError(f"unknown storage backend: {name}")
+
+def get_storage_backend() -> StorageBackend:
+    global _BACKEND
+    with _BACKEND_LOCK:
+        if _BACKEND is None:
+            _BACKEND = create_storage_backend()
+        return _BACKEND
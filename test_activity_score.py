@@ -0,0 +1,61 @@
+"""
+ProcessManager 다중 신호 활동 점수 확인
+실험 파드의 두 프로그램(pod_generation/programs)을 한 사이클(60초) 카운터로 재현
+- inactive_waiting: 10초마다 select/sleep으로 깨어나기만 함 (CPU 0, 메인 스레드 ctxt 약 0.2회/초)
+- bg_network_service: 작업 스레드 3개가 10~50ms마다 DNS 조회 + md5 (CPU 약 2%, 메인 스레드는 10초 heartbeat)
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from process import Process, ProcessMetrics
+from processManager import ProcessManager, ProcessStatePolicy
+from processStateStore import ProcessStateStore
+
+POD = "experiment-background-ac-0"
+INTERVAL = 60.0
+
+
+def _process(pid, ctxt=0, io=0, rss=1 << 20):
+    p = Process()
+    p.pid, p.starttime, p.utime, p.stime = pid, 1000 + pid, 0, 0
+    p.metrics = ProcessMetrics()
+    p.metrics.voluntary_ctxt_switches = ctxt
+    p.metrics.nonvoluntary_ctxt_switches = 0
+    p.metrics.read_bytes, p.metrics.write_bytes = io, 0
+    p.metrics.vm_rss = rss
+    return p
+
+
+def _scores(profiles):
+    """profiles: [(cpu 활동률, ctxt 회/초, I/O bytes/초)] → 한 사이클 뒤 프로세스별 점수"""
+    pod = SimpleNamespace(metadata=SimpleNamespace(namespace="default"))
+    pm = ProcessManager(None, pod, policy=ProcessStatePolicy, state_store=ProcessStateStore())
+    before = [_process(i) for i in range(len(profiles))]
+    pm._update_cpu_states(POD, before, 0.0)
+    after = [_process(i, ctxt=int(c * INTERVAL), io=int(b * INTERVAL)) for i, (_, c, b) in enumerate(profiles)]
+    return pm._calculate_activity_scores(after, [cpu for cpu, _, _ in profiles], None, POD, INTERVAL)
+
+
+def test_waiting_and_network_service_are_separated():
+    waiting, network = _scores([
+        (0.0, 0.2, 0),      # inactive_waiting
+        (0.02, 0.2, 0),     # bg_network_service
+    ])
+    assert waiting < ProcessStatePolicy.IDLE_SCORE_THRESHOLD
+    assert network >= ProcessStatePolicy.ACTIVE_SCORE_THRESHOLD
+
+
+@pytest.mark.parametrize("cpu, ctxt", [
+    (0.0, 1.0),       # 1Hz heartbeat
+    (0.0, 1000.0),    # CPU 없이 ctxt만 많은 경우도 ctxt만으로는 활성 아님
+    (0.0017, 1.0),    # sleep 1 루프 (한 사이클에 1 tick)
+])
+def test_wakeup_loops_are_not_active(cpu, ctxt):
+    score, = _scores([(cpu, ctxt, 0)])
+    assert score < ProcessStatePolicy.ACTIVE_SCORE_THRESHOLD
+
+
+def test_busy_event_loop_counts_ctxt():
+    quiet, busy = _scores([(0.001, 1.0, 0), (0.001, 200.0, 0)])
+    assert busy - quiet == pytest.approx(0.2 * (1 - 1 / 100), rel=1e-6)
@@ -0,0 +1,69 @@
+import os
+
+from csvRotation import base_path, csv_parts, group_parts
+from csvSink import CsvSink
+
+
+def _touch(path, text="h\n"):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def test_parts_are_ordered_and_grouped(tmp_path):
+    base = tmp_path / "process_metrics_experiment1.csv"
+    names = [
+        "process_metrics_experiment1.20250101T000010-2.csv",
+        "process_metrics_experiment1.20250101T000010.csv",
+        "process_metrics_experiment1.20250101T000010-10.csv",
+        "process_metrics_experiment1.20250101T000009.csv",
+        "process_metrics_experiment10.20250101T000000.csv",  # 다른 실험
+    ]
+    for name in names:
+        _touch(tmp_path / name)
+    _touch(base)
+
+    assert [os.path.basename(p) for p in csv_parts(str(base))] == [
+        "process_metrics_experiment1.20250101T000009.csv",
+        "process_metrics_experiment1.20250101T000010.csv",
+        "process_metrics_experiment1.20250101T000010-2.csv",
+        "process_metrics_experiment1.20250101T000010-10.csv",
+        "process_metrics_experiment1.csv",
+    ]
+    assert base_path(str(tmp_path / names[0])) == str(base)
+    assert group_parts(str(p) for p in tmp_path.iterdir()) == sorted([
+        str(base), str(tmp_path / "process_metrics_experiment10.csv"),
+    ])
+
+
+def test_sink_rotation_keeps_every_row(tmp_path):
+    path = str(tmp_path / "process_metrics_experiment2.csv")
+    sink = CsvSink(path, ["pod_name", "pid"], buffer_size=1, rotate_bytes=200)
+    for i in range(100):
+        sink.write([f"active-0,{i}"])
+        sink.flush()
+    sink.close()
+
+    parts = csv_parts(path)
+    assert len(parts) > 1
+    rows = []
+    for part in parts:
+        with open(part) as f:
+            lines = f.read().splitlines()
+        assert lines[0] == "pod_name,pid"
+        rows += lines[1:]
+    assert rows == [f"active-0,{i}" for i in range(100)]
+
+
+def test_header_mismatch_moves_old_file_to_a_part(tmp_path):
+    path = str(tmp_path / "process_classification_experiment1.csv")
+    _touch(path, "pod_name,pid\nold-0,1\n")
+    sink = CsvSink(path, ["pod_name", "pid", "policy_version"])
+    sink.write(["new-0,2,default-2"])
+    sink.close()
+
+    parts = csv_parts(path)
+    assert len(parts) == 2
+    with open(parts[0]) as f:
+        assert f.read() == "pod_name,pid\nold-0,1\n"
+    with open(parts[1]) as f:
+        assert f.read() == "pod_name,pid,policy_version\nnew-0,2,default-2\n"
@@ -0,0 +1,32 @@
+from processDiff import SnapshotDiffer, static_hash
+
+
+def _row(**fields):
+    row = {"pid": 10, "starttime": 100, "comm": "bash", "state": "S", "tpgid": 10, "flags": 4194560}
+    row.update(fields)
+    return row
+
+
+def test_foreground_job_toggle_keeps_one_identity():
+    differ = SnapshotDiffer()
+    keys = set()
+    for tpgid in (10, 20, 10):  # bash → 포그라운드 명령 → bash
+        rows = [_row(tpgid=tpgid)]
+        diff = differ.diff("pod", rows)
+        differ.commit("pod", rows, {(10, 100, static_hash(r)): 1 for r in diff.new_identities})
+        keys.update(key for key, _ in diff.samples)
+        assert not diff.gone
+    assert len(keys) == 1
+
+
+def test_static_change_back_is_a_new_identity():
+    differ = SnapshotDiffer()
+    results = []
+    for comm in ("bash", "sleep", "bash"):
+        rows = [_row(comm=comm)]
+        diff = differ.diff("pod", rows)
+        differ.commit("pod", rows, {(10, 100, static_hash(r)): len(results) for r in diff.new_identities})
+        results.append(diff)
+    assert [len(d.new_identities) for d in results] == [1, 1, 1]
+    assert [len(d.gone) for d in results] == [0, 1, 1]
+    assert differ.identity_id("pod", (10, 100, static_hash(_row()))) == 2
@@ -0,0 +1,238 @@
+"""
+build_normalized_usage_table 벤치마크
+- 기존 구현(행 단위 apply/map, 컬럼별 groupby, merge)을 _legacy_build_normalized_usage_table로 보관
+- 합성 데이터(기본 100만 행)로 두 구현의 결과가 같은지 확인하고 실행 시간 비교
+
+사용법:
+    python tool/bench_normalized_usage.py [--rows 1000000] [--pods 40] [--pids 25] [--repeat 1]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tool.data_analysis import build_normalized_usage_table, _split_pod_base_and_ordinal, _extract_comm_tail
+
+def _legacy_build_normalized_usage_table(
+    df: pd.DataFrame,
+    ticks_per_sec: int = 100,
+    page_size: int = 4096,
+    *,
+    cycle_size: int = 100,  # CSV/입력 순서대로 cycle_size개씩 한 사이클
+) -> pd.DataFrame:
+    """
+    - pod_name: 끝의 -숫자 제거하여 기본명으로 재정의, 숫자는 pod_ordinal로 분리
+    - comm: 마지막 파일명의 stem으로 분류
+    - 저장 컬럼:
+      pod_name, pod_ordinal, timestamp, comm, state,
+      utime, stime, cutime, num_threads,
+      vsize, rss, rsslim, vm_rss_status,
+      voluntary_ctxt_switches, nonvoluntary_ctxt_switches,
+      read_bytes, write_bytes
+    - 누적값에 대해 *_delta 생성:
+      utime, stime, cutime,
+      voluntary_ctxt_switches, nonvoluntary_ctxt_switches,
+      read_bytes, write_bytes,
+      vsize, rss, rsslim
+    - 델타 계산은 (pod_name_base, pod_ordinal, pid) 단위로 정렬·차분
+    - CSV 입력 순서대로 cycle_id 부여(0부터), 한 사이클은 cycle_size개 레코드
+    """
+    required = [
+        "pod_name", "timestamp", "comm", "state", "pid",
+        "utime", "stime", "cutime", "minflt", "majflt",
+        "num_threads",
+        "vsize", "rss", "rsslim", "vm_rss_status",
+        "voluntary_ctxt_switches", "nonvoluntary_ctxt_switches",
+        "read_bytes", "write_bytes"
+    ]
+    missing = [c for c in required if c not in df.columns]
+    if missing:
+        raise KeyError(f"필수 컬럼 누락: {missing}")
+    if cycle_size is None or cycle_size <= 0:
+        raise ValueError("cycle_size는 1 이상의 정수여야 합니다.")
+
+    # --- 원본 순서 보존용 위치 ---
+    out = df.copy()
+    out["_row_pos"] = range(len(out))  # CSV/입력 순서 인덱스
+
+    # 1) pod_name 분해 → base, ordinal
+    base_and_idx = out["pod_name"].astype(str).apply(_split_pod_base_and_ordinal)
+    out["pod_name"] = base_and_idx.apply(lambda x: x[0])
+    out["pod_ordinal"] = base_and_idx.apply(lambda x: x[1])
+
+    # pod_ordinal이 None이면 그룹에서 누락되지 않도록 -1로 치환
+    out["pod_ordinal"] = out["pod_ordinal"].fillna(-1).astype("int64")
+
+    # 2) comm 정규화
+    out["comm"] = out["comm"].astype(str).map(_extract_comm_tail)
+
+    # 3) timestamp 정규화
+    out["timestamp"] = pd.to_datetime(out["timestamp"], errors="coerce")
+    out = out.dropna(subset=["timestamp", "pid"]).copy()
+
+    # 누적값 컬럼 정의
+    cumulative_cols = [
+        "utime", "stime", "cutime", "minflt", "majflt",
+        "voluntary_ctxt_switches", "nonvoluntary_ctxt_switches",
+        "read_bytes", "write_bytes",
+        "vsize", "rss", "rsslim"
+    ]
+    for col in cumulative_cols:
+        out[col] = pd.to_numeric(out[col], errors="coerce")
+
+    # 정렬된 복사본으로 델타 계산
+    sort_keys = ["pod_name", "pod_ordinal", "pid", "timestamp", "_row_pos"]
+    tmp = out.sort_values(sort_keys).copy()
+    gkeys = ["pod_name", "pod_ordinal", "pid"]
+
+    for col in cumulative_cols:
+        dcol = f"{col}_delta"
+        tmp[dcol] = (
+            tmp.groupby(gkeys, sort=False)[col]
+            .diff()
+            .clip(lower=0)
+            .fillna(0.0)
+            .astype("float64")
+        )
+
+    # --- cpu_time(utime+stime) 계산 ---
+    # 🔹 utime+stime = cpu_time 계산
+    tmp["cpu_time"] = tmp["utime"] + tmp["stime"]
+
+    # 🔹 cpu_time_delta 계산
+    tmp["cpu_time_delta"] = (
+        tmp.groupby(gkeys, sort=False)["cpu_time"]
+        .diff()
+        .clip(lower=0)
+        .fillna(0.0)
+        .astype("float64")
+    )
+
+    # --- cpu_rate 계산 ---
+    # curr_time = utime_delta + stime_delta
+    tmp["cpu_time_sum"] = tmp["utime_delta"] + tmp["stime_delta"]
+
+    # prev_time = 이전 행의 cpu_time_sum
+    tmp["prev_cpu_time_sum"] = tmp.groupby(gkeys, sort=False)["cpu_time_sum"].shift(1)
+
+    # (curr - prev) / prev * 100
+    tmp["cpu_rate"] = (
+                              (tmp["cpu_time_sum"] - tmp["prev_cpu_time_sum"]) / tmp["prev_cpu_time_sum"]
+                      ) * 100
+
+    # 첫 행은 NaN -> 0으로 채움
+    tmp["cpu_rate"] = tmp["cpu_rate"].fillna(0.0)
+
+    # 델타 및 cpu_rate, cpu_time, cpu_time_delta 원래 순서로 붙이기
+    extra_cols = [f"{c}_delta" for c in cumulative_cols] + [
+        "cpu_rate", "cpu_time", "cpu_time_delta"
+    ]
+    out = out.merge(tmp[["_row_pos"] + extra_cols], on="_row_pos", how="left")
+
+    # cycle_id 부여
+    out["cycle_id"] = (out["_row_pos"] // int(cycle_size)).astype("int64")
+
+    # 최종 컬럼 정리
+    keep_cols = [
+        "cycle_id",
+        "pod_name", "pod_ordinal", "timestamp", "comm", "state",
+        "utime", "utime_delta",
+        "stime", "stime_delta",
+        "cutime", "cutime_delta",
+        "cpu_time", "cpu_time_delta",
+        "minflt", "minflt_delta", "majflt", "majflt_delta",
+        "num_threads",
+        "vsize", "vsize_delta",
+        "rss", "rss_delta",
+        "rsslim", "rsslim_delta",
+        "vm_rss_status",
+        "voluntary_ctxt_switches", "voluntary_ctxt_switches_delta",
+        "nonvoluntary_ctxt_switches", "nonvoluntary_ctxt_switches_delta",
+        "read_bytes", "read_bytes_delta",
+        "write_bytes", "write_bytes_delta",
+        "cpu_rate",  # 👈 추가됨
+        "pid",
+    ]
+    out = out[keep_cols + (["_row_pos"] if "_row_pos" in out.columns else [])] \
+        .sort_values(["cycle_id", "_row_pos"]) \
+        .reset_index(drop=True)
+
+    return out
+
+def make_sample(rows: int, pods: int = 40, pids: int = 25, seed: int = 0) -> pd.DataFrame:
+    """수집기 CSV와 같은 모양의 합성 데이터 (사이클마다 pod × pid 행, 일부 결측/카운터 리셋 포함)"""
+    rng = np.random.default_rng(seed)
+    per_cycle = pods * pids
+    cycles = -(-rows // per_cycle)
+    cycle = np.repeat(np.arange(cycles), per_cycle)[:rows]
+    pod = np.tile(np.repeat(np.arange(pods), pids), cycles)[:rows]
+    pid = np.tile(np.tile(np.arange(1, pids + 1), pods), cycles)[:rows]
+
+    pod_names = np.array([f"active-{i}" if i % 3 else f"idle-worker-{i}" for i in range(pods - 1)] + ["singleton"],
+                         dtype=object)
+    comms = np.array(["/bin/bash /entrypoint.sh", "python ./programs/active/active_multithreaded.py",
+                      "sleep 5", "python3 -u '/app/idle.py'", "bash"], dtype=object)
+    base = pd.Timestamp("2025-01-01")
+
+    def counter(scale):
+        values = (cycle * pid * scale + rng.integers(0, scale + 1, rows)).astype("int64")
+        values[rng.random(rows) < 0.001] = 0  # 카운터 리셋(음수 델타)
+        return values
+
+    df = pd.DataFrame({
+        "pod_name": pod_names[pod],
+        "timestamp": (base + pd.to_timedelta(cycle, unit="s")).astype(str),
+        "comm": comms[pid % len(comms)],
+        "state": np.where(rng.random(rows) < 0.2, "R", "S"),
+        "pid": pid,
+        "utime": counter(3), "stime": counter(2), "cutime": counter(1),
+        "minflt": counter(10), "majflt": counter(1),
+        "num_threads": rng.integers(1, 16, rows),
+        "vsize": np.full(rows, 2**64 - 4096, dtype="uint64"),
+        "rss": rng.integers(100, 10000, rows),
+        "rsslim": np.full(rows, 2**64 - 1, dtype="uint64"),
+        "vm_rss_status": rng.integers(400, 40000, rows).astype("float64"),
+        "voluntary_ctxt_switches": counter(5).astype("float64"),
+        "nonvoluntary_ctxt_switches": counter(2),
+        "read_bytes": counter(4096), "write_bytes": counter(512),
+    })
+    df.loc[rng.random(rows) < 0.01, "vm_rss_status"] = np.nan
+    df.loc[rng.random(rows) < 0.01, "voluntary_ctxt_switches"] = np.nan
+    df.loc[rng.random(rows) < 0.0005, "timestamp"] = "invalid"
+    return df
+
+def _timed(fn, df, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(df)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def main():
+    parser = argparse.ArgumentParser(description="build_normalized_usage_table 벤치마크")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--pods", type=int, default=40)
+    parser.add_argument("--pids", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    df = make_sample(args.rows, args.pods, args.pids)
+    print(f"rows={len(df):,} pods={args.pods} pids={args.pids}")
+
+    legacy, legacy_sec = _timed(_legacy_build_normalized_usage_table, df, args.repeat)
+    print(f"legacy     : {legacy_sec:8.3f}s")
+    current, current_sec = _timed(build_normalized_usage_table, df, args.repeat)
+    print(f"vectorized : {current_sec:8.3f}s")
+
+    pd.testing.assert_frame_equal(current, legacy, check_exact=True)
+    print(f"결과 동일, {legacy_sec / current_sec:.1f}x 빠름")
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,27 @@
 from pathlib import Path
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple
+import numpy as np
 import pandas as pd
 from pathlib import PurePosixPath
 
-from tool.data_graph import main
+from csvRotation import csv_parts, group_parts
 
 FILENAME_REGEX = re.compile(r"^process_metrics_experiment(\d+)\.csv$", re.IGNORECASE)
+PARTITION_REGEX = re.compile(r"^(experiment_id|cycle)=(\d+)$")
 
 def find_experiment_files(dir_path: str | Path) -> List[Path]:
     """
     주어진 디렉터리에서 'process_metrics_experiment*.csv' 파일을 모두 찾고,
     파일명 뒤의 실험 번호(정수) 기준으로 오름차순 정렬하여 Path 리스트 반환.
+    교체된 조각(process_metrics_experiment<N>.<시각>.csv)은 원래 파일 경로 하나로 묶음
+    (원래 파일이 없고 조각만 있어도 포함, 읽을 때는 read_experiment_csv/iter_experiment_csv 사용)
     """
     base = Path(dir_path)
     if not base.is_dir():
         raise NotADirectoryError(f"Not a directory: {base}")
 
-    candidates = list(base.glob("process_metrics_experiment*.csv"))
+    candidates = [Path(p) for p in group_parts(base.glob("process_metrics_experiment*.csv"))]
 
     # (exp_no, Path) 튜플로 정리 후 정렬
     parsed: List[Tuple[int, Path]] = []
@@ -36,26 +40,118 @@ def find_experiment_files(dir_path: str | Path) -> List[Path]:
     # Path만 추출
     return [p for _, p in parsed]
 
+def find_experiment_datasets(dir_path: str | Path, dataset: str = "process_metrics") -> Dict[int, Path]:
+    """
+    실험 번호별 데이터 위치를 형식에 관계없이 찾아 반환.
+    - CSV: <dir>/process_metrics_experiment<N>.csv
+    - Parquet: <dir>/parquet/<dataset>/experiment_id=<N>/ (같은 실험이 둘 다 있으면 Parquet 우선)
+    """
+    found: Dict[int, Path] = {}
+    if dataset == "process_metrics":
+        for p in find_experiment_files(dir_path):
+            found[int(FILENAME_REGEX.match(p.name).group(1))] = p
+
+    parquet_root = Path(dir_path) / "parquet" / dataset
+    if parquet_root.is_dir():
+        for d in parquet_root.iterdir():
+            m = PARTITION_REGEX.match(d.name)
+            if d.is_dir() and m and m.group(1) == "experiment_id":
+                found[int(m.group(2))] = d
+
+    return dict(sorted(found.items()))
+
+def read_parquet_experiment(exp_dir: str | Path) -> pd.DataFrame:
+    """
+    experiment_id=<N>/cycle=<n>/*.parquet 파티션을 사이클 순서대로 읽어 하나의 DataFrame으로 반환.
+    dictionary 컬럼(pod_name, comm, state)은 category로 읽힘.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    cycles = []
+    for d in Path(exp_dir).iterdir():
+        m = PARTITION_REGEX.match(d.name)
+        if d.is_dir() and m and m.group(1) == "cycle":
+            cycles.append((int(m.group(2)), d))
+    cycles.sort(key=lambda x: x[0])
+
+    tables = [pq.read_table(f) for _, d in cycles for f in sorted(d.glob("*.parquet"))]
+    if not tables:
+        return pd.DataFrame()
+    return pa.concat_tables(tables, promote_options="permissive").to_pandas()
+
 def load_experiment_csvs(dir_path: str | Path, **read_csv_kwargs) -> Dict[int, pd.DataFrame]:
     """
-    해당 디렉터리의 실험 CSV들을 모두 읽어서 {실험번호: DataFrame} 형태로 반환.
-    read_csv_kwargs로 encoding='utf-8', dtype=..., usecols=... 같은 옵션을 전달 가능.
+    해당 디렉터리의 실험 데이터(CSV 또는 Parquet)를 모두 읽어서 {실험번호: DataFrame} 형태로 반환.
+    read_csv_kwargs로 encoding='utf-8', dtype=..., usecols=... 같은 옵션을 전달 가능 (CSV에만 적용).
     """
-    files = find_experiment_files(dir_path)
     result: Dict[int, pd.DataFrame] = {}
 
-    for p in files:
-        m = FILENAME_REGEX.match(p.name)
-        exp_no = int(m.group(1))  # 정규식 매치가 보장됨
+    for exp_no, p in find_experiment_datasets(dir_path).items():
         try:
-            df = pd.read_csv(p, **read_csv_kwargs)
-            result[exp_no] = df
+            if p.is_dir():
+                result[exp_no] = read_parquet_experiment(p)
+            else:
+                result[exp_no] = read_experiment_csv(p, **read_csv_kwargs)
         except Exception as e:
             # 파일 읽기 실패 시: 상황에 따라 raise 하거나 스킵하도록 선택
             raise RuntimeError(f"Failed to read {p}: {e}") from e
 
     return result
 
+def read_experiment_csv(path: str | Path, **read_csv_kwargs) -> pd.DataFrame:
+    """실험 CSV 하나를 교체된 조각까지 순서대로 읽어 이어 붙임 (조각마다 헤더가 달라도 컬럼을 합침)"""
+    frames = [pd.read_csv(part, **read_csv_kwargs) for part in csv_parts(path)]
+    if not frames:
+        raise FileNotFoundError(f"No CSV parts for {path}")
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+def load_sample_log(dir_path: str | Path, pods=None, start=None, end=None) -> pd.DataFrame:
+    """
+    압축 샘플 로그(data/samples/)에서 파드/시간 범위(epoch 초)에 해당하는 샘플을 읽어 반환.
+    결과는 CSV와 같은 컬럼을 가지므로 build_normalized_usage_table에 바로 전달 가능.
+    """
+    from sampleLog import SampleLogReader
+    return SampleLogReader(str(dir_path)).read(pods=pods, start=start, end=end)
+
+def iter_experiment_db(start, end, pods=None, namespace=None, chunk_rows: int = 200000):
+    """
+    Postgres의 [start, end) 구간 프로세스 데이터를 청크 DataFrame으로 반환 (binary COPY 추출).
+    컬럼 이름은 CSV와 같게 맞춤 (vm_rss → vm_rss_status).
+    """
+    from processQuery import iter_process_extract
+    for chunk in iter_process_extract(start, end, pods=pods, namespace=namespace, chunk_rows=chunk_rows):
+        yield chunk.rename(columns={"vm_rss": "vm_rss_status"})
+
+def load_experiment_db(start, end, pods=None, namespace=None, chunk_rows: int = 200000) -> pd.DataFrame:
+    """
+    iter_experiment_db 결과를 하나의 DataFrame으로 반환.
+    pod_name/comm/state는 category라서 몇 주치 데이터도 CSV 로드보다 작게 올라옴.
+    결과는 build_normalized_usage_table에 바로 전달 가능.
+    """
+    chunks = list(iter_experiment_db(start, end, pods=pods, namespace=namespace, chunk_rows=chunk_rows))
+    if not chunks:
+        return pd.DataFrame()
+    df = pd.concat(chunks, ignore_index=True)
+    for col in ("pod_name", "comm", "state"):
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+def load_normalized_experiments(dir_path: str | Path, cycle_size: int = 100, workers: int = None,
+                                cache_dir: str | Path = None, use_cache: bool = True) -> Dict[int, pd.DataFrame]:
+    """
+    디렉터리의 모든 실험을 clean_metricData + build_normalized_usage_table까지 처리해 {실험번호: DataFrame}으로 반환.
+    실험별 결과는 Parquet으로 캐시되어(기본 <dir_path>/.cache) 원본이나 코드가 바뀐 실험만
+    workers개 프로세스로 다시 계산.
+    """
+    from tool.experiment_cache import process_experiments
+    return process_experiments(
+        find_experiment_datasets(dir_path), kind="usage",
+        cache_dir=cache_dir if cache_dir is not None else Path(dir_path) / ".cache",
+        workers=workers, options={"cycle_size": cycle_size}, use_cache=use_cache,
+    )
+
 def clean_metricData(datasets: Dict[int, pd.DataFrame]) -> Dict[int, pd.DataFrame]:
     """
     datasets 내 모든 DataFrame에서 pid == 1 이고
@@ -174,6 +270,75 @@ def _extract_comm_tail(comm: str) -> str:
         stem = stem.split(".")[0]
     return stem
 
+_POD_ORDINAL_PATTERN = r"^(.*?)-(\d+)$"
+
+def _split_pod_names(pod_names: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """
+    pod_name 컬럼 → (기본 이름, ordinal(-1 = 없음))
+    _split_pod_base_and_ordinal과 같은 규칙을 고유값에만 정규식(str.extract)으로 적용
+    """
+    names = pod_names.astype(str)
+    codes, uniques = pd.factorize(names, sort=False)
+    stripped = pd.Series(uniques, dtype=object).str.strip()
+    parts = stripped.str.extract(_POD_ORDINAL_PATTERN)
+    bases = pd.array(parts[0].where(parts[1].notna(), stripped).to_numpy(dtype=object), dtype=names.dtype)
+    ordinals = pd.to_numeric(parts[1]).fillna(-1).to_numpy(dtype="int64")
+    return (pd.Series(bases.take(codes), index=pod_names.index),
+            pd.Series(ordinals[codes], index=pod_names.index))
+
+def _extract_comm_tails(comms: pd.Series) -> pd.Series:
+    """comm 컬럼 → 파일명 stem, 고유값마다 한 번만 계산"""
+    names = comms.astype(str)
+    codes, uniques = pd.factorize(names, sort=False)
+    tails = pd.array([_extract_comm_tail(u) for u in uniques], dtype=names.dtype)
+    return pd.Series(tails.take(codes), index=comms.index)
+
+def _to_datetime_by_unique(values: pd.Series) -> pd.Series:
+    """pd.to_datetime(errors="coerce")를 고유값에만 적용 (사이클마다 같은 timestamp가 반복됨)"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    codes, uniques = pd.factorize(values, sort=False)
+    parsed = pd.to_datetime(pd.Index(uniques, dtype=object), errors="coerce")
+    return pd.Series(parsed.take(codes, allow_fill=True, fill_value=pd.NaT), index=values.index)
+
+# build_normalized_usage_table이 읽는 컬럼 (usecols로 나머지는 읽지 않음)
+USAGE_CSV_COLUMNS = [
+    "pod_name", "timestamp", "comm", "state", "pid",
+    "utime", "stime", "cutime", "minflt", "majflt",
+    "num_threads",
+    "vsize", "rss", "rsslim", "vm_rss_status",
+    "voluntary_ctxt_switches", "nonvoluntary_ctxt_switches",
+    "read_bytes", "write_bytes"
+]
+_USAGE_KEEP_COLS = [
+    "cycle_id",
+    "pod_name", "pod_ordinal", "timestamp", "comm", "state",
+    "utime", "utime_delta",
+    "stime", "stime_delta",
+    "cutime", "cutime_delta",
+    "cpu_time", "cpu_time_delta",
+    "minflt", "minflt_delta", "majflt", "majflt_delta",
+    "num_threads",
+    "vsize", "vsize_delta",
+    "rss", "rss_delta",
+    "rsslim", "rsslim_delta",
+    "vm_rss_status",
+    "voluntary_ctxt_switches", "voluntary_ctxt_switches_delta",
+    "nonvoluntary_ctxt_switches", "nonvoluntary_ctxt_switches_delta",
+    "read_bytes", "read_bytes_delta",
+    "write_bytes", "write_bytes_delta",
+    "cpu_rate",
+    "pid",
+    "_row_pos",
+]
+# 델타를 만드는 누적값 컬럼 (build_normalized_usage_table, 스트리밍 로더 공통)
+_USAGE_CUMULATIVE_COLS = [
+    "utime", "stime", "cutime", "minflt", "majflt",
+    "voluntary_ctxt_switches", "nonvoluntary_ctxt_switches",
+    "read_bytes", "write_bytes",
+    "vsize", "rss", "rsslim"
+]
+
 def build_normalized_usage_table(
     df: pd.DataFrame,
     ticks_per_sec: int = 100,
@@ -197,132 +362,251 @@ def build_normalized_usage_table(
       vsize, rss, rsslim
     - 델타 계산은 (pod_name_base, pod_ordinal, pid) 단위로 정렬·차분
     - CSV 입력 순서대로 cycle_id 부여(0부터), 한 사이클은 cycle_size개 레코드
+    - pod_name/comm 파싱은 고유값에만, 델타는 모든 누적값 컬럼을 한 번의 정렬·차분으로 계산
     """
-    required = [
-        "pod_name", "timestamp", "comm", "state", "pid",
-        "utime", "stime", "cutime", "minflt", "majflt",
-        "num_threads",
-        "vsize", "rss", "rsslim", "vm_rss_status",
-        "voluntary_ctxt_switches", "nonvoluntary_ctxt_switches",
-        "read_bytes", "write_bytes"
-    ]
-    missing = [c for c in required if c not in df.columns]
+    missing = [c for c in USAGE_CSV_COLUMNS if c not in df.columns]
     if missing:
         raise KeyError(f"필수 컬럼 누락: {missing}")
     if cycle_size is None or cycle_size <= 0:
         raise ValueError("cycle_size는 1 이상의 정수여야 합니다.")
 
     # --- 원본 순서 보존용 위치 ---
-    out = df.copy()
-    out["_row_pos"] = range(len(out))  # CSV/입력 순서 인덱스
-
-    # 1) pod_name 분해 → base, ordinal
-    base_and_idx = out["pod_name"].astype(str).apply(_split_pod_base_and_ordinal)
-    out["pod_name"] = base_and_idx.apply(lambda x: x[0])
-    out["pod_ordinal"] = base_and_idx.apply(lambda x: x[1])
+    out = df[USAGE_CSV_COLUMNS].copy()
+    out["_row_pos"] = np.arange(len(out), dtype="int64")  # CSV/입력 순서 인덱스
 
-    # pod_ordinal이 None이면 그룹에서 누락되지 않도록 -1로 치환
-    out["pod_ordinal"] = out["pod_ordinal"].fillna(-1).astype("int64")
+    # 1) pod_name 분해 → base, ordinal(없으면 -1)
+    out["pod_name"], out["pod_ordinal"] = _split_pod_names(out["pod_name"])
 
     # 2) comm 정규화
-    out["comm"] = out["comm"].astype(str).map(_extract_comm_tail)
+    out["comm"] = _extract_comm_tails(out["comm"])
 
     # 3) timestamp 정규화
-    out["timestamp"] = pd.to_datetime(out["timestamp"], errors="coerce")
-    out = out.dropna(subset=["timestamp", "pid"]).copy()
-
-    # 누적값 컬럼 정의
-    cumulative_cols = [
-        "utime", "stime", "cutime", "minflt", "majflt",
-        "voluntary_ctxt_switches", "nonvoluntary_ctxt_switches",
-        "read_bytes", "write_bytes",
-        "vsize", "rss", "rsslim"
-    ]
-    for col in cumulative_cols:
+    out["timestamp"] = _to_datetime_by_unique(out["timestamp"])
+    valid = out["timestamp"].notna() & out["pid"].notna()
+    if not valid.all():
+        out = out[valid]
+
+    for col in _USAGE_CUMULATIVE_COLS:
         out[col] = pd.to_numeric(out[col], errors="coerce")
+    out["cpu_time"] = out["utime"] + out["stime"]
+
+    # 4) (pod_name, pod_ordinal, pid) 그룹 번호 → (그룹, timestamp, 입력 순서)로 한 번 정렬
+    group_id = np.zeros(len(out), dtype="int64")
+    for key in ("pod_name", "pod_ordinal", "pid"):
+        codes, uniques = pd.factorize(out[key], sort=True)
+        group_id = group_id * len(uniques) + codes
+    timestamps = out["timestamp"].astype("int64").to_numpy()
+    if len(timestamps) < 2 or (timestamps[1:] >= timestamps[:-1]).all():
+        order = np.argsort(group_id, kind="stable")  # 입력이 시간순이면 그룹 키만으로 충분
+    else:
+        order = np.lexsort((timestamps, group_id))
+
+    # 각 행의 같은 그룹 직전 행 위치 (그룹 첫 행은 -1)
+    prev_pos = np.full(len(order), -1, dtype="int64")
+    if len(order) > 1:
+        same_group = group_id[order[1:]] == group_id[order[:-1]]
+        prev_pos[order[1:][same_group]] = order[:-1][same_group]
+    has_prev = prev_pos >= 0
+    prev_pos[~has_prev] = 0
+
+    def grouped_delta(values: np.ndarray) -> np.ndarray:
+        """그룹 내 직전 행 대비 증가량 (음수, 결측, 그룹 첫 행은 0)"""
+        delta = values - values[prev_pos]
+        delta[~has_prev] = np.nan
+        np.maximum(delta, 0.0, out=delta)
+        delta[np.isnan(delta)] = 0.0
+        return delta
+
+    # 5) 누적값 + cpu_time 차분, 행 위치 기준으로 계산해 바로 대입 (merge 없음)
+    extra = {}
+    for col in _USAGE_CUMULATIVE_COLS + ["cpu_time"]:
+        extra[f"{col}_delta"] = grouped_delta(out[col].to_numpy(dtype="float64", na_value=np.nan))
+
+    # 6) cpu_rate = (curr - prev) / prev * 100, curr = utime_delta + stime_delta
+    cpu_time_sum = extra["utime_delta"] + extra["stime_delta"]
+    prev_cpu_time_sum = np.where(has_prev, cpu_time_sum[prev_pos], np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cpu_rate = (cpu_time_sum - prev_cpu_time_sum) / prev_cpu_time_sum * 100
+    cpu_rate[np.isnan(cpu_rate)] = 0.0
+    extra["cpu_rate"] = cpu_rate
+    out = pd.concat([out, pd.DataFrame(extra, index=out.index)], axis=1)
 
-    # 정렬된 복사본으로 델타 계산
-    sort_keys = ["pod_name", "pod_ordinal", "pid", "timestamp", "_row_pos"]
-    tmp = out.sort_values(sort_keys).copy()
-    gkeys = ["pod_name", "pod_ordinal", "pid"]
-
-    for col in cumulative_cols:
-        dcol = f"{col}_delta"
-        tmp[dcol] = (
-            tmp.groupby(gkeys, sort=False)[col]
-            .diff()
-            .clip(lower=0)
-            .fillna(0.0)
-            .astype("float64")
+    # cycle_id 부여
+    out["cycle_id"] = out["_row_pos"] // int(cycle_size)
+
+    # 최종 컬럼 정리 (out은 이미 _row_pos 순서 = cycle_id, _row_pos 순서)
+    return out[_USAGE_KEEP_COLS].reset_index(drop=True)
+
+
+# ---------------------------
+# 스트리밍(청크) 로더
+# ---------------------------
+# CSV 컬럼별 dtype (빈 값이 있을 수 있는 숫자 컬럼은 nullable 정수)
+_CATEGORY_CSV_COLS = ("pod_name", "comm", "state", "policy")
+_INT32_CSV_COLS = (
+    "pid", "ppid", "pgrp", "session", "tty_nr", "tpgid", "priority", "nice", "num_threads",
+    "exit_signal", "processor", "rt_priority", "exit_code"
+)
+_INT64_CSV_COLS = (
+    "flags", "minflt", "cminflt", "majflt", "cmajflt", "utime", "stime", "cutime", "cstime",
+    "itrealvalue", "starttime", "rss", "nswap", "cnswap", "delayacct_blkio_ticks", "guest_time", "cguest_time",
+    "voluntary_ctxt_switches", "nonvoluntary_ctxt_switches", "vm_rss", "vm_rss_status", "read_bytes", "write_bytes"
+)
+_UINT64_CSV_COLS = (
+    "vsize", "rsslim", "startcode", "endcode", "startstack", "kstkesp", "kstkeip",
+    "signal", "blocked", "sigignore", "sigcatch", "wchan",
+    "start_data", "end_data", "start_brk", "arg_start", "arg_end", "env_start", "env_end"
+)
+PROCESS_CSV_DTYPES = {
+    **{c: "category" for c in _CATEGORY_CSV_COLS},
+    **{c: "Int32" for c in _INT32_CSV_COLS},
+    **{c: "Int64" for c in _INT64_CSV_COLS},
+    **{c: "UInt64" for c in _UINT64_CSV_COLS},
+    "timestamp": "string",
+}
+def _is_entrypoint_row(df: pd.DataFrame) -> pd.Series:
+    """clean_metricData가 지우는 행 (pid 1의 entrypoint 스크립트)"""
+    return (df["pid"] == 1) & (df["comm"] == "/bin/bash /entrypoint.sh")
+
+def iter_experiment_csv(path: str | Path, chunksize: int = 200_000, usecols=None,
+                        clean: bool = True) -> Iterator[pd.DataFrame]:
+    """
+    실험 CSV를 chunksize행씩 고정 dtype(category, Int32, UInt64 등)으로 읽어 반환.
+    교체된 조각이 있으면 오래된 조각부터 이어서 읽음 (조각마다 헤더를 따로 읽음)
+    clean=True면 청크마다 clean_metricData와 같은 필터 적용.
+    """
+    parts = csv_parts(path)
+    if not parts:
+        raise FileNotFoundError(f"No CSV parts for {path}")
+    for part in parts:
+        header = pd.read_csv(part, nrows=0).columns
+        wanted = [c for c in header if usecols is None or c in usecols]
+        dtypes = {c: t for c, t in PROCESS_CSV_DTYPES.items() if c in wanted}
+        # nullable Int32/Int64는 파서에 넘기면 몇 배 느려서 기본 파싱 후 변환 (2^53 미만 값이라 손실 없음)
+        parse_dtypes = {c: t for c, t in dtypes.items() if t not in ("Int32", "Int64")}
+        cast_dtypes = {c: t for c, t in dtypes.items() if t in ("Int32", "Int64")}
+        for chunk in pd.read_csv(part, usecols=wanted, dtype=parse_dtypes, chunksize=chunksize):
+            for col, dtype in cast_dtypes.items():
+                try:
+                    chunk[col] = chunk[col].astype(dtype)
+                except (TypeError, ValueError):
+                    chunk[col] = pd.to_numeric(chunk[col], errors="coerce")  # 정수가 아닌 값이 섞인 컬럼은 float로 둠
+            if clean and "pid" in chunk.columns and "comm" in chunk.columns:
+                chunk = chunk[~_is_entrypoint_row(chunk).fillna(False).to_numpy(dtype=bool)]
+            yield chunk
+
+class StreamingUsageNormalizer:
+    """
+    build_normalized_usage_table을 청크 단위로 수행.
+    (pod_name, pod_ordinal, pid)별 마지막 행의 누적값/cpu_time/cpu_time_sum을 다음 청크로 넘겨
+    청크 경계에서도 델타와 cpu_rate가 전체 테이블로 계산한 것과 같게 유지.
+    pid별 행이 파일 안에서 시간순으로 나온다고 가정 (수집기가 쓰는 CSV는 항상 그러함).
+    """
+    KEYS = ["pod_name", "pod_ordinal", "pid"]
+    CARRY_COLS = _USAGE_CUMULATIVE_COLS + ["cpu_time", "cpu_time_sum"]
+
+    def __init__(self, cycle_size: int = 100):
+        if cycle_size is None or cycle_size <= 0:
+            raise ValueError("cycle_size는 1 이상의 정수여야 합니다.")
+        self.cycle_size = int(cycle_size)
+        self._row_offset = 0
+        self._state = pd.DataFrame({
+            "pod_name": pd.Series(dtype=object), "pod_ordinal": pd.Series(dtype="int64"),
+            "pid": pd.Series(dtype="int32"), **{c: pd.Series(dtype="float64") for c in self.CARRY_COLS}
+        })
+
+    def process(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        missing = [c for c in USAGE_CSV_COLUMNS if c not in chunk.columns]
+        if missing:
+            raise KeyError(f"필수 컬럼 누락: {missing}")
+
+        # 원본 순서 위치는 파일 전체 기준 (청크 사이에서 이어짐)
+        out = chunk[USAGE_CSV_COLUMNS].copy()
+        n = len(out)
+        out["_row_pos"] = np.arange(self._row_offset, self._row_offset + n, dtype="int64")
+        self._row_offset += n
+
+        out["pod_name"], out["pod_ordinal"] = _split_pod_names(out["pod_name"])
+        out["comm"] = _extract_comm_tails(out["comm"])
+        out["timestamp"] = _to_datetime_by_unique(out["timestamp"])
+        out = out.dropna(subset=["timestamp", "pid"])
+        out["pid"] = out["pid"].astype("int32")
+        for col in _USAGE_CUMULATIVE_COLS:
+            out[col] = pd.to_numeric(out[col], errors="coerce")
+        out["cpu_time"] = out["utime"] + out["stime"]
+        if out.empty:
+            return out.reindex(columns=_USAGE_KEEP_COLS)
+
+        # 델타 계산용 float 사본, 이전 청크의 마지막 행(carry)을 각 그룹 맨 앞에 붙임
+        calc = out[self.KEYS + ["timestamp", "_row_pos"]].copy()
+        for col in _USAGE_CUMULATIVE_COLS + ["cpu_time"]:
+            calc[col] = out[col].astype("float64")
+        carry = self._state.merge(calc[self.KEYS].drop_duplicates(), on=self.KEYS, how="inner")
+        carry["_carry"] = True
+        calc["_carry"] = False
+        work = pd.concat([carry, calc], ignore_index=True)
+        work["_order"] = work["_carry"].map({True: 0, False: 1}).astype("int8")
+        work = work.sort_values(self.KEYS + ["_order", "timestamp", "_row_pos"], kind="stable")
+        groups = work.groupby(self.KEYS, sort=False)
+
+        for col in _USAGE_CUMULATIVE_COLS + ["cpu_time"]:
+            work[f"{col}_delta"] = groups[col].diff().clip(lower=0).fillna(0.0).astype("float64")
+        # carry 행의 cpu_time_sum은 이전 청크에서 계산한 값 유지
+        cpu_time_sum = work["utime_delta"] + work["stime_delta"]
+        work["cpu_time_sum"] = cpu_time_sum.where(~work["_carry"], work["cpu_time_sum"])
+        prev = groups["cpu_time_sum"].shift(1)
+        work["cpu_rate"] = ((work["cpu_time_sum"] - prev) / prev * 100).fillna(0.0)
+
+        work = work[~work["_carry"].to_numpy(dtype=bool)]
+        last = work.drop_duplicates(self.KEYS, keep="last")[self.KEYS + self.CARRY_COLS]
+        self._state = (
+            pd.concat([self._state, last], ignore_index=True)
+            .drop_duplicates(self.KEYS, keep="last")
+            .reset_index(drop=True)
         )
 
-    # --- cpu_time(utime+stime) 계산 ---
-    # 🔹 utime+stime = cpu_time 계산
-    tmp["cpu_time"] = tmp["utime"] + tmp["stime"]
-
-    # 🔹 cpu_time_delta 계산
-    tmp["cpu_time_delta"] = (
-        tmp.groupby(gkeys, sort=False)["cpu_time"]
-        .diff()
-        .clip(lower=0)
-        .fillna(0.0)
-        .astype("float64")
-    )
-
-    # --- cpu_rate 계산 ---
-    # curr_time = utime_delta + stime_delta
-    tmp["cpu_time_sum"] = tmp["utime_delta"] + tmp["stime_delta"]
-
-    # prev_time = 이전 행의 cpu_time_sum
-    tmp["prev_cpu_time_sum"] = tmp.groupby(gkeys, sort=False)["cpu_time_sum"].shift(1)
-
-    # (curr - prev) / prev * 100
-    tmp["cpu_rate"] = (
-                              (tmp["cpu_time_sum"] - tmp["prev_cpu_time_sum"]) / tmp["prev_cpu_time_sum"]
-                      ) * 100
-
-    # 첫 행은 NaN -> 0으로 채움
-    tmp["cpu_rate"] = tmp["cpu_rate"].fillna(0.0)
-
-    # 델타 및 cpu_rate, cpu_time, cpu_time_delta 원래 순서로 붙이기
-    extra_cols = [f"{c}_delta" for c in cumulative_cols] + [
-        "cpu_rate", "cpu_time", "cpu_time_delta"
-    ]
-    out = out.merge(tmp[["_row_pos"] + extra_cols], on="_row_pos", how="left")
-
-    # cycle_id 부여
-    out["cycle_id"] = (out["_row_pos"] // int(cycle_size)).astype("int64")
-
-    # 최종 컬럼 정리
-    keep_cols = [
-        "cycle_id",
-        "pod_name", "pod_ordinal", "timestamp", "comm", "state",
-        "utime", "utime_delta",
-        "stime", "stime_delta",
-        "cutime", "cutime_delta",
-        "cpu_time", "cpu_time_delta",
-        "minflt", "minflt_delta", "majflt", "majflt_delta",
-        "num_threads",
-        "vsize", "vsize_delta",
-        "rss", "rss_delta",
-        "rsslim", "rsslim_delta",
-        "vm_rss_status",
-        "voluntary_ctxt_switches", "voluntary_ctxt_switches_delta",
-        "nonvoluntary_ctxt_switches", "nonvoluntary_ctxt_switches_delta",
-        "read_bytes", "read_bytes_delta",
-        "write_bytes", "write_bytes_delta",
-        "cpu_rate",  # 👈 추가됨
-        "pid",
-    ]
-    out = out[keep_cols + (["_row_pos"] if "_row_pos" in out.columns else [])] \
-        .sort_values(["cycle_id", "_row_pos"]) \
-        .reset_index(drop=True)
-
-    return out
+        # out은 _row_pos 순서이므로 정렬만 되돌려 붙임
+        work = work.sort_values("_row_pos")
+        extra_cols = [f"{c}_delta" for c in _USAGE_CUMULATIVE_COLS] + ["cpu_time_delta", "cpu_rate"]
+        for col in extra_cols:
+            out[col] = work[col].to_numpy()
+        out["cycle_id"] = (out["_row_pos"] // self.cycle_size).astype("int64")
+        return out[_USAGE_KEEP_COLS].reset_index(drop=True)
+
+def _concat_with_categories(frames: List[pd.DataFrame], category_cols=("pod_name", "comm", "state")) -> pd.DataFrame:
+    """청크를 이어 붙이고 문자열 컬럼을 category로 (청크별 범주를 합침)"""
+    if not frames:
+        return pd.DataFrame(columns=_USAGE_KEEP_COLS)
+    df = pd.concat(frames, ignore_index=True)
+    for col in category_cols:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+def iter_normalized_usage(path: str | Path, chunksize: int = 200_000, cycle_size: int = 100,
+                          clean: bool = True) -> Iterator[pd.DataFrame]:
+    """실험 CSV 하나를 청크 단위로 읽고 정규화 (메모리 사용량은 chunksize와 pid 수에 비례)"""
+    normalizer = StreamingUsageNormalizer(cycle_size=cycle_size)
+    for chunk in iter_experiment_csv(path, chunksize=chunksize, usecols=USAGE_CSV_COLUMNS, clean=clean):
+        normalized = normalizer.process(chunk)
+        if not normalized.empty:
+            for col in ("pod_name", "comm", "state"):
+                normalized[col] = normalized[col].astype("category")
+            yield normalized
+
+def load_normalized_usage(path: str | Path, chunksize: int = 200_000, cycle_size: int = 100,
+                          clean: bool = True) -> pd.DataFrame:
+    """
+    clean_metricData + build_normalized_usage_table과 같은 결과를 청크 단위로 계산해 반환.
+    전체 원본을 메모리에 올리지 않으며, 결과의 pod_name/comm/state는 category.
+    """
+    return _concat_with_categories(list(iter_normalized_usage(path, chunksize, cycle_size, clean)))
 
 
 # 사용 예시
 if __name__ == "__main__":
+    from tool.data_graph import main
+
     # 예: 현재 폴더 기준
     dir_path = "experiment_data/"  # 작업 디렉터리 경로로 바꿔주세요
     files = find_experiment_files(dir_path)
@@ -330,24 +614,15 @@ if __name__ == "__main__":
     for f in files:
         print(" -", f.name)
 
-    # CSV 로드 (필요하면 encoding, dtype 등을 지정하세요)
-    datasets = load_experiment_csvs(dir_path, encoding="utf-8")
-    print(f"\n총 {len(datasets)}개 실험 데이터 로드 완료.")
-    # 예: 1번 실험 데이터 정보 출력
-    if 1 in datasets:
-        print("exp 1 shape:", datasets[1].shape)
-        df = datasets[1]
-        for col in df.columns:
-            print(col, end=', ')
-
-    datasets = clean_metricData(datasets)
-    #showDF(datasets[1])
-    #show_active0(datasets[1])
+    # 실험별 전처리는 병렬로, 결과는 experiment_data/.cache에 캐시 (바뀐 실험만 다시 계산)
+    normalized = load_normalized_experiments(dir_path)
+    print(f"\n총 {len(normalized)}개 실험 데이터 로드 완료.")
 
     normal_datas = dict()
-    for i, dataset in enumerate(datasets):
-        normal_datas['experiment_'+str(i)] = (build_normalized_usage_table(datasets[i+1]))
+    for i, exp_no in enumerate(sorted(normalized)):
+        normal_datas['experiment_'+str(i)] = normalized[exp_no]
     #showAll(df_usage)
-    save_to_excel(normal_datas['experiment_'+str(0)], "usage1.xlsx")
+    if normal_datas:
+        save_to_excel(normal_datas['experiment_'+str(0)], "usage1.xlsx")
     print(normal_datas.keys())
-    main(normal_datas)
\ No newline at end of file
+    main(normal_datas)
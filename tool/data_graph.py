@@ -1,4 +1,6 @@
 import os, sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Tuple, Dict, Union
 
 from PyQt5.QtGui import QGuiApplication
@@ -9,10 +11,11 @@ import matplotlib
 matplotlib.use("QtAgg")   # 반드시 FigureCanvas import 전에!
 
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.figure import Figure
 
 # PyQt는 한 가지만 써야 합니다. (PyQt5와 PySide 혼용 금지)
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, QObject, pyqtSignal
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QComboBox, QListWidget, QListWidgetItem, QTabWidget, QMessageBox,
@@ -22,6 +25,9 @@ from PyQt5.QtWidgets import (
 import numpy as np
 import pandas as pd
 
+from tool.downsample import SeriesLOD, plot_lod
+from tool.graph_index import dataset_index
+
 
 # 집계에서 제외할 컬럼들
 EXCLUDE_COLS = {
@@ -30,6 +36,21 @@ EXCLUDE_COLS = {
 }
 REQUIRED_FILTER_COLS = ["pod_name", "comm", "state"]
 GROUP_COL = "cycle_id"  # x축(시간 정규화)은 cycle_id
+REDRAW_DEBOUNCE_MS = 150  # 콤보 변경이 몰리면 마지막 변경 후 이 시간 뒤에 한 번만 재계산
+
+# 집계 전용 워커 스레드 (OverlayTab이 공유, 한 번에 한 요청만 계산)
+# Tab1/Tab2는 GUI 스레드에서 filtered_series를 직접 부르므로 인덱스/캐시 보호는 graph_index의 잠금이 담당
+_RECOMPUTE_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="graph-recompute")
+
+
+def _report_compute_error(future):
+    """워커에서 난 예외는 결과를 읽는 곳이 없으므로 여기서 출력"""
+    if future.cancelled():
+        return
+    exc = future.exception()
+    if exc is not None:
+        print("[GRAPH] Series computation failed:", file=sys.stderr)
+        traceback.print_exception(type(exc), exc, exc.__traceback__)
 
 
 # ---------------------------
@@ -122,6 +143,11 @@ def aggregate_series(sub: pd.DataFrame, metric: str, how: str) -> pd.Series:
     else:  # "Mean"
         return sub.groupby(GROUP_COL, as_index=True)[metric].mean().sort_index()
 
+
+def filtered_series(df: pd.DataFrame, filters: List[Tuple[str, Optional[str]]], metric: str, how: str) -> pd.Series:
+    """apply_filters + aggregate_series와 같은 결과를 데이터셋 인덱스/캐시로 계산"""
+    return dataset_index(df).series(filters, metric, how)
+
 def _rebuild_metric_combo(cb_metric: QComboBox, numeric_cols: list[str], prefer: str = "utime_delta"):
     cb_metric.blockSignals(True)
     cur = cb_metric.currentText()
@@ -272,13 +298,14 @@ class TemplatePanel(QWidget):
     def y_limits(self) -> Tuple[Optional[float], Optional[float]]:
         return to_float_or_none(self.le_ymin.text()), to_float_or_none(self.le_ymax.text())
 
-    def draw_series(self, s: pd.Series):
+    def draw_series(self, s: pd.Series, cache_key=None):
+        """cache_key: (데이터셋, 필터, metric, agg) - 같은 시계열을 다시 그릴 때 다운샘플 결과 재사용"""
         self.fig.clear()
         ax = self.fig.add_subplot(111)
         if s is not None and len(s) > 0:
             x = s.index.values
-            y = s.values
-            ax.plot(x, y, marker="o", markersize=3)
+            # 축 픽셀 폭만큼만 그리고, 줌하면 보이는 범위를 다시 세밀하게
+            plot_lod(ax, SeriesLOD(x, s.values, cache_key=cache_key), marker="o", markersize=3)
             ax.set_xlim(min(x), max(x))
         else:
             ax.text(0.5, 0.5, "No data", ha="center", va="center", transform=ax.transAxes)
@@ -400,7 +427,8 @@ class SeriesPanel(QWidget):
         if not self.datasets:
             return
         key = self.cb_dataset.currentText()
-        df_new = prepare_df_base(self.datasets[key])
+        # CyclePlotterApp에서 이미 정규화한 DF를 그대로 사용 (복사하면 데이터셋 인덱스/캐시를 다시 만들어야 함)
+        df_new = self.datasets[key]
         nc_new = select_numeric_metric_cols(df_new)
         self.set_dataframe(df_new, nc_new)
         self.set_defaults("utime_delta", "Mean")
@@ -433,8 +461,17 @@ class SeriesPanel(QWidget):
     def metric(self): return self.cb_metric.currentText() if self.cb_metric.count()>0 else None
     def agg(self):    return self.cb_agg.currentText()
 
+class _SeriesResult(QObject):
+    """워커 스레드 → GUI 스레드 결과 전달 (queued signal)"""
+    ready = pyqtSignal(int, object)
+
+
 class OverlayTab(QWidget):
-    """ 멀티 시리즈 오버레이 탭 (Series 영역 고정, 그래프 영역 가변) """
+    """
+    멀티 시리즈 오버레이 탭 (Series 영역 고정, 그래프 영역 가변)
+    변경 → debounce → 선택 스냅샷 → 워커 스레드에서 집계 → GUI 스레드에서 그리기
+    새 변경이 들어오면 세대(generation)를 올려 이전 계산은 중단/폐기
+    """
     def __init__(self, df: pd.DataFrame, numeric_cols: list[str], datasets: dict[str, pd.DataFrame] = None, parent=None):
         super().__init__(parent)
         self.df = df
@@ -443,6 +480,17 @@ class OverlayTab(QWidget):
         self.series_panels = []
         self._ready = False
         self._child_windows = []
+        self._generation = 0        # 최신 재계산 요청 번호
+        self._pending = None        # 아직 시작 안 한 이전 요청은 취소
+        self._last_results = None   # Y범위만 바뀌면 재계산 없이 다시 그림
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(REDRAW_DEBOUNCE_MS)
+        self._debounce.timeout.connect(self.redraw)
+
+        self._results = _SeriesResult(self)
+        self._results.ready.connect(self._on_series_ready)
 
         root = QVBoxLayout(self)
 
@@ -483,13 +531,16 @@ class OverlayTab(QWidget):
         self.fig = Figure(figsize=(6, 3.5))
         self.canvas = FigureCanvas(self.fig)
         self.canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)  # ★ 확장
+        # 줌/이동 툴바 (줌하면 해당 구간을 다시 세밀하게 그림)
+        self.toolbar = NavigationToolbar(self.canvas, self)
         # stretch 설정: scroll(0), canvas(1)
         root.addWidget(self.scroll, stretch=0)
+        root.addWidget(self.toolbar, stretch=0)
         root.addWidget(self.canvas, stretch=1)
 
         # 입력 이벤트(준비 완료 후 반영)
-        self.le_ymin.editingFinished.connect(self._safe_redraw)
-        self.le_ymax.editingFinished.connect(self._safe_redraw)
+        self.le_ymin.editingFinished.connect(self._redraw_cached)
+        self.le_ymax.editingFinished.connect(self._redraw_cached)
 
         # 기본 시리즈는 지연 초기화로 추가
         QTimer.singleShot(0, self._post_init)
@@ -507,9 +558,18 @@ class OverlayTab(QWidget):
         self._ready = True
         self.redraw()
 
-    def _safe_redraw(self):
+    def _safe_redraw(self, *_):
+        # 변경이 연달아 오면 타이머만 다시 시작 → 마지막 변경 뒤 한 번만 redraw
         if self._ready:
+            self._debounce.start()
+
+    def _redraw_cached(self):
+        if not self._ready:
+            return
+        if self._last_results is None:
             self.redraw()
+        else:
+            self._draw(self._last_results)
 
     def _wire_panel_signals(self, panel: SeriesPanel):
         # 변경: 삭제 콜백 연결
@@ -582,18 +642,31 @@ class OverlayTab(QWidget):
         )
 
     def redraw(self):
-        self.fig.clear()
-        ax = self.fig.add_subplot(111)
-        any_data = False
-
+        """현재 선택을 스냅샷해 워커 스레드에 집계를 맡김 (그리기는 _on_series_ready에서)"""
+        self._debounce.stop()
+        self._generation += 1
+        if self._pending is not None:
+            self._pending.cancel()
+
+        # 위젯 값은 GUI 스레드에서만 읽음
+        jobs = []
         for i, sp in enumerate(self.series_panels, start=1):
             metric = sp.metric()
             if not metric:
                 continue
-
-            df_i = sp.df
-            sub = apply_filters(df_i, sp.filters())
-            s = aggregate_series(sub, metric, sp.agg())
+            filters = sp.filters()
+            key = (sp.current_dataset(), id(sp.df), tuple(filters), metric, sp.agg())
+            jobs.append((sp.df, filters, metric, sp.agg(), self._series_label(i, sp, metric), key))
+        self._pending = _RECOMPUTE_POOL.submit(self._compute, self._generation, jobs)
+        self._pending.add_done_callback(_report_compute_error)
+
+    def _compute(self, generation: int, jobs: list):
+        """워커 스레드: 시리즈별 집계, 더 새로운 요청이 들어오면 중단"""
+        results = []
+        for df, filters, metric, how, label, key in jobs:
+            if generation != self._generation:
+                return
+            s = filtered_series(df, filters, metric, how)
             if s is None or len(s) == 0:
                 continue
 
@@ -607,12 +680,28 @@ class OverlayTab(QWidget):
 
             if len(s) == 0:
                 continue
+            results.append((s, label, key))
+        try:
+            self._results.ready.emit(generation, results)
+        except RuntimeError:
+            pass  # 계산 중에 창이 닫힘
+
+    def _on_series_ready(self, generation: int, results: list):
+        if generation != self._generation:
+            return  # 이미 다른 선택으로 바뀜
+        self._pending = None
+        self._last_results = results
+        self._draw(results)
+
+    def _draw(self, results: list):
+        self.fig.clear()
+        ax = self.fig.add_subplot(111)
 
-            any_data = True
-            label = self._series_label(i, sp, metric)
-            ax.plot(s.index.values, s.values, marker="o", markersize=3, label=label)
+        for s, label, key in results:
+            plot_lod(ax, SeriesLOD(s.index.values, s.values, cache_key=key),
+                     marker="o", markersize=3, label=label)
 
-        if not any_data:
+        if not results:
             ax.text(0.5, 0.5, "No data", ha="center", va="center", transform=ax.transAxes)
         else:
             ax.legend(loc="best")
@@ -756,16 +845,20 @@ class CommStateGrid(QWidget):
     def _safe_redraw(self, *_):
         if getattr(self, "_ready", False): self.redraw()
 
-    def _plot_pair(self, ax, s_run: pd.Series, s_slp: pd.Series, ylabel: str):
+    def _plot_pair(self, ax, s_run: pd.Series, s_slp: pd.Series, ylabel: str, cache_key=None):
         if len(s_run)==0 and len(s_slp)==0:
             ax.text(0.5, 0.5, "No data", ha="center", va="center", transform=ax.transAxes)
             return
         xmins, xmaxs = [], []
         if len(s_run)>0:
-            ax.plot(s_run.index.values, s_run.values, marker="o", markersize=3, label="running")
+            plot_lod(ax, SeriesLOD(s_run.index.values, s_run.values,
+                                   cache_key=None if cache_key is None else (cache_key, "running")),
+                     marker="o", markersize=3, label="running")
             xmins.append(s_run.index.min()); xmaxs.append(s_run.index.max())
         if len(s_slp)>0:
-            ax.plot(s_slp.index.values, s_slp.values, marker="o", markersize=3, label="sleep")
+            plot_lod(ax, SeriesLOD(s_slp.index.values, s_slp.values,
+                                   cache_key=None if cache_key is None else (cache_key, "sleep")),
+                     marker="o", markersize=3, label="sleep")
             xmins.append(s_slp.index.min()); xmaxs.append(s_slp.index.max())
         if xmins and xmaxs: ax.set_xlim(min(xmins), max(xmaxs))
         ax.set_xlabel(GROUP_COL); ax.set_ylabel(ylabel); ax.grid(True, linestyle="--", alpha=0.4)
@@ -793,11 +886,13 @@ class CommStateGrid(QWidget):
             if t == "prefix":
                 s_run, s_slp = self._series_metric_prefix_avg(key, metric)   # 항상 평균
                 ylab = f"{metric} (Mean)"
+                agg = "Mean"
             else:
-                s_run, s_slp = self._series_metric_exact(key, metric, self._agg_name())
-                ylab = f"{metric} ({self._agg_name()})"
+                agg = self._agg_name()
+                s_run, s_slp = self._series_metric_exact(key, metric, agg)
+                ylab = f"{metric} ({agg})"
 
-            self._plot_pair(ax, s_run, s_slp, ylab)
+            self._plot_pair(ax, s_run, s_slp, ylab, cache_key=(id(self.df), t, key, metric, agg))
             ax.set_title(title)
             if first_legend_ax is None: first_legend_ax = ax
 
@@ -852,6 +947,10 @@ class CyclePlotterApp(QWidget):
             self.datasets = {"default": prepare_df_base(data)}
         #self.numeric_cols = select_numeric_metric_cols(self.df)
 
+        # 데이터셋별 필터 인덱스는 시작할 때 한 번 생성 (이후 필터 변경은 인덱스 조회 + 캐시)
+        for df in self.datasets.values():
+            dataset_index(df)
+
         self.current_key = next(iter(self.datasets.keys()))
         self.df = self.datasets[self.current_key]
         self.numeric_cols = select_numeric_metric_cols(self.df)
@@ -1015,43 +1114,43 @@ class CyclePlotterApp(QWidget):
 
         # Panel A
         metric_a = self.panel1_a.current_metric()
+        agg_a = self.panel1_a.current_agg()
         if metric_a:
-            sub_a = apply_filters(self.df, shared)
-            sA = aggregate_series(sub_a, metric_a, self.panel1_a.current_agg())
+            sA = filtered_series(self.df, shared, metric_a, agg_a)
         else:
             sA = pd.Series(dtype="float64")
-        self.panel1_a.draw_series(sA)
+        self.panel1_a.draw_series(sA, cache_key=(id(self.df), tuple(shared), metric_a, agg_a))
 
         # Panel B
         metric_b = self.panel1_b.current_metric()
+        agg_b = self.panel1_b.current_agg()
         if metric_b:
-            sub_b = apply_filters(self.df, shared)
-            sB = aggregate_series(sub_b, metric_b, self.panel1_b.current_agg())
+            sB = filtered_series(self.df, shared, metric_b, agg_b)
         else:
             sB = pd.Series(dtype="float64")
-        self.panel1_b.draw_series(sB)
+        self.panel1_b.draw_series(sB, cache_key=(id(self.df), tuple(shared), metric_b, agg_b))
 
     # -------- Tab2 --------
     def refresh_tab2(self, *_):
         # Panel A
         filt_a = self.panel2_a.current_filters()
         metric_a = self.panel2_a.current_metric()
+        agg_a = self.panel2_a.current_agg()
         if metric_a:
-            sub_a = apply_filters(self.df, filt_a)
-            sA = aggregate_series(sub_a, metric_a, self.panel2_a.current_agg())
+            sA = filtered_series(self.df, filt_a, metric_a, agg_a)
         else:
             sA = pd.Series(dtype="float64")
-        self.panel2_a.draw_series(sA)
+        self.panel2_a.draw_series(sA, cache_key=(id(self.df), tuple(filt_a), metric_a, agg_a))
 
         # Panel B
         filt_b = self.panel2_b.current_filters()
         metric_b = self.panel2_b.current_metric()
+        agg_b = self.panel2_b.current_agg()
         if metric_b:
-            sub_b = apply_filters(self.df, filt_b)
-            sB = aggregate_series(sub_b, metric_b, self.panel2_b.current_agg())
+            sB = filtered_series(self.df, filt_b, metric_b, agg_b)
         else:
             sB = pd.Series(dtype="float64")
-        self.panel2_b.draw_series(sB)
+        self.panel2_b.draw_series(sB, cache_key=(id(self.df), tuple(filt_b), metric_b, agg_b))
 
 # ----------------------------
 # main: 외부에서 DataFrame을 주입해서 실행
@@ -1087,4 +1186,13 @@ def main(df):
     w.show()
     center_on_primary(w)
 
-    sys.exit(app.exec_())
\ No newline at end of file
+    sys.exit(app.exec_())
+
+def main_db(start, end, pods=None, namespace=None, cycle_size: int = 100):
+    """Postgres에서 [start, end) 구간 데이터를 읽어 정규화한 뒤 main() 실행"""
+    from tool.data_analysis import load_experiment_db, build_normalized_usage_table
+    df = load_experiment_db(start, end, pods=pods, namespace=namespace)
+    if df.empty:
+        print(f"No process data between {start} and {end}")
+        return
+    main(build_normalized_usage_table(df, cycle_size=cycle_size))
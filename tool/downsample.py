@@ -0,0 +1,206 @@
+"""
+그래프용 시계열 다운샘플링 (level of detail)
+- lttb: Largest-Triangle-Three-Buckets, 모양을 유지하면서 n_out개 원본 점 선택
+- minmax: 구간마다 최솟값/최댓값 점을 남김 (스파이크 보존)
+- SeriesLOD: 전체 시계열을 들고 있다가 보이는 x 범위와 픽셀 폭에 맞게 점을 골라 줌 (결과는 LRU 캐시)
+- plot_lod: matplotlib 축에 선을 그리고 xlim_changed/resize에 연결해 줌·크기 변경 시 보이는 범위를 다시 세밀하게 그림
+모든 함수는 x가 오름차순이라고 가정 (aggregate_series 결과는 cycle_id 정렬)
+"""
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_METHOD = "lttb"
+POINTS_PER_PIXEL = 1.0  # 픽셀 열당 남길 점 개수
+
+
+class LRUCache:
+    """크기 제한 딕셔너리 (가장 오래 안 쓴 항목부터 제거)"""
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, object]" = OrderedDict()
+
+    def get(self, key: Hashable, default=None):
+        try:
+            self._data.move_to_end(key)
+            return self._data[key]
+        except KeyError:
+            return default
+
+    def put(self, key: Hashable, value) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    LTTB로 고른 점의 인덱스 (첫 점과 마지막 점 포함, 오름차순)
+    n_out >= len(x)면 전체 인덱스
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])
+
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    # 첫/마지막 점을 뺀 나머지를 n_out - 2개 버킷으로 분할
+    edges = np.linspace(1, n - 1, n_out - 1).astype("int64")
+    selected = np.empty(n_out, dtype="int64")
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    prev = 0
+    for b in range(n_out - 2):
+        start, end = edges[b], edges[b + 1]
+        # 다음 버킷의 평균 점 (마지막 버킷이면 마지막 점)
+        if b + 2 < len(edges):
+            nxt_start, nxt_end = edges[b + 1], edges[b + 2]
+            avg_x = x[nxt_start:nxt_end].mean()
+            avg_y = y[nxt_start:nxt_end].mean()
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        # 이전 선택점, 후보점, 다음 버킷 평균이 이루는 삼각형 넓이가 최대인 후보 선택
+        area = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(np.argmax(area)) if len(area) else start
+        selected[b + 1] = prev
+    return selected
+
+
+def minmax(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    n_out // 2개 구간마다 최솟값/최댓값 점의 인덱스 (x 순서 유지, 첫/마지막 점 포함)
+    """
+    n = len(x)
+    buckets = max(1, n_out // 2)
+    if n <= n_out or n <= 2:
+        return np.arange(n)
+    y = np.asarray(y, dtype="float64")
+    edges = np.linspace(0, n, buckets + 1).astype("int64")
+    starts = edges[:-1]
+    # 구간별 argmin/argmax: NaN은 비교에서 빠지도록 ±inf로 치환
+    lo = np.minimum.reduceat(np.where(np.isnan(y), np.inf, y), starts)
+    hi = np.maximum.reduceat(np.where(np.isnan(y), -np.inf, y), starts)
+    bucket_of = np.repeat(np.arange(buckets), np.diff(edges))
+    is_min = y == lo[bucket_of]
+    is_max = y == hi[bucket_of]
+    # 구간마다 처음 나오는 최솟값/최댓값 한 개씩
+    first_min = np.flatnonzero(is_min)[np.unique(bucket_of[is_min], return_index=True)[1]]
+    first_max = np.flatnonzero(is_max)[np.unique(bucket_of[is_max], return_index=True)[1]]
+    return np.unique(np.concatenate([[0, n - 1], first_min, first_max]))
+
+
+METHODS = {"lttb": lttb, "minmax": minmax}
+
+
+class SeriesLOD:
+    """
+    전체 시계열 (x, y)에서 보이는 범위만 골라 다운샘플
+    cache_key: (dataset, filters, metric, agg) 같이 시계열을 식별하는 키, None이면 캐시하지 않음
+    """
+    def __init__(self, x, y, cache_key: Optional[Hashable] = None, method: str = DEFAULT_METHOD,
+                 cache: Optional[LRUCache] = None):
+        x = np.asarray(x)
+        y = np.asarray(y, dtype="float64")
+        keep = ~np.isnan(y)  # 집계 결과가 NaN인 점은 그리지 않음 (LTTB 넓이 계산에서도 제외)
+        self.x = x if keep.all() else x[keep]
+        self.y = y if keep.all() else y[keep]
+        self.cache_key = cache_key
+        self.method = method
+        self.cache = cache if cache is not None else LOD_CACHE
+
+    def __len__(self):
+        return len(self.x)
+
+    def visible_range(self, xmin=None, xmax=None) -> Tuple[int, int]:
+        """[xmin, xmax]에 걸치는 인덱스 범위 (선이 축 끝까지 이어지도록 양쪽 한 점씩 포함)"""
+        n = len(self.x)
+        i0 = 0 if xmin is None else max(0, int(np.searchsorted(self.x, xmin, side="left")) - 1)
+        i1 = n if xmax is None else min(n, int(np.searchsorted(self.x, xmax, side="right")) + 1)
+        return i0, max(i0, i1)
+
+    def resolve(self, xmin=None, xmax=None, n_out: int = 1000) -> Tuple[np.ndarray, np.ndarray]:
+        """보이는 범위를 n_out개 안팎의 점으로 줄인 (x, y)"""
+        i0, i1 = self.visible_range(xmin, xmax)
+        if i1 - i0 <= n_out:
+            return self.x[i0:i1], self.y[i0:i1]
+
+        key = None
+        if self.cache_key is not None:
+            key = (self.cache_key, self.method, i0, i1, int(n_out))
+            hit = self.cache.get(key)
+            if hit is not None:
+                return hit
+
+        idx = METHODS[self.method](self.x[i0:i1], self.y[i0:i1], int(n_out)) + i0
+        result = (self.x[idx], self.y[idx])
+        if key is not None:
+            self.cache.put(key, result)
+        return result
+
+
+# (시계열 키, 방법, 범위, 점 개수) → 다운샘플 결과
+LOD_CACHE = LRUCache(maxsize=512)
+
+
+def pixel_budget(ax) -> int:
+    """축의 가로 픽셀 수 기준 점 개수"""
+    try:
+        width = ax.bbox.width
+    except Exception:
+        width = 800
+    return max(50, int(width * POINTS_PER_PIXEL))
+
+
+def plot_lod(ax, lod: SeriesLOD, **plot_kwargs):
+    """현재 축 폭에 맞게 다운샘플한 선을 그리고, 줌/크기 변경 시 다시 계산하도록 등록"""
+    x, y = lod.resolve(n_out=pixel_budget(ax))
+    line, = ax.plot(x, y, **plot_kwargs)
+    lines = getattr(ax, "_lod_lines", None)
+    if lines is None:
+        lines = ax._lod_lines = []
+        _attach(ax)
+    lines.append((line, lod))
+    return line
+
+
+def refresh_lod(ax):
+    """축의 현재 xlim과 폭으로 LOD 선 데이터를 다시 계산"""
+    xmin, xmax = ax.get_xlim()
+    n_out = pixel_budget(ax)
+    for line, lod in getattr(ax, "_lod_lines", []):
+        line.set_data(*lod.resolve(xmin, xmax, n_out))
+
+
+def _attach(ax):
+    def on_xlim_changed(changed_ax):
+        refresh_lod(changed_ax)
+        changed_ax.figure.canvas.draw_idle()
+
+    ax.callbacks.connect("xlim_changed", on_xlim_changed)
+
+    # 크기 변경은 캔버스당 한 번만 연결 (redraw마다 fig.clear()로 축이 바뀌어도 현재 축만 갱신)
+    canvas = ax.figure.canvas
+    if getattr(canvas, "_lod_resize_cid", None) is None:
+        def on_resize(_event):
+            for a in canvas.figure.axes:
+                if getattr(a, "_lod_lines", None):
+                    refresh_lod(a)
+
+        canvas._lod_resize_cid = canvas.mpl_connect("resize_event", on_resize)
@@ -0,0 +1,152 @@
+"""
+실험별 전처리 결과 캐시 + 프로세스 풀 병렬 처리
+- 실험 하나의 전처리 결과를 Parquet으로 저장 (<cache_dir>/<kind>/experiment<N>-<key>.parquet)
+- key = sha1(원본 경로, 크기, mtime, 코드 버전, 옵션), 원본이나 전처리 코드가 바뀌면 해당 실험만 다시 계산
+- 다시 계산할 실험은 ProcessPoolExecutor로 나눠 처리하고, 워커가 Parquet을 직접 기록 (DataFrame을 프로세스 간에 넘기지 않음)
+
+kind:
+    usage: clean_metricData + build_normalized_usage_table 결과 (data_analysis, data_graph)
+    stat: process_stat_filter.preprocess_file 결과 (merge_experiment_files)
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+from csvRotation import csv_parts
+
+TOOL_DIR = Path(__file__).resolve().parent
+DEFAULT_CACHE_DIR = ".cache"
+
+# kind별 전처리 코드 파일 (내용이 바뀌면 캐시 무효화)
+KIND_SOURCES = {
+    "usage": ("data_analysis.py",),
+    "stat": ("process_stat_filter.py",),
+}
+
+def code_version(kind: str) -> str:
+    """kind 전처리 코드(이 모듈 포함)의 해시"""
+    h = hashlib.sha1()
+    for name in KIND_SOURCES[kind] + ("experiment_cache.py",):
+        h.update((TOOL_DIR / name).read_bytes())
+    return h.hexdigest()[:12]
+
+def source_signature(path: Path) -> dict:
+    """원본 파일(교체된 조각 포함) 또는 Parquet 파티션 디렉터리의 경로, 크기, mtime"""
+    path = Path(path).resolve()
+    if path.is_dir():
+        files = [p for p in path.rglob("*.parquet") if p.is_file()]
+        stats = [p.stat() for p in files]
+        size = sum(s.st_size for s in stats)
+        mtime = max((s.st_mtime_ns for s in stats), default=path.stat().st_mtime_ns)
+        return {"path": str(path), "size": size, "mtime_ns": mtime, "files": len(files)}
+    parts = csv_parts(str(path))
+    if not parts:
+        raise FileNotFoundError(f"No CSV parts for {path}")
+    if parts == [str(path)]:
+        stat = path.stat()
+        return {"path": str(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    stats = [os.stat(p) for p in parts]
+    return {"path": str(path), "size": sum(s.st_size for s in stats),
+            "mtime_ns": max(s.st_mtime_ns for s in stats), "files": len(parts)}
+
+def cache_key(kind: str, path: Path, options: Optional[dict] = None, version: Optional[str] = None) -> str:
+    payload = {
+        "kind": kind,
+        "source": source_signature(path),
+        "code": version or code_version(kind),
+        "options": options or {},
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+
+def _cache_path(cache_dir: Path, kind: str, exp_no: int, key: str) -> Path:
+    return cache_dir / kind / f"experiment{exp_no}-{key}.parquet"
+
+def _remove_stale(cache_dir: Path, kind: str, exp_no: int, keep: Path):
+    """같은 실험의 이전 버전 캐시 삭제"""
+    for old in (cache_dir / kind).glob(f"experiment{exp_no}-*.parquet"):
+        if old != keep:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+def _build_usage(source: Path, options: dict) -> pd.DataFrame:
+    from tool.data_analysis import (
+        build_normalized_usage_table, clean_metricData, load_normalized_usage, read_parquet_experiment
+    )
+    cycle_size = options.get("cycle_size", 100)
+    if source.is_dir():
+        df = clean_metricData({0: read_parquet_experiment(source)})[0]
+        return build_normalized_usage_table(df, cycle_size=cycle_size)
+    return load_normalized_usage(source, cycle_size=cycle_size)
+
+def _build_stat(source: Path, options: dict) -> pd.DataFrame:
+    from tool.process_stat_filter import preprocess_file
+    return preprocess_file(str(source))
+
+BUILDERS = {
+    "usage": _build_usage,
+    "stat": _build_stat,
+}
+
+def _build_and_store(kind: str, source: str, target: str, options: dict) -> str:
+    """워커 프로세스: 전처리 후 임시 파일에 기록하고 rename (중간에 죽어도 깨진 캐시가 남지 않음)"""
+    df = BUILDERS[kind](Path(source), options)
+    target = Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, target)
+    return str(target)
+
+def process_experiments(sources: Dict[int, Path], kind: str = "usage", cache_dir: str | Path = None,
+                        workers: Optional[int] = None, options: Optional[dict] = None,
+                        use_cache: bool = True) -> Dict[int, pd.DataFrame]:
+    """
+    {실험번호: 원본 경로}의 전처리 결과를 {실험번호: DataFrame}으로 반환.
+    캐시가 최신인 실험은 Parquet만 읽고, 나머지는 workers개 프로세스로 병렬 계산.
+    cache_dir 기본값: 첫 원본과 같은 디렉터리의 .cache
+    """
+    if kind not in BUILDERS:
+        raise ValueError(f"unknown kind: {kind}")
+    if not sources:
+        return {}
+    options = options or {}
+    if cache_dir is None:
+        cache_dir = Path(next(iter(sources.values()))).resolve().parent / DEFAULT_CACHE_DIR
+    cache_dir = Path(cache_dir)
+    version = code_version(kind)
+
+    targets: Dict[int, Path] = {}
+    stale = []
+    for exp_no, source in sources.items():
+        target = _cache_path(cache_dir, kind, exp_no, cache_key(kind, source, options, version))
+        targets[exp_no] = target
+        if not use_cache or not target.exists():
+            stale.append(exp_no)
+
+    if stale:
+        print(f"[CACHE] {kind}: {len(sources) - len(stale)} cached, recomputing {stale}")
+        if len(stale) == 1 or workers == 1:
+            for exp_no in stale:
+                _build_and_store(kind, str(sources[exp_no]), str(targets[exp_no]), options)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    exp_no: pool.submit(_build_and_store, kind, str(sources[exp_no]), str(targets[exp_no]), options)
+                    for exp_no in stale
+                }
+                for exp_no, future in futures.items():
+                    try:
+                        future.result()
+                    except Exception as e:
+                        raise RuntimeError(f"Failed to preprocess {sources[exp_no]}: {e}") from e
+        for exp_no in stale:
+            _remove_stale(cache_dir, kind, exp_no, targets[exp_no])
+
+    return {exp_no: pd.read_parquet(targets[exp_no]) for exp_no in sorted(sources)}
@@ -0,0 +1,175 @@
+"""
+그래프 도구용 데이터셋 인덱스
+- 데이터셋마다 한 번: 필터 컬럼(pod_name, pod_ordinal, comm, state)을 범주 코드로 바꾸고
+  코드별 행 위치 목록(그룹 인덱스)을 만들어 둠 → 필터는 가장 작은 목록에서 시작해 나머지 코드만 비교
+- cycle_id도 코드로 바꿔 두고 Sum/Mean은 np.bincount로 계산
+- (필터 코드, metric, 집계) → 집계 시계열을 LRU 캐시 → 이전에 본 선택으로 돌아가면 바로 반환
+결과는 data_graph.apply_filters + aggregate_series와 같은 값 (합계 순서 차이로 마지막 자리 오차는 있을 수 있음)
+GUI 스레드(Tab1/Tab2)와 집계 워커 스레드(OverlayTab)가 함께 쓰므로 인덱스마다, 그리고 레지스트리에 잠금을 둠
+"""
+import threading
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from tool.downsample import LRUCache
+
+GROUP_COL = "cycle_id"
+INDEX_COLS = ("pod_name", "pod_ordinal", "pod_ordinary", "comm", "state")
+
+
+class _ColumnIndex:
+    """한 필터 컬럼의 범주 코드와 코드별 행 위치"""
+    def __init__(self, values: pd.Series):
+        codes, uniques = pd.factorize(values, sort=False)
+        self.codes = codes
+        self.uniques = uniques
+        self.numeric = pd.api.types.is_numeric_dtype(values)
+        # 콤보 박스 텍스트(str(v)) → 코드
+        self.by_text = {str(v): i for i, v in enumerate(uniques)}
+        # 코드별 행 위치 (행 순서 유지)
+        order = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        skip = int((codes < 0).sum())  # NaN 행은 어느 코드에도 속하지 않음
+        bounds = np.concatenate([[0], np.cumsum(counts)]) + skip
+        self.rows = [order[bounds[i]:bounds[i + 1]] for i in range(len(uniques))]
+
+    def code_for(self, value: str) -> int:
+        """필터 값(콤보 텍스트) → 코드, 없으면 -1 (apply_filters처럼 숫자 컬럼은 float 비교도 허용)"""
+        code = self.by_text.get(str(value))
+        if code is not None:
+            return code
+        if self.numeric:
+            try:
+                target = float(value)
+            except (TypeError, ValueError):
+                return -1
+            for i, v in enumerate(self.uniques):
+                try:
+                    if float(v) == target:
+                        return i
+                except (TypeError, ValueError):
+                    continue
+        return -1
+
+
+class DatasetIndex:
+    def __init__(self, df: pd.DataFrame, cache_size: int = 128):
+        self.n_rows = len(df)
+        self.columns: Dict[str, _ColumnIndex] = {
+            col: _ColumnIndex(df[col]) for col in INDEX_COLS if col in df.columns
+        }
+        if GROUP_COL in df.columns:
+            self.cycle_codes, self.cycles = pd.factorize(df[GROUP_COL], sort=True)
+        else:
+            self.cycle_codes, self.cycles = None, None
+        self._df_ref = weakref.ref(df)
+        self._values: Dict[str, np.ndarray] = {}
+        self.cache = LRUCache(cache_size)
+        # columns/_values 지연 생성과 LRU 캐시 갱신을 보호
+        self._lock = threading.RLock()
+
+    def _column(self, col: str) -> Optional[_ColumnIndex]:
+        """필터 컬럼 인덱스 (인덱스를 만든 뒤 추가된 컬럼이면 그때 생성)"""
+        column = self.columns.get(col)
+        if column is None:
+            df = self._df_ref()
+            if df is None or col not in df.columns:
+                return None
+            column = self.columns[col] = _ColumnIndex(df[col])
+        return column
+
+    def _metric_values(self, metric: str) -> Optional[np.ndarray]:
+        values = self._values.get(metric)
+        if values is None:
+            df = self._df_ref()
+            if df is None or metric not in df.columns:
+                return None
+            values = pd.to_numeric(df[metric], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+            self._values[metric] = values
+        return values
+
+    def normalize_filters(self, filters: List[Tuple[str, Optional[str]]]) -> Optional[Tuple[Tuple[str, int], ...]]:
+        """필터 → ((컬럼, 코드), ...) 정렬된 튜플, 일치하는 값이 없으면 None(결과 없음)"""
+        out = []
+        for col, val in filters:
+            column = self._column(col) if val is not None else None
+            if column is None:
+                continue
+            code = column.code_for(val)
+            if code < 0:
+                return None
+            out.append((col, code))
+        return tuple(sorted(out))
+
+    def select_rows(self, key: Tuple[Tuple[str, int], ...]) -> Optional[np.ndarray]:
+        """필터 코드에 맞는 행 위치 (필터가 없으면 None = 전체)"""
+        if not key:
+            return None
+        lists = sorted(((self.columns[col].rows[code], col, code) for col, code in key), key=lambda t: len(t[0]))
+        rows = lists[0][0]
+        for _, col, code in lists[1:]:
+            rows = rows[self.columns[col].codes[rows] == code]
+        return np.sort(rows)
+
+    def series(self, filters: List[Tuple[str, Optional[str]]], metric: str, how: str) -> pd.Series:
+        """apply_filters + aggregate_series 결과 (캐시 사용)"""
+        with self._lock:
+            key = self.normalize_filters(filters)
+            cache_key = (key, metric, how)
+            hit = self.cache.get(cache_key)
+            if hit is not None:
+                return hit
+            result = self._aggregate(key, metric, how)
+            self.cache.put(cache_key, result)
+            return result
+
+    def _aggregate(self, key, metric: str, how: str) -> pd.Series:
+        values = self._metric_values(metric)
+        if key is None or values is None or self.cycle_codes is None:
+            return pd.Series(dtype="float64")
+        rows = self.select_rows(key)
+        cycle = self.cycle_codes if rows is None else self.cycle_codes[rows]
+        vals = values if rows is None else values[rows]
+        valid_cycle = cycle >= 0  # cycle_id가 NaN인 행은 groupby처럼 제외
+        if not valid_cycle.all():
+            cycle, vals = cycle[valid_cycle], vals[valid_cycle]
+        if len(cycle) == 0:
+            return pd.Series(dtype="float64")
+
+        n = len(self.cycles)
+        present = np.bincount(cycle, minlength=n) > 0
+        finite = ~np.isnan(vals)
+        sums = np.bincount(cycle[finite], weights=vals[finite], minlength=n)
+        if how == "Sum":
+            agg = sums
+        else:  # "Mean"
+            counts = np.bincount(cycle[finite], minlength=n)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                agg = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+        index = pd.Index(self.cycles[present], name=GROUP_COL)
+        return pd.Series(agg[present], index=index, name=metric)
+
+
+_INDEXES: Dict[int, DatasetIndex] = {}
+# finalize가 잠금을 잡은 스레드 안에서(GC 중) 실행될 수 있으므로 RLock
+_INDEXES_LOCK = threading.RLock()
+
+
+def _forget_index(key: int, idx: DatasetIndex):
+    with _INDEXES_LOCK:
+        if _INDEXES.get(key) is idx:
+            del _INDEXES[key]
+
+
+def dataset_index(df: pd.DataFrame) -> DatasetIndex:
+    """df마다 하나의 DatasetIndex (df가 사라지면 함께 제거)"""
+    with _INDEXES_LOCK:
+        idx = _INDEXES.get(id(df))
+        if idx is None or idx._df_ref() is not df or idx.n_rows != len(df):
+            idx = DatasetIndex(df)
+            _INDEXES[id(df)] = idx
+            weakref.finalize(df, _forget_index, id(df), idx)
+        return idx
@@ -1,7 +1,16 @@
 import pandas as pd
+import numpy as np
 import os
+import sys
 import glob
 
+# 스크립트로 직접 실행하거나 tool/을 경로에 두고 import해도 tool.* 모듈을 찾도록 저장소 루트를 추가
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from csvRotation import csv_parts, group_parts
+
 PROCESS_HEADERS = [
     "pod_name", "timestamp", "pid", "comm", "state", "ppid", "pgrp", "session", "tty_nr", "tpgid", "flags",
     "minflt", "cminflt", "majflt", "cmajflt", "utime", "stime", "cutime", "cstime", "priority", "nice",
@@ -26,8 +35,11 @@ SUMMARY_KEYS_ORDER = [
 ]
 
 def load_data(file_path: str) -> pd.DataFrame:
-    """Load CSV and filter out pid=1"""
-    df = pd.read_csv(file_path)
+    """Load CSV (교체된 조각까지 순서대로 이어서) and filter out pid=1"""
+    parts = csv_parts(file_path)
+    if not parts:
+        raise FileNotFoundError(f"No CSV parts for {file_path}")
+    df = pd.concat([pd.read_csv(part) for part in parts], ignore_index=True)
     df = df[df["pid"] != 1]  # pid=1 제거
     return df
 
@@ -110,24 +122,27 @@ def process_data(df: pd.DataFrame) -> pd.DataFrame:
 def align_timestamps(df: pd.DataFrame, base_pod: str = "active-0") -> pd.DataFrame:
     """
     기준 pod_name의 timestamp로 모든 pod의 timestamp를 동일하게 맞춤
+    - pod_name, timestamp 순으로 한 번 정렬(안정 정렬)하고, 파드 안에서 k번째 행에 기준 파드의 k번째 timestamp 대입
+    - 결과 index는 파드별 순번 (groupby.apply + reset_index 때와 동일)
     """
     # 기준 파드 timestamp 추출
     base_timestamps = (
-        df[df["pod_name"] == base_pod]
-        .sort_values("timestamp")["timestamp"]
-        .reset_index(drop=True)
+        df.loc[df["pod_name"] == base_pod, "timestamp"]
+        .sort_values(kind="stable")
+        .to_numpy()
     )
 
-    # 각 파드 그룹에 대해 순서대로 timestamp 덮어쓰기
-    def replace_ts(group):
-        n = len(group)
-        group = group.sort_values("timestamp").reset_index(drop=True)
-        # 기준 파드 timestamp 길이에 맞게 잘라내거나 반복
-        group["timestamp"] = base_timestamps.iloc[:n].values
-        return group
+    # 파드별 timestamp 순서로 정렬 후 파드 안 순번(rank) 계산
+    aligned = df[df["pod_name"].notna()].sort_values(["pod_name", "timestamp"], kind="stable")
+    rank = aligned.groupby("pod_name", sort=False).cumcount().to_numpy()
+    if len(rank) and rank.max() >= len(base_timestamps):
+        raise ValueError(
+            f"{base_pod} has {len(base_timestamps)} rows, fewer than another pod ({rank.max() + 1})"
+        )
 
-    df_aligned = df.groupby("pod_name", group_keys=False).apply(replace_ts)
-    return df_aligned
+    aligned["timestamp"] = base_timestamps[rank]
+    aligned.index = rank
+    return aligned
 
 def save_data(df: pd.DataFrame, output_path: str):
     """Save dataframe to CSV"""
@@ -135,6 +150,28 @@ def save_data(df: pd.DataFrame, output_path: str):
     df.to_csv(output_path, index=False)
     print(f"저장 완료: {output_path}")
 
+def _previous_row_in_group(keys: pd.Series) -> np.ndarray:
+    """각 행과 같은 그룹의 직전 행 위치 (현재 행 순서 기준, 그룹 첫 행과 키가 NaN인 행은 -1)"""
+    codes, _ = pd.factorize(keys)
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    prev = np.full(len(codes), -1, dtype="int64")
+    same = (sorted_codes[1:] == sorted_codes[:-1]) & (sorted_codes[1:] >= 0)
+    prev[order[1:][same]] = order[:-1][same]
+    return prev
+
+def _grouped_diff(df: pd.DataFrame, cols: list, prev: np.ndarray) -> pd.DataFrame:
+    """df.groupby(key)[cols].diff()와 같은 값 (prev: _previous_row_in_group 결과)"""
+    has_prev = prev >= 0
+    prev = np.where(has_prev, prev, 0)
+    result = {}
+    for col in cols:
+        # groupby.diff와 같이 int8/int16은 float32, 나머지는 float64
+        dtype = "float32" if df[col].dtype in ("int8", "int16") else "float64"
+        values = df[col].to_numpy(dtype=dtype, na_value=np.nan)
+        result[col] = np.where(has_prev, values - values[prev], np.nan).astype(dtype)
+    return pd.DataFrame(result, index=df.index)
+
 def add_deltas(df: pd.DataFrame) -> pd.DataFrame:
     """
     Add delta (difference from previous row) columns for cumulative metrics.
@@ -146,15 +183,16 @@ def add_deltas(df: pd.DataFrame) -> pd.DataFrame:
         "vm_rss_status", "read_bytes", "write_bytes"
     ]
 
+    deltas = _grouped_diff(df, cumulative_cols, _previous_row_in_group(df["pod_name"]))
     for col in cumulative_cols:
-        df[f"{col}_delta"] = df.groupby("pod_name")[col].diff()
+        df[f"{col}_delta"] = deltas[col]
 
     return df
 
 def add_cpu_time_and_delta(df: pd.DataFrame) -> pd.DataFrame:
     """Add utime+stime and its delta"""
     df["cpu_time"] = df["utime"] + df["stime"]
-    df["cpu_time_delta"] = df.groupby("pod_name")["cpu_time"].diff()
+    df["cpu_time_delta"] = _grouped_diff(df, ["cpu_time"], _previous_row_in_group(df["pod_name"]))["cpu_time"]
     return df
 
 def preprocess_file(file_path: str) -> pd.DataFrame:
@@ -166,22 +204,32 @@ def preprocess_file(file_path: str) -> pd.DataFrame:
     df = align_timestamps(df, base_pod="active-0")
     return df
 
-def merge_experiment_files(input_dir: str, output_path: str) -> pd.DataFrame:
+def merge_experiment_files(input_dir: str, output_path: str, workers: int = None,
+                           use_cache: bool = True) -> pd.DataFrame:
     """
     Merge all experiment_data/process_metrics_experiment*.csv files
-    → 파일마다 동일한 전처리 수행 후 병합
+    → 파일마다 동일한 전처리 수행 후 병합 (workers개 프로세스로 병렬, 결과는 input_dir/.cache에 캐시)
     → 첫 번째 열에 experiment_id 추가
     """
-    files = glob.glob(os.path.join(input_dir, "process_metrics_experiment*.csv"))
-    all_dfs = []
+    from tool.experiment_cache import process_experiments
 
-    for file in files:
+    # 교체된 조각(process_metrics_experiment<N>.<시각>.csv)은 원래 파일 하나로 묶음
+    files = group_parts(glob.glob(os.path.join(input_dir, "process_metrics_experiment*.csv")))
+    sources = {}
+    experiment_ids = {}
+    for i, file in enumerate(files):
         # experiment id 추출 (예: process_metrics_experiment10.csv → 10)
         filename = os.path.basename(file)
         experiment_id = "".join([c for c in filename if c.isdigit()])
+        key = int(experiment_id) if experiment_id else -(i + 1)  # 번호 없는 파일은 캐시 키만 따로
+        sources[key] = file
+        experiment_ids[key] = int(experiment_id) if experiment_id else None
 
-        df = preprocess_file(file)
-        df.insert(0, "experiment_id", int(experiment_id) if experiment_id else None)  # ✅ 첫 열에 추가
+    processed = process_experiments(sources, kind="stat", workers=workers, use_cache=use_cache)
+    all_dfs = []
+    for key in sources:
+        df = processed[key]
+        df.insert(0, "experiment_id", experiment_ids[key])  # ✅ 첫 열에 추가
         all_dfs.append(df)
 
     merged_df = pd.concat(all_dfs, ignore_index=True)